@@ -0,0 +1,96 @@
+# bench_imports.py
+"""
+Import-time benchmark for server startup.
+
+Imports a module (default: the FastAPI app, what `server.py` loads) in a fresh
+interpreter with `python -X importtime` and reports:
+  - wall time of the import
+  - the most expensive modules by cumulative import time
+  - totals per top-level package (langchain_anthropic, pptx, src, ...)
+
+Usage:
+    python bench_imports.py                       # src.api.app, top 25
+    python bench_imports.py --module server --top 40
+    python bench_imports.py --runs 3              # best-of-3 wall time
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# "import time:   self [us] | cumulative | imported package"
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_importtime(module: str) -> Tuple[float, str]:
+    """Import `module` in a child interpreter; returns (wall seconds, importtime log)."""
+    env = {**os.environ, "PYTHONPATH": HERE, "WORKFLOW_WARMUP_TOP_N": "0"}
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=HERE,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr[-2000:])
+        raise SystemExit(f"importing {module} failed")
+    return wall, proc.stderr
+
+
+def parse(log: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self_us, cumulative_us, depth) per imported module."""
+    rows = []
+    for line in log.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            self_us, cum_us, indent, name = m.groups()
+            rows.append((name, int(self_us), int(cum_us), len(indent) // 2))
+    return rows
+
+
+def per_package(rows: List[Tuple[str, int, int, int]]) -> Dict[str, int]:
+    """Self time summed per top-level package (so nothing is counted twice)."""
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        totals[name.split(".")[0]] += self_us
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.api.app", help="module to import")
+    parser.add_argument("--top", type=int, default=25, help="rows per table")
+    parser.add_argument("--runs", type=int, default=1, help="repeat and keep the fastest run")
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(max(args.runs, 1)):
+        wall, log = run_importtime(args.module)
+        if best is None or wall < best[0]:
+            best = (wall, log)
+    wall, log = best
+    rows = parse(log)
+
+    print(f"import {args.module}: {wall * 1000:.0f} ms wall, {len(rows)} modules")
+
+    print(f"\nTop {args.top} modules by cumulative import time:")
+    for name, self_us, cum_us, _ in sorted(rows, key=lambda r: r[2], reverse=True)[: args.top]:
+        print(f"  {cum_us / 1000:9.1f} ms  (self {self_us / 1000:7.1f} ms)  {name}")
+
+    print(f"\nTop {args.top} top-level packages by self time:")
+    totals = per_package(rows)
+    for pkg, us in sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[: args.top]:
+        print(f"  {us / 1000:9.1f} ms  {pkg}")
+
+
+if __name__ == "__main__":
+    main()
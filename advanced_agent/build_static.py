@@ -0,0 +1,200 @@
+# build_static.py
+"""
+Build the fingerprinted frontend bundle served from /static_dist.
+
+Steps:
+  1. compile the TypeScript (`npm run build`, i.e. tsc -> static_build/),
+     unless --skip-tsc or tsc isn't installed
+  2. collect what the page needs: the JS modules that have a .ts source in
+     static/ (stale outputs such as main_old.js, .d.ts files and sourcemaps
+     are left out), static/*.css and static/assets/**
+  3. copy each file to static_dist/ under a content-hashed name
+     (main.js -> main.3f2a9c1d.js), rewriting references first: JS imports
+     of sibling modules and CSS url(...) to assets, so a hash changes when
+     anything it pulls in changes
+  4. write .gz (and .br, if the `brotli` package is installed) variants of
+     text files next to them, when smaller
+  5. write static_dist/manifest.json: logical name -> hashed name
+
+The server serves these with immutable cache headers and picks the
+precompressed variant by Accept-Encoding (see src/api/static_assets.py);
+index.html is rendered through the manifest.
+
+Usage:
+    python build_static.py              # tsc, then bundle
+    python build_static.py --skip-tsc   # bundle the current static_build/
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import time
+from typing import Dict, List
+
+try:
+    import brotli
+except ImportError:  # optional: .gz only
+    brotli = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(HERE, "static")
+TS_OUT_DIR = os.path.join(HERE, "static_build")
+DIST_DIR = os.path.join(HERE, "static_dist")
+DIST_URL = "/static_dist"
+
+# Worth precompressing (images and fonts are compressed already)
+TEXT_EXTENSIONS = {".js", ".css", ".html", ".svg", ".json", ".txt", ".map"}
+
+# from "./x.js" / import "./x.js" / import("./x.js")
+_JS_IMPORT_RE = re.compile(r"""((?:from|import)\s*\(?\s*["'])\./([\w.-]+\.js)(["'])""")
+# url("../static/assets/backgrounds/x.png"), url(assets/x.png)
+_CSS_URL_RE = re.compile(r"""url\(\s*(["']?)([^"')]+)\1\s*\)""")
+# sourcemaps aren't shipped, so drop the pointer to them
+_SOURCEMAP_RE = re.compile(r"^//# sourceMappingURL=.*$\n?", re.MULTILINE)
+
+
+def hashed_name(logical: str, data: bytes) -> str:
+    root, ext = os.path.splitext(logical)
+    return f"{root}.{hashlib.sha256(data).hexdigest()[:8]}{ext}"
+
+
+def logical_asset(ref: str) -> str:
+    """'../static/assets/x.png' / '/static/assets/x.png' -> 'assets/x.png'."""
+    ref = ref.split("?", 1)[0].split("#", 1)[0]
+    for marker in ("static/", "static_build/"):
+        if marker in ref:
+            return ref.split(marker, 1)[1]
+    return ref.lstrip("./")
+
+
+def run_tsc() -> None:
+    tsc = os.path.join(HERE, "node_modules", ".bin", "tsc")
+    if not os.path.exists(tsc):
+        print("[build] tsc not installed (npm install), bundling the existing static_build/")
+        return
+    print("[build] compiling TypeScript")
+    subprocess.run([tsc, "-p", HERE], cwd=HERE, check=True)
+
+
+def js_modules() -> Dict[str, str]:
+    """Logical name -> compiled path, for every static/*.ts with an output."""
+    modules = {}
+    for name in sorted(os.listdir(SRC_DIR)):
+        if name.endswith(".ts") and not name.endswith(".d.ts"):
+            js = name[:-3] + ".js"
+            path = os.path.join(TS_OUT_DIR, js)
+            if os.path.exists(path):
+                modules[js] = path
+            else:
+                print(f"[build] warning: {name} has no compiled {js}, run tsc")
+    return modules
+
+
+def js_order(modules: Dict[str, str]) -> List[str]:
+    """Modules with their imports first, so importers hash the final names."""
+    deps = {}
+    for name, path in modules.items():
+        with open(path, "r", encoding="utf-8") as f:
+            deps[name] = [m.group(2) for m in _JS_IMPORT_RE.finditer(f.read()) if m.group(2) in modules]
+    order: List[str] = []
+    visiting = set()
+
+    def visit(name: str) -> None:
+        if name in order or name in visiting:
+            return
+        visiting.add(name)
+        for dep in deps[name]:
+            visit(dep)
+        order.append(name)
+
+    for name in modules:
+        visit(name)
+    return order
+
+
+def write(logical: str, data: bytes, manifest: Dict[str, str], stats: Dict[str, int]) -> None:
+    name = hashed_name(logical, data)
+    path = os.path.join(DIST_DIR, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    manifest[logical] = name
+    stats["files"] += 1
+    stats["bytes"] += len(data)
+
+    if os.path.splitext(logical)[1] not in TEXT_EXTENSIONS:
+        return
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(data):
+            with open(path + suffix, "wb") as f:
+                f.write(compressed)
+            stats["compressed_bytes" + suffix] += len(compressed)
+
+
+def build() -> Dict[str, str]:
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    os.makedirs(DIST_DIR)
+    manifest: Dict[str, str] = {}
+    stats = {"files": 0, "bytes": 0, "compressed_bytes.gz": 0, "compressed_bytes.br": 0}
+
+    # 1) assets: referenced, never referencing
+    assets_dir = os.path.join(SRC_DIR, "assets")
+    for root, _, files in os.walk(assets_dir):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            logical = os.path.relpath(path, SRC_DIR).replace(os.sep, "/")
+            with open(path, "rb") as f:
+                write(logical, f.read(), manifest, stats)
+
+    # 2) stylesheets, with url(...) pointing at the hashed assets
+    for name in sorted(os.listdir(SRC_DIR)):
+        if not name.endswith(".css"):
+            continue
+        with open(os.path.join(SRC_DIR, name), "r", encoding="utf-8") as f:
+            css = f.read()
+
+        def css_url(m: "re.Match[str]") -> str:
+            target = manifest.get(logical_asset(m.group(2)))
+            return f'url("{DIST_URL}/{target}")' if target else m.group(0)
+
+        write(name, _CSS_URL_RE.sub(css_url, css).encode("utf-8"), manifest, stats)
+
+    # 3) JS modules, imports rewritten to the hashed siblings
+    modules = js_modules()
+    for name in js_order(modules):
+        with open(modules[name], "r", encoding="utf-8") as f:
+            js = _SOURCEMAP_RE.sub("", f.read())
+        js = _JS_IMPORT_RE.sub(
+            lambda m: f"{m.group(1)}./{manifest.get(m.group(2), m.group(2))}{m.group(3)}", js
+        )
+        write(name, js.encode("utf-8"), manifest, stats)
+
+    with open(os.path.join(DIST_DIR, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"built_at": time.time(), "files": manifest}, f, indent=2, sort_keys=True)
+
+    print(f"[build] {stats['files']} files, {stats['bytes'] / 1024:.0f} KiB -> {DIST_DIR}")
+    for suffix in (".gz", ".br"):
+        if stats["compressed_bytes" + suffix]:
+            print(f"[build] precompressed text ({suffix}): {stats['compressed_bytes' + suffix] / 1024:.0f} KiB")
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the fingerprinted /static_dist bundle.")
+    parser.add_argument("--skip-tsc", action="store_true", help="don't run tsc first")
+    args = parser.parse_args()
+    if not args.skip_tsc:
+        run_tsc()
+    build()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,17 @@
 # server.py
+import os
+
 import uvicorn
 from src.api.app import create_app
 
 app = create_app()
 
+# Worker processes; use more than 1 together with a shared STATE_BACKEND
+# (sqlite:///... or redis://...) so caches, runs and downloads are shared
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "1"))
+
 if __name__ == "__main__":
-    uvicorn.run("server:app", host="127.0.0.1", port=8000, reload=True)
+    if WEB_WORKERS > 1:
+        uvicorn.run("server:app", host="127.0.0.1", port=8000, workers=WEB_WORKERS)
+    else:
+        uvicorn.run("server:app", host="127.0.0.1", port=8000, reload=True)
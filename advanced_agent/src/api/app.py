@@ -1,19 +1,41 @@
 # src/api/app.py
+import asyncio
 import os
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
-from .routes import topics, chat, downloads, suggestions
+from ..metrics import HTTP_SECONDS
+from .deps import SUGGESTION_POOL, WARMUP
+from .static_assets import PrecompressedStaticFiles, StaticManifest
+from .routes import topics, chat, chat_ws, downloads, suggestions, metrics, health
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 STATIC_DIR = os.path.join(BASE_DIR, "static")
 STATIC_BUILD_DIR = os.path.join(BASE_DIR, "static_build")
+# Fingerprinted bundle written by build_static.py
+STATIC_DIST_DIR = os.path.join(BASE_DIR, "static_dist")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  # Warm up in the background: the server accepts requests (and /ready
+  # probes, which answer 503) while connections and caches are prepared
+  task = asyncio.create_task(WARMUP.run())
+  SUGGESTION_POOL.start()
+  try:
+    yield
+  finally:
+    task.cancel()
+    SUGGESTION_POOL.stop()
 
 
 def create_app() -> FastAPI:
-  app = FastAPI()
+  app = FastAPI(lifespan=lifespan)
 
   app.add_middleware(
       CORSMiddleware,
@@ -23,18 +45,49 @@ def create_app() -> FastAPI:
       allow_headers=["*"],
   )
 
-  # Static files
+  @app.middleware("http")
+  async def record_latency(request: Request, call_next):
+    # time until the response starts (for SSE: until the stream opens)
+    t0 = time.perf_counter()
+    status = 500
+    try:
+      response = await call_next(request)
+      status = response.status_code
+      return response
+    finally:
+      route = request.scope.get("route")
+      HTTP_SECONDS.observe(
+          time.perf_counter() - t0,
+          method=request.method,
+          # route template keeps the label set bounded (/download/{filename})
+          route=getattr(route, "path", "unmatched"),
+          status=status,
+      )
+
+  # Static files (unhashed: what a dev checkout without a bundle serves)
   app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
   app.mount("/static_build", StaticFiles(directory=STATIC_BUILD_DIR), name="static_build")
 
+  # With a built bundle, index.html points at the hashed, precompressed files
+  manifest = StaticManifest(STATIC_DIST_DIR, os.path.join(STATIC_DIR, "index.html"))
+  if manifest.available:
+    app.mount("/static_dist", PrecompressedStaticFiles(directory=STATIC_DIST_DIR), name="static_dist")
+  else:
+    print("[static] no static_dist/manifest.json, serving unhashed files (run build_static.py)")
+
   @app.get("/", response_class=FileResponse)
-  async def index():
+  async def index(request: Request):
+    if manifest.available:
+      return await asyncio.to_thread(manifest.index_response, request.headers.get("if-none-match"))
     return FileResponse(os.path.join(STATIC_DIR, "index.html"))
 
   # Routers
   app.include_router(suggestions.router, prefix="")
   app.include_router(topics.router, prefix="")
   app.include_router(chat.router, prefix="")
+  app.include_router(chat_ws.router, prefix="")
   app.include_router(downloads.router, prefix="")
+  app.include_router(metrics.router, prefix="")
+  app.include_router(health.router, prefix="")
 
   return app
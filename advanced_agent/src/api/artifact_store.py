@@ -0,0 +1,83 @@
+# src/api/artifact_store.py
+"""
+Saved documents and slides, reachable from every server process.
+
+Runs write their .txt/.pptx files to the local `saved_docs/` and
+`saved_slides/` folders. With a shared STATE_BACKEND the file is also
+published: its metadata (folder, size, mtime) and bytes go into the
+"artifacts" namespaces, so a download that lands on another worker (or
+node) fetches the file from the backend into its own folder and serves it
+from there. With the memory backend only the local files exist, as before.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ..state_backend import STATE, StateBackend
+
+
+class ArtifactStore:
+    def __init__(self, backend: StateBackend = STATE, ttl_seconds: float = 7 * 86400) -> None:
+        self.shared = backend.shared
+        self._meta = backend.namespace("artifacts:meta", ttl=ttl_seconds)
+        self._data = backend.namespace("artifacts:data", ttl=ttl_seconds)
+        self._lock = threading.Lock()
+        self.published = 0
+        self.fetched = 0
+
+    def publish(self, path: str) -> None:
+        """Make a freshly saved file available to the other workers."""
+        if not self.shared or not path:
+            return
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            print(f"[artifacts] could not publish {path}: {e}")
+            return
+        name = os.path.basename(path)
+        self._data.set(name, data)
+        self._meta.set(name, {
+            "folder": os.path.dirname(path),
+            "size": len(data),
+            "mtime": os.path.getmtime(path),
+            "published_at": time.time(),
+        })
+        with self._lock:
+            self.published += 1
+
+    def metadata(self, filename: str) -> Optional[Dict[str, Any]]:
+        return self._meta.get(filename) if self.shared else None
+
+    def exists(self, path: str) -> bool:
+        """The file is here, or another worker published it."""
+        if os.path.exists(path):
+            return True
+        return self.shared and self._meta.exists(os.path.basename(path))
+
+    def ensure_local(self, folder: str, filename: str) -> Optional[str]:
+        """Local path of `filename` in `folder`, fetched from the backend if needed."""
+        path = os.path.join(folder, filename)
+        if os.path.exists(path):
+            return path
+        if not self.shared:
+            return None
+        data = self._data.get(filename)
+        if data is None:
+            return None
+        os.makedirs(folder, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self.fetched += 1
+        print(f"[artifacts] fetched {filename} from the state backend")
+        return path
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"shared": self.shared, "published": self.published, "fetched": self.fetched}
@@ -0,0 +1,174 @@
+# src/api/cache_utils.py
+"""
+Small caching helpers shared by the API layer.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Iterator, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """
+    Canonical form of a user query for cache keys:
+    Unicode-normalized, case-folded, punctuation dropped, whitespace collapsed.
+    "Best  Python IDE?" and "best python ide" map to the same key.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = "".join(
+        " " if unicodedata.category(ch).startswith("P") else ch
+        for ch in text
+    )
+    return _WS_RE.sub(" ", text).strip()
+
+
+def exact_query(text: str) -> str:
+    """
+    Conservative canonical form for caches that replay answers: Unicode-
+    normalized, case-folded, whitespace collapsed, trailing ?!. dropped.
+    Other punctuation is kept, so "best C# IDE" and "best C IDE" (or
+    "Node.js" and "node js") stay distinct, unlike `normalize_query`.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _WS_RE.sub(" ", text).strip().rstrip("?!.。 ")
+
+
+class LRUCache(Generic[K, V]):
+    """Thread-safe bounded LRU mapping with hit/miss counters."""
+
+    def __init__(self, max_size: int = 1024) -> None:
+        self.max_size = max_size
+        self._data: "OrderedDict[K, V]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def peek(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Read without updating recency or counters."""
+        with self._lock:
+            return self._data.get(key, default)
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key: K) -> Optional[V]:
+        with self._lock:
+            return self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def items(self) -> Iterator[Tuple[K, V]]:
+        """Snapshot of entries, least recently used first."""
+        with self._lock:
+            return iter(list(self._data.items()))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class PersistentLRUCache(LRUCache[str, Any]):
+    """
+    LRU cache with JSON-serializable values that can be snapshotted to disk.
+
+    `meta` is stored alongside the entries; a file written with different
+    meta (e.g. another topic fingerprint) is ignored on load.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        path: str = "",
+        flush_every: int = 20,
+        meta: Optional[Dict[str, Any]] = None,
+        name: str = "cache",
+    ) -> None:
+        super().__init__(max_size)
+        self.path = path
+        self.meta: Dict[str, Any] = meta or {}
+        self.name = name
+        self._flush_every = flush_every
+        self._dirty = 0
+        self._io_lock = threading.Lock()
+        self.load()
+
+    def put(self, key: str, value: Any) -> None:
+        super().put(key, value)
+        self._dirty += 1
+        if self.path and self._dirty >= self._flush_every:
+            self.flush()
+
+    def reset(self, meta: Dict[str, Any]) -> None:
+        """Drop every entry and stamp the cache with new meta."""
+        self.clear()
+        self.meta = meta
+        self._dirty = 0
+        self.flush()
+
+    def load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[{self.name}] could not read {self.path}: {e}")
+            return
+        if data.get("meta", {}) != self.meta:
+            print(f"[{self.name}] persisted entries are stale, ignoring {self.path}")
+            return
+        for key, value in data.get("entries", []):
+            super().put(key, value)
+
+    def flush(self) -> None:
+        """Write all entries to `path` (atomically via a temp file)."""
+        if not self.path:
+            return
+        with self._io_lock:
+            payload = {"meta": self.meta, "entries": [[k, v] for k, v in self.items()]}
+            tmp = f"{self.path}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(payload, f, ensure_ascii=False)
+                os.replace(tmp, self.path)
+                self._dirty = 0
+            except OSError as e:
+                print(f"[{self.name}] could not write {self.path}: {e}")
@@ -1,38 +1,88 @@
 # src/api/deps.py
-from typing import Tuple
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 
+from ..llm_hedge import HEDGE_POLICY
+from ..metrics import LLM_CALLBACKS
+from ..state_backend import STATE
+from .artifact_store import ArtifactStore
+from .download_cache import DownloadCache
+from .inflight_runs import InflightRuns
+from .result_cache import ResultCache
+from .run_scheduler import RunScheduler
+from .suggestion_pool import SuggestionPool
+from .topic_cache import TopicClassificationCache
+from .topic_router import append_history, build_topic_router, should_shadow
+from .translate import translate_batch
+from .warmup import WarmUp, load_queries
+from ..topics.root_workflow import RootWorkflow
 from ..topics.registry import (
     build_workflows,
     get_topic_descriptions,
     get_topic_labels,
+    topic_config_fingerprint,
     TOPIC_CONFIGS,
 )
 
-# Build workflows & topic metadata once at import time
+# Topic metadata at import time; workflows are built on first use
 TOPIC_WORKFLOWS = build_workflows()
 TOPIC_LABELS = get_topic_labels()
 TOPIC_DESCRIPTIONS = get_topic_descriptions()
 TOPIC_KEYS = list(TOPIC_CONFIGS.keys())
+TOPIC_DOMAINS = {key: cfg.domain for key, cfg in TOPIC_CONFIGS.items()}
+
+# Admission control: concurrent runs + bounded wait queue per domain
+RUN_SCHEDULER = RunScheduler(sorted(set(TOPIC_DOMAINS.values())))
+
+# Saved documents/slides; published to the state backend when it is shared,
+# so downloads work on any worker
+ARTIFACTS = ArtifactStore(STATE, ttl_seconds=float(os.getenv("ARTIFACT_TTL_S", "604800")))
+
+# Artifacts served by /download, kept in memory with their compressed variants
+DOWNLOAD_CACHE = DownloadCache(
+    max_bytes=int(os.getenv("DOWNLOAD_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    max_file_bytes=int(os.getenv("DOWNLOAD_CACHE_MAX_FILE_BYTES", str(8 * 1024 * 1024))),
+)
+
+# Finished runs (state, reply, artifacts), replayed for repeated questions
+RESULT_CACHE = ResultCache(
+    ttl_seconds=float(os.getenv("RESULT_CACHE_TTL_S", "21600")),
+    max_size=int(os.getenv("RESULT_CACHE_SIZE", "256")),
+    backend=STATE,
+    artifact_exists=ARTIFACTS.exists,
+)
+
+# Runs currently streaming; identical questions join them instead of rerunning,
+# dropped streams resume them via Last-Event-ID (across workers with a shared
+# state backend)
+INFLIGHT_RUNS = InflightRuns(
+    buffer_size=int(os.getenv("RUN_EVENT_BUFFER", "2000")),
+    resume_grace_s=float(os.getenv("RUN_RESUME_GRACE_S", "15")),
+    recent_size=int(os.getenv("RUN_RECENT_SIZE", "100")),
+    shared=STATE.namespace("runs", ttl=float(os.getenv("RUN_STATE_TTL_S", "3600"))),
+    poll_s=float(os.getenv("RUN_REMOTE_POLL_S", "0.5")),
+)
 
 # LLM used for classification (small, deterministic)
-topic_classifier_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+topic_classifier_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, callbacks=LLM_CALLBACKS)
+# Optional secondary classifier used when the primary is slow (see llm_hedge)
+topic_classifier_hedge_llm = (
+    RootWorkflow.build_llm(HEDGE_POLICY.config.secondary_model, 0)
+    if HEDGE_POLICY is not None
+    else None
+)
 
 
-def classify_topic_with_llm(query: str) -> Tuple[str, str]:
-    """
-    Returns (key, label)
-    - key: internal name (e.g. 'database')
-    - label: user-facing display (e.g. 'Databases & Data Platforms')
-    """
+def _build_classifier_prompt() -> str:
     topic_list_text = "\n".join(
         f"- {cfg.label}: {cfg.description}"
         for cfg in TOPIC_CONFIGS.values()
     )
-
-    system_prompt = (
+    return (
         "You are a topic router. You classify user queries into categories.\n\n"
         "Available research categories:\n"
         f"{topic_list_text}\n\n"
@@ -43,25 +93,155 @@ def classify_topic_with_llm(query: str) -> Tuple[str, str]:
         "If ambiguous, choose the closest match."
     )
 
+
+# Category list only depends on TOPIC_CONFIGS, so build the prompt once
+# (and again only if the configs change, see `_refresh_topic_index`)
+CLASSIFIER_SYSTEM_PROMPT = _build_classifier_prompt()
+TOPIC_FINGERPRINT = topic_config_fingerprint()
+
+# Local lexical router that answers confident queries without the LLM
+TOPIC_ROUTER = build_topic_router(TOPIC_CONFIGS)
+TOPIC_ROUTER_HISTORY = os.getenv("TOPIC_ROUTER_HISTORY", "")
+_shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="topic-shadow")
+
+# Remembered classifications, keyed by normalized query
+TOPIC_CACHE = TopicClassificationCache(
+    TOPIC_FINGERPRINT,
+    max_size=int(os.getenv("TOPIC_CACHE_SIZE", "5000")),
+    path=os.getenv("TOPIC_CACHE_PATH", ""),
+    shared=STATE.namespace("topics", ttl=float(os.getenv("TOPIC_CACHE_SHARED_TTL_S", "2592000"))),
+)
+
+# Startup warm-up builds the N most asked-about topics' workflows (by
+# remembered classifications; config order when there is no history yet)
+WORKFLOW_WARMUP_TOP_N = int(os.getenv("WORKFLOW_WARMUP_TOP_N", "3"))
+
+
+def warmup_topic_keys() -> List[str]:
+    if WORKFLOW_WARMUP_TOP_N <= 0:
+        return []
+    top_topics = [key for key, _ in TOPIC_CACHE.topic_counts().most_common(WORKFLOW_WARMUP_TOP_N)]
+    return top_topics or TOPIC_KEYS[:WORKFLOW_WARMUP_TOP_N]
+
+
+def _refresh_topic_index() -> str:
+    """Rebuild the prompt and router if TOPIC_CONFIGS changed; returns the fingerprint."""
+    global CLASSIFIER_SYSTEM_PROMPT, TOPIC_FINGERPRINT, TOPIC_ROUTER
+    fingerprint = topic_config_fingerprint()
+    if fingerprint != TOPIC_FINGERPRINT:
+        CLASSIFIER_SYSTEM_PROMPT = _build_classifier_prompt()
+        TOPIC_ROUTER = build_topic_router(TOPIC_CONFIGS)
+        TOPIC_FINGERPRINT = fingerprint
+    return fingerprint
+
+
+def classify_topic(query: str) -> Tuple[str, str]:
+    """
+    Returns (key, label). Order of lookups:
+    1) classification cache (normalized query)
+    2) lexical router, when confident
+    3) LLM classifier
+    """
+    fingerprint = _refresh_topic_index()
+    cached = TOPIC_CACHE.get(query, fingerprint)
+    if cached is not None and cached[0] in TOPIC_CONFIGS:
+        return cached
+
+    routed_key, guess = TOPIC_ROUTER.route(query)
+    if routed_key is not None:
+        TOPIC_ROUTER.record(skipped_llm=True)
+        if should_shadow():
+            _shadow_executor.submit(_shadow_check, query, routed_key)
+        label = TOPIC_CONFIGS[routed_key].label
+        TOPIC_CACHE.put(query, routed_key, label, fingerprint)
+        return routed_key, label
+
+    llm_key = _classify_key_with_llm(query)
+    TOPIC_ROUTER.record(skipped_llm=False, guess=guess, llm_key=llm_key or "")
+    if llm_key is None:
+        # Don't remember failures; the next request retries the LLM
+        return _default_topic()
+    append_history(TOPIC_ROUTER_HISTORY, query, llm_key)
+    label = TOPIC_CONFIGS[llm_key].label
+    TOPIC_CACHE.put(query, llm_key, label, fingerprint)
+    return llm_key, label
+
+
+def guess_topic(query: str) -> Optional[str]:
+    """
+    Cheap best guess of the topic key (cache, else the router's top score)
+    without calling the LLM. Used to start speculative work early, so it is
+    None unless the query actually matches a topic lexically.
+    """
+    fingerprint = _refresh_topic_index()
+    cached = TOPIC_CACHE.peek(query, fingerprint)
+    if cached is not None:
+        return cached[0]
+    _, guess = TOPIC_ROUTER.route(query)
+    return guess or None
+
+
+def _shadow_check(query: str, routed_key: str) -> None:
+    llm_key = _classify_key_with_llm(query)
+    if llm_key is not None:
+        TOPIC_ROUTER.record_shadow(routed_key, llm_key)
+
+
+def _default_topic() -> Tuple[str, str]:
+    default_key = next(iter(TOPIC_CONFIGS.keys()))
+    return default_key, TOPIC_CONFIGS[default_key].label
+
+
+def _classify_key_with_llm(query: str) -> Optional[str]:
+    """Ask the LLM classifier; returns the topic key, or None if it failed."""
     messages = [
-        SystemMessage(content=system_prompt),
+        SystemMessage(content=CLASSIFIER_SYSTEM_PROMPT),
         HumanMessage(content=f"User query: {query}"),
     ]
 
     try:
-        response = topic_classifier_llm.invoke(messages)
+        if HEDGE_POLICY is not None and topic_classifier_hedge_llm is not None:
+            response = HEDGE_POLICY.invoke(
+                topic_classifier_llm, messages, topic_classifier_hedge_llm, label="classifier"
+            )
+        else:
+            response = topic_classifier_llm.invoke(messages)
         label = response.content.strip()
 
         # Find which config matches this label
         for key, cfg in TOPIC_CONFIGS.items():
             if cfg.label.lower() == label.lower():
-                return key, cfg.label
+                return key
 
         # fallback — shouldn't happen
-        default_key = next(iter(TOPIC_CONFIGS.keys()))
-        return default_key, TOPIC_CONFIGS[default_key].label
+        return None
 
     except Exception as e:
         print("Topic classification error:", e)
-        default_key = next(iter(TOPIC_CONFIGS.keys()))
-        return default_key, TOPIC_CONFIGS[default_key].label
+        return None
+
+
+# Pre-generated /suggestions questions, English and Chinese, refreshed in the
+# background (started by the app's lifespan)
+SUGGESTION_POOL = SuggestionPool(
+    RootWorkflow.build_llm("gpt-4o-mini", 0.9),  # higher temp for more variety
+    translate_batch,
+    size=int(os.getenv("SUGGESTIONS_POOL_SIZE", "60")),
+    batch_size=int(os.getenv("SUGGESTIONS_BATCH_SIZE", "10")),
+    refresh_s=float(os.getenv("SUGGESTIONS_REFRESH_S", "300")),
+    shared=STATE.namespace("suggestions"),
+)
+
+# Run by the app's lifespan (see `create_app`); gates /ready
+WARMUP = WarmUp(
+    TOPIC_WORKFLOWS,
+    topic_keys=warmup_topic_keys,
+    classify=classify_topic,
+    suggestions=SUGGESTION_POOL,
+    llms=[topic_classifier_llm, topic_classifier_hedge_llm],
+    queries=load_queries(
+        os.getenv("WARMUP_QUERIES_PATH", ""), int(os.getenv("WARMUP_QUERIES_LIMIT", "50"))
+    ),
+    enabled=os.getenv("WARMUP", "1") != "0",
+    timeout_s=float(os.getenv("WARMUP_TIMEOUT_S", "120")),
+)
@@ -0,0 +1,196 @@
+# src/api/download_cache.py
+"""
+In-memory cache of downloadable artifacts (saved documents and slides).
+
+Artifact filenames carry a timestamp and are never rewritten, so a file is
+read and hashed once: its bytes and a strong ETag (content hash) stay in
+memory, together with compressed variants (gzip, and brotli when the
+`brotli` package is installed) built on first request. The cache is an LRU
+bounded by total bytes; files above `max_file_bytes` are not kept in memory
+and are served from disk.
+
+Also holds the small HTTP helpers the download route needs: Accept-Encoding
+negotiation, If-None-Match matching and single-range parsing.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# Encodings we can produce, in order of preference
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+@dataclass
+class Artifact:
+    path: str
+    size: int
+    mtime: float
+    digest: str
+    # None for files served from disk (larger than max_file_bytes)
+    body: Optional[bytes] = None
+    # encoding -> compressed bytes (None: compression doesn't pay off)
+    variants: Dict[str, Optional[bytes]] = field(default_factory=dict)
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        # strong ETags must differ per representation
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+    def cached_bytes(self) -> int:
+        return len(self.body or b"") + sum(len(v or b"") for v in self.variants.values())
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+class DownloadCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_file_bytes: int = 8 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self._entries: "OrderedDict[str, Artifact]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.compressed = 0
+
+    def peek(self, path: str) -> Optional[Artifact]:
+        """The cached artifact for `path`, without touching the disk."""
+        with self._lock:
+            artifact = self._entries.get(path)
+            if artifact is not None:
+                self._entries.move_to_end(path)
+                self.hits += 1
+            return artifact
+
+    def load(self, path: str) -> Artifact:
+        """Read and hash `path` (blocking); small files are kept in memory."""
+        st = os.stat(path)
+        digest = hashlib.sha256()
+        body: Optional[bytes] = None
+        with open(path, "rb") as f:
+            if st.st_size <= self.max_file_bytes:
+                body = f.read()
+                digest.update(body)
+            else:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        artifact = Artifact(path, st.st_size, st.st_mtime, digest.hexdigest()[:32], body)
+        with self._lock:
+            self.loads += 1
+            self._store(artifact)
+        return artifact
+
+    def encoded(self, artifact: Artifact, encoding: str) -> Optional[bytes]:
+        """`artifact`'s body compressed with `encoding` (built once), or None if not smaller."""
+        if artifact.body is None:
+            return None
+        if encoding not in artifact.variants:
+            data = _compress(artifact.body, encoding)
+            with self._lock:
+                if encoding in artifact.variants:
+                    # compressed concurrently by another request
+                    return artifact.variants[encoding]
+                artifact.variants[encoding] = data if len(data) < artifact.size else None
+                self.compressed += 1
+                if self._entries.get(artifact.path) is artifact:
+                    self._bytes += len(artifact.variants[encoding] or b"")
+                    self._evict()
+        return artifact.variants[encoding]
+
+    def _store(self, artifact: Artifact) -> None:
+        old = self._entries.pop(artifact.path, None)
+        if old is not None:
+            self._bytes -= old.cached_bytes()
+        self._entries[artifact.path] = artifact
+        self._bytes += artifact.cached_bytes()
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= old.cached_bytes()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "loads": self.loads,
+                "compressed": self.compressed,
+                "encodings": list(ENCODINGS),
+            }
+
+
+# ---------------------------
+# HTTP helpers
+# ---------------------------
+def negotiate_encoding(accept_encoding: str, offered: Iterable[str] = ENCODINGS) -> Optional[str]:
+    """Best of `offered` (in preference order) the client accepts (q > 0), else None (identity)."""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for encoding in offered:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > 0:
+            return encoding
+    return None
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 asks for this header)."""
+    if if_none_match.strip() == "*":
+        return True
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return etag in (t[2:] if t.startswith("W/") else t for t in tags)
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) inclusive for a single `bytes=` range. Returns None when the
+    header should be ignored (other units, several ranges, malformed) and
+    raises ValueError when the range can't be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep or not (first.isdigit() or first == "") or not (last.isdigit() or last == ""):
+        return None
+    if first == "":
+        if last == "":
+            return None
+        # suffix range: the last N bytes
+        if int(last) == 0 or size == 0:
+            raise ValueError("range not satisfiable")
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("range not satisfiable")
+    return start, end
@@ -0,0 +1,421 @@
+# src/api/inflight_runs.py
+"""
+Registry of workflow runs that are currently streaming, for deduplication
+and resumable streams.
+
+When the same question (same topic, query in `exact_query` form as in the
+result cache, model, temperature and output language) is asked again while a
+run for it is still going, the new request subscribes to that run's
+`RunChannel` instead of starting another one: it gets a replay of the events
+published so far, then live events.
+
+Every run has an id and numbers its events; streams send them as SSE
+`id: <run_id>:<seq>`. A reconnecting EventSource sends the last one back as
+`Last-Event-ID`, and `resume` finds the run (still going, or recently
+finished) so the stream continues after that event. Each run keeps a bounded
+buffer of its latest events for this.
+
+The run belongs to the channel, not to the request that started it. When the
+last subscriber leaves it gets a grace period to come back (a dropped
+connection reconnecting) before the run is cancelled.
+
+With a shared STATE_BACKEND (several worker processes, no sticky sessions)
+each run also registers itself in the "runs" namespace and mirrors its
+events to an append-only list there. A worker that gets the same question,
+or a reconnect for a run it doesn't own, follows that log through a
+`RemoteRunChannel`; its followers keep a heartbeat key alive so the owning
+worker doesn't treat the run as abandoned.
+
+All methods except `RunChannel.publish` must be called from the event loop
+thread.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+from ..cancellation import CancellationToken
+from ..state_backend import Namespace
+from .cache_utils import LRUCache, exact_query
+
+RunKey = Tuple[str, str, str, float, str]
+# (seq, payload); seq is None for the DONE marker
+RunEvent = Tuple[Optional[int], str]
+
+DONE = "__DONE__"
+
+
+def run_key_digest(key: RunKey) -> str:
+    return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:32]
+
+
+class RunChannel:
+    """Numbered event buffer of one run plus the queues of the streams following it."""
+
+    def __init__(
+        self,
+        key: RunKey,
+        cancel_token: CancellationToken,
+        buffer_size: int = 2000,
+        resume_grace_s: float = 15.0,
+        mirror: Optional[Callable[..., Any]] = None,
+        shared: Optional[Namespace] = None,
+    ) -> None:
+        self.key = key
+        self.run_id = uuid.uuid4().hex[:12]
+        self.cancel_token = cancel_token
+        self.task: Optional[asyncio.Task] = None
+        self.events: Deque[Tuple[int, str]] = deque(maxlen=buffer_size)
+        self.done = False
+        self.resume_grace_s = resume_grace_s
+        self._seq = 0
+        self._loop = asyncio.get_running_loop()
+        self._subscribers: list["asyncio.Queue[RunEvent]"] = []
+        self._orphan_timer: Optional[asyncio.TimerHandle] = None
+        # shared backend: `mirror(fn, *args)` runs backend writes in order, off the loop
+        self._mirror = mirror
+        self._shared = shared
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.run_id}:{seq}"
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def publish(self, item: str) -> None:
+        """Append an event and fan it out (thread-safe)."""
+        self._loop.call_soon_threadsafe(self._publish, item)
+
+    def _publish(self, item: str) -> None:
+        if self.done:
+            return
+        self._seq += 1
+        self.events.append((self._seq, item))
+        for q in self._subscribers:
+            q.put_nowait((self._seq, item))
+        if self._mirror is not None:
+            self._mirror(self._shared.append, f"events:{self.run_id}", item)
+
+    def subscribe(self, after_seq: int = 0) -> "asyncio.Queue[RunEvent]":
+        """A queue pre-filled with the buffered events after `after_seq`, then fed live."""
+        if self._orphan_timer is not None:
+            # someone came back within the grace period
+            self._orphan_timer.cancel()
+            self._orphan_timer = None
+        q: "asyncio.Queue[RunEvent]" = asyncio.Queue()
+        if self.events and self.events[0][0] > after_seq + 1:
+            print(
+                f"[runs] {self.run_id}: events {after_seq + 1}..{self.events[0][0] - 1} "
+                "already left the buffer"
+            )
+        for seq, item in self.events:
+            if seq > after_seq:
+                q.put_nowait((seq, item))
+        if self.done:
+            q.put_nowait((None, DONE))
+        else:
+            self._subscribers.append(q)
+        return q
+
+    def unsubscribe(self, q: "asyncio.Queue[RunEvent]") -> int:
+        """Drop a subscriber; returns how many are left."""
+        if q in self._subscribers:
+            self._subscribers.remove(q)
+        return len(self._subscribers)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def release_later(self, reason: str) -> None:
+        """The last subscriber left: cancel the run unless one comes back in time."""
+        if self.done:
+            return
+        if self.resume_grace_s <= 0:
+            self.cancel(reason)
+            return
+        if self._orphan_timer is None:
+            self._orphan_timer = self._loop.call_later(
+                self.resume_grace_s, self._cancel_if_orphaned, reason
+            )
+
+    def release(self, reason: str) -> None:
+        """The last subscriber left for good (no resume possible): cancel the run now."""
+        if self.done or self._orphan_timer is not None:
+            # another stream dropped earlier and may still resume in its grace period
+            return
+        self._cancel_if_orphaned(reason)
+
+    def _cancel_if_orphaned(self, reason: str) -> None:
+        self._orphan_timer = None
+        if self._subscribers or self.done:
+            return
+        if self._shared is None:
+            self._cancel_orphan(reason)
+            return
+        # the follower check reads the shared backend: keep it off the event loop
+        self._loop.create_task(self._acancel_if_unfollowed(reason))
+
+    async def _acancel_if_unfollowed(self, reason: str) -> None:
+        followed = await asyncio.to_thread(self._followed_remotely)
+        if self._subscribers or self.done:
+            return
+        if followed:
+            # streams on other workers still follow the shared event log
+            self.release_later(reason)
+            return
+        self._cancel_orphan(reason)
+
+    def _cancel_orphan(self, reason: str) -> None:
+        print(f"[runs] {self.run_id}: no client came back, cancelling")
+        self.cancel(reason)
+
+    def _followed_remotely(self) -> bool:
+        if self._shared is None:
+            return False
+        try:
+            return self._shared.exists(f"followers:{self.run_id}")
+        except Exception as e:
+            print(f"[runs] {self.run_id}: follower check failed: {e}")
+            return False
+
+    def cancel(self, reason: str) -> None:
+        """Stop the run (nobody is following it anymore)."""
+        self.cancel_token.cancel(reason)
+        if self.task is not None:
+            self.task.cancel()
+
+    def close_soon(self) -> None:
+        """`close` once every event published so far has been fanned out."""
+        self._loop.call_soon_threadsafe(self.close)
+
+    def close(self) -> None:
+        """Mark the run finished and end every subscriber's stream."""
+        if self.done:
+            return
+        self.done = True
+        if self._orphan_timer is not None:
+            self._orphan_timer.cancel()
+            self._orphan_timer = None
+        for q in self._subscribers:
+            q.put_nowait((None, DONE))
+        self._subscribers.clear()
+        if self._mirror is not None:
+            self._mirror(self._shared.set, f"meta:{self.run_id}", {"done": True, "pid": os.getpid()})
+
+
+class RemoteRunChannel:
+    """
+    A run owned by another worker, followed by polling its event log in the
+    shared backend. Has the subscriber side of `RunChannel`'s interface.
+    """
+
+    def __init__(
+        self,
+        run_id: str,
+        shared: Namespace,
+        done: bool,
+        last_seq: int,
+        poll_s: float = 0.5,
+        idle_timeout_s: float = 600.0,
+    ) -> None:
+        self.run_id = run_id
+        self.done = done
+        self._last_seq = last_seq
+        self._shared = shared
+        self.poll_s = poll_s
+        self.idle_timeout_s = idle_timeout_s
+        self._pollers: Dict["asyncio.Queue[RunEvent]", asyncio.Task] = {}
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.run_id}:{seq}"
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    def subscribe(self, after_seq: int = 0) -> "asyncio.Queue[RunEvent]":
+        q: "asyncio.Queue[RunEvent]" = asyncio.Queue()
+        self._pollers[q] = asyncio.create_task(self._poll(q, after_seq))
+        return q
+
+    def unsubscribe(self, q: "asyncio.Queue[RunEvent]") -> int:
+        task = self._pollers.pop(q, None)
+        if task is not None:
+            task.cancel()
+        return len(self._pollers)
+
+    def release_later(self, reason: str) -> None:
+        # the owning worker cancels the run once the follower heartbeat expires
+        pass
+
+    def release(self, reason: str) -> None:
+        pass
+
+    def _read(self, cursor: int) -> Tuple[List[str], bool]:
+        # `done` is read before the events: it is written after the last one
+        meta = self._shared.get(f"meta:{self.run_id}")
+        done = meta is None or bool(meta.get("done"))
+        self._shared.set(f"followers:{self.run_id}", time.time(), ttl=max(3 * self.poll_s, 5.0))
+        return self._shared.read_list(f"events:{self.run_id}", cursor), done
+
+    async def _poll(self, q: "asyncio.Queue[RunEvent]", cursor: int) -> None:
+        loop = asyncio.get_running_loop()
+        last_event = time.monotonic()
+        while True:
+            try:
+                items, done = await loop.run_in_executor(None, self._read, cursor)
+            except Exception as e:
+                print(f"[runs] {self.run_id}: reading the shared event log failed: {e}")
+                items, done = [], False
+            for item in items:
+                cursor += 1
+                q.put_nowait((cursor, item))
+            self._last_seq = max(self._last_seq, cursor)
+            if items:
+                last_event = time.monotonic()
+            if done or time.monotonic() - last_event > self.idle_timeout_s:
+                self.done = True
+                q.put_nowait((None, DONE))
+                return
+            await asyncio.sleep(self.poll_s)
+
+
+AnyRunChannel = Union[RunChannel, RemoteRunChannel]
+
+
+class InflightRuns:
+    def __init__(
+        self,
+        buffer_size: int = 2000,
+        resume_grace_s: float = 15.0,
+        recent_size: int = 100,
+        shared: Optional[Namespace] = None,
+        poll_s: float = 0.5,
+    ) -> None:
+        self.buffer_size = buffer_size
+        self.resume_grace_s = resume_grace_s
+        self.poll_s = poll_s
+        # run registry + event logs other workers can follow (shared backends only)
+        self._shared = shared if shared is not None and shared.shared else None
+        self._mirror_executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="run-mirror")
+            if self._shared is not None
+            else None
+        )
+        self._runs: Dict[RunKey, RunChannel] = {}
+        self._by_id: Dict[str, RunChannel] = {}
+        # finished runs, so a stream that dropped right before the end can resume
+        self._recent: LRUCache[str, RunChannel] = LRUCache(recent_size)
+        self._lock = threading.Lock()
+        self.started = 0
+        self.joined = 0
+        self.joined_remote = 0
+        self.resumed = 0
+        self.resumed_remote = 0
+
+    @staticmethod
+    def key(topic_key: str, query: str, model: str, temperature: float, language: str) -> RunKey:
+        return (topic_key, exact_query(query), model, float(temperature), language)
+
+    def _mirror(self, fn: Callable[..., Any], *args: Any) -> None:
+        """Queue a backend write; one thread keeps them in publish order."""
+        def write() -> None:
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"[runs] shared state write failed: {e}")
+        self._mirror_executor.submit(write)
+
+    def _remote(self, run_id: str) -> Optional[RemoteRunChannel]:
+        """A run registered by another worker, if the shared backend knows it."""
+        meta = self._shared.get(f"meta:{run_id}")
+        if meta is None:
+            return None
+        last_seq = len(self._shared.read_list(f"events:{run_id}"))
+        return RemoteRunChannel(run_id, self._shared, bool(meta.get("done")), last_seq, self.poll_s)
+
+    def _remote_for_key(self, key: RunKey) -> Optional[RemoteRunChannel]:
+        run_id = self._shared.get(f"key:{run_key_digest(key)}")
+        return self._remote(run_id) if run_id else None
+
+    async def join(self, key: RunKey) -> Optional[AnyRunChannel]:
+        """The channel of a run for `key` that is still going, if any."""
+        channel = self._runs.get(key)
+        if channel is not None and not channel.done:
+            with self._lock:
+                self.joined += 1
+            return channel
+        if self._shared is None:
+            return None
+        # shared backend reads (SQLite/Redis) run off the event loop
+        remote = await asyncio.to_thread(self._remote_for_key, key)
+        if remote is None or remote.done:
+            return None
+        with self._lock:
+            self.joined += 1
+            self.joined_remote += 1
+        return remote
+
+    def start(self, key: RunKey, cancel_token: CancellationToken) -> RunChannel:
+        mirror = self._mirror if self._shared is not None else None
+        channel = RunChannel(
+            key, cancel_token, self.buffer_size, self.resume_grace_s, mirror, self._shared
+        )
+        self._runs[key] = channel
+        self._by_id[channel.run_id] = channel
+        if mirror is not None:
+            mirror(self._shared.set, f"meta:{channel.run_id}", {"done": False, "pid": os.getpid()})
+            mirror(self._shared.set, f"key:{run_key_digest(key)}", channel.run_id)
+        with self._lock:
+            self.started += 1
+        return channel
+
+    async def resume(self, last_event_id: str) -> Optional[Tuple[AnyRunChannel, int]]:
+        """(channel, seq) for a `Last-Event-ID` header, or None if the run is unknown."""
+        run_id, _, seq = last_event_id.strip().partition(":")
+        if not seq.isdigit():
+            return None
+        channel: Optional[AnyRunChannel] = self._by_id.get(run_id) or self._recent.peek(run_id)
+        remote = False
+        if channel is None and self._shared is not None:
+            channel = await asyncio.to_thread(self._remote, run_id)
+            remote = True
+        if channel is None:
+            return None
+        with self._lock:
+            self.resumed += 1
+            self.resumed_remote += int(remote)
+        return channel, int(seq)
+
+    def finish(self, channel: RunChannel) -> None:
+        """Unregister the run and close its channel after the events already published."""
+        if self._runs.get(channel.key) is channel:
+            del self._runs[channel.key]
+        self._by_id.pop(channel.run_id, None)
+        self._recent.put(channel.run_id, channel)
+        if self._shared is not None:
+            self._mirror(self._shared.delete, f"key:{run_key_digest(channel.key)}")
+        channel.close_soon()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "active_runs": len(self._runs),
+                "subscribers": sum(c.subscriber_count for c in self._runs.values()),
+                "recent_runs": len(self._recent),
+                "runs_started": self.started,
+                "runs_joined": self.joined,
+                "runs_joined_remote": self.joined_remote,
+                "streams_resumed": self.resumed,
+                "streams_resumed_remote": self.resumed_remote,
+                "shared": self._shared is not None,
+            }
@@ -0,0 +1,199 @@
+# src/api/log_translation.py
+"""
+Off-the-hot-path translation of streamed log lines.
+
+The workflow's log callback only hands lines to a `LogTranslator`, which
+never blocks on an LLM call. Catalog lines (`LogEvent`) are rendered from
+their precomputed translation and only their free-form params need an LLM;
+other lines are translated whole. Texts are micro-batched into one
+translation call every LOG_TRANSLATION_BATCH_MS, repeated texts come from the
+translation memory, and lines are emitted in their original order.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..messages import LogEvent
+from .translate import lookup_translation, translate_batch
+
+LOG_TRANSLATION_BATCH_MS = int(os.getenv("LOG_TRANSLATION_BATCH_MS", "300"))
+LOG_TRANSLATION_MAX_BATCH = int(os.getenv("LOG_TRANSLATION_MAX_BATCH", "20"))
+
+_TRANSLATE_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="log-translate")
+
+
+class _FlushScheduler:
+    """One daemon thread that starts translator flushes when their batch window ends."""
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, "LogTranslator"]] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, deadline: float, translator: "LogTranslator") -> None:
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name="log-translate-scheduler", daemon=True
+                )
+                self._thread.start()
+            heapq.heappush(self._heap, (deadline, next(self._counter), translator))
+            self._cond.notify()
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                deadline, _, translator = self._heap[0]
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+            _TRANSLATE_EXECUTOR.submit(translator._flush)
+
+
+_SCHEDULER = _FlushScheduler()
+
+
+class LogTranslator:
+    """
+    Per-request log translator.
+
+    `submit` is non-blocking; `emit` receives translated lines in submit
+    order from a background thread. Call `close` before sending the final
+    event so every log line is out first.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[str], None],
+        target_lang: str = "Chinese",
+        batch_ms: int = LOG_TRANSLATION_BATCH_MS,
+        max_batch: int = LOG_TRANSLATION_MAX_BATCH,
+        seed: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self._emit = emit
+        # Known translations for this request, e.g. {english_query: original_query}
+        self._seed: Dict[str, str] = dict(seed or {})
+        self.target_lang = target_lang
+        self._batch_s = batch_ms / 1000.0
+        self._max_batch = max_batch
+        self._pending: List[str] = []
+        self._busy = False        # a flush is running
+        self._scheduled = False   # a flush is queued in the scheduler
+        self._closing = False
+        self._cond = threading.Condition()
+
+    def seed(self, source: str, translation: str) -> None:
+        """Register a translation known up front (e.g. the user's own query)."""
+        with self._cond:
+            self._seed[source] = translation
+
+    def _lookup(self, text: str) -> Optional[str]:
+        if text in self._seed:
+            return self._seed[text]
+        return lookup_translation(text, self.target_lang)
+
+    def _texts_needed(self, msg: str) -> List[str]:
+        """Texts an LLM would have to translate to render `msg`."""
+        if isinstance(msg, LogEvent):
+            return msg.free_texts()
+        return [msg]
+
+    def _render(self, msg: str, translated: Dict[str, str]) -> str:
+        if isinstance(msg, LogEvent):
+            return msg.render(self.target_lang, lambda t: translated.get(t, t))
+        return translated.get(msg, msg)
+
+    def submit(self, msg: str) -> None:
+        with self._cond:
+            if not self._pending and not self._busy:
+                # Nothing queued ahead of it: if no LLM call is needed, emit
+                # straight away (order is preserved)
+                known: Dict[str, str] = {}
+                for text in self._texts_needed(msg):
+                    hit = self._lookup(text)
+                    if hit is None:
+                        break
+                    known[text] = hit
+                else:
+                    self._emit(self._render(msg, known))
+                    return
+            self._pending.append(msg)
+            self._schedule_locked()
+
+    def _schedule_locked(self) -> None:
+        if self._busy or self._scheduled or not self._pending:
+            return
+        self._scheduled = True
+        if self._closing or len(self._pending) >= self._max_batch:
+            _TRANSLATE_EXECUTOR.submit(self._flush)
+        else:
+            _SCHEDULER.schedule(time.monotonic() + self._batch_s, self)
+
+    def _flush(self) -> None:
+        with self._cond:
+            if self._busy or not self._pending:
+                # Another flush owns the queue (or already drained it); it reschedules
+                return
+            batch = self._pending[: self._max_batch]
+            del self._pending[: self._max_batch]
+            self._busy = True
+            self._scheduled = False
+
+        translated: Dict[str, str] = {}
+        try:
+            misses: List[str] = []
+            for msg in batch:
+                for text in self._texts_needed(msg):
+                    hit = self._lookup(text)
+                    if hit is not None:
+                        translated[text] = hit
+                    elif text not in misses:
+                        misses.append(text)
+            if misses:
+                # translate_batch stores the results in the translation memory
+                for text, out in zip(misses, translate_batch(misses, self.target_lang)):
+                    translated[text] = out
+        except Exception as e:
+            print("Log translation failed, sending original lines:", e)
+        finally:
+            with self._cond:
+                for msg in batch:
+                    self._emit(self._render(msg, translated))
+                self._busy = False
+                self._schedule_locked()
+                self._cond.notify_all()
+
+    def close(self, timeout: float = 30.0) -> None:
+        """Flush everything still pending and wait until it has been emitted."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._closing = True
+            if self._pending and not self._busy:
+                # Skip the rest of the batch window
+                self._scheduled = True
+                _TRANSLATE_EXECUTOR.submit(self._flush)
+            while self._pending or self._busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            leftovers, self._pending = self._pending, []
+            for msg in leftovers:
+                self._emit(self._render(msg, {}))
+
+    def discard(self) -> None:
+        """Drop everything still pending without translating it (client is gone)."""
+        with self._cond:
+            self._pending.clear()
+            self._closing = True
@@ -16,6 +16,8 @@ class ChatRequest(BaseModel):
     message: str
     # Optional manual override; if provided and valid, we use it.
     topic: Optional[str] = None
+    # Skip the result cache and run the workflow again
+    force_refresh: bool = False
 
 
 class ChatResponse(BaseModel):
@@ -23,3 +25,15 @@ class ChatResponse(BaseModel):
     download_url: Optional[str] = None
     topic_used: Optional[str] = None
     logs: List[str] = []
+    # True when the reply was served from the result cache
+    cached: bool = False
+
+
+class ChatRunRequest(BaseModel):
+    """A `start` message on the /chat_ws WebSocket."""
+    message: str
+    # Client-chosen id echoed on every event of the run (generated if omitted)
+    run_id: Optional[str] = None
+    model: Optional[str] = None
+    temperature: Optional[float] = None
+    force_refresh: bool = False
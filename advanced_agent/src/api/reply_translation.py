@@ -0,0 +1,119 @@
+# src/api/reply_translation.py
+"""
+Chunked translation of the final reply.
+
+Instead of one huge `translate_text` call, the formatted reply is split along
+its own structure (results header, one block per item, the recommendations /
+analysis part in paragraph-sized pieces), the chunks are translated
+concurrently with bounded parallelism, and each translated section is handed
+to a callback in order as soon as it is ready. Chunks go through the shared
+translation memory, so an item block seen in an earlier reply is not
+translated again.
+"""
+from __future__ import annotations
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from .translate import translate_text
+
+REPLY_TRANSLATION_WORKERS = int(os.getenv("REPLY_TRANSLATION_WORKERS", "4"))
+# Analysis sections longer than this are split further on blank lines
+REPLY_TRANSLATION_CHUNK_CHARS = int(os.getenv("REPLY_TRANSLATION_CHUNK_CHARS", "1500"))
+
+_REPLY_EXECUTOR = ThreadPoolExecutor(
+    max_workers=REPLY_TRANSLATION_WORKERS, thread_name_prefix="reply-translate"
+)
+
+# Lines that start a new section; kept in sync with splitReplyIntoBubbles in chat-ui.ts
+_RESULTS_RE = re.compile(r"^\**\s*📊")
+_ITEM_RE = re.compile(r"^\**\s*\d+\.\s*\**\s*🏢")
+_ANALYSIS_RE = re.compile(r"^\**\s*(Recommendations|Summary)\b")
+
+
+def _starts_section(line: str) -> bool:
+    stripped = line.strip()
+    return bool(
+        _RESULTS_RE.match(stripped)
+        or _ITEM_RE.match(stripped)
+        or _ANALYSIS_RE.match(stripped)
+    )
+
+
+def _split_long(section: str, max_chars: int) -> List[str]:
+    """Split an oversized section on paragraph boundaries."""
+    if len(section) <= max_chars:
+        return [section]
+    chunks: List[str] = []
+    current = ""
+    for para in re.split(r"\n\s*\n", section):
+        if current and len(current) + len(para) + 2 > max_chars:
+            chunks.append(current)
+            current = para
+        else:
+            current = f"{current}\n\n{para}" if current else para
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_reply_sections(
+    text: str, max_chars: int = REPLY_TRANSLATION_CHUNK_CHARS
+) -> List[str]:
+    """
+    Split a `format_result_text` reply into structure-preserving sections.
+    Joining the sections with a blank line gives back the same layout.
+    """
+    sections: List[str] = []
+    current: List[str] = []
+
+    def flush() -> None:
+        block = "\n".join(current).strip("\n")
+        if block.strip():
+            sections.extend(_split_long(block, max_chars))
+        current.clear()
+
+    for line in text.splitlines():
+        if _starts_section(line):
+            flush()
+        current.append(line)
+    flush()
+    return sections
+
+
+def translate_chunk(text: str, target_lang: str) -> str:
+    """Translate one section (through the translation memory)."""
+    try:
+        return translate_text(text, target_lang)
+    except Exception as e:
+        print("Reply chunk translation failed, keeping original text:", e)
+        return text
+
+
+def translate_reply(
+    text: str,
+    target_lang: str,
+    on_section: Optional[Callable[[int, int, str], None]] = None,
+) -> str:
+    """
+    Translate a full reply chunk by chunk.
+
+    All chunks are submitted at once (at most REPLY_TRANSLATION_WORKERS run
+    concurrently); `on_section(index, total, translated)` is called in
+    section order as soon as each one and all before it are done.
+    Returns the whole translated reply.
+    """
+    sections = split_reply_sections(text)
+    if not sections:
+        return text
+
+    futures = [_REPLY_EXECUTOR.submit(translate_chunk, s, target_lang) for s in sections]
+    translated: List[str] = []
+    for i, future in enumerate(futures):
+        part = future.result()
+        translated.append(part)
+        if on_section is not None:
+            on_section(i, len(sections), part)
+    return "\n\n".join(translated)
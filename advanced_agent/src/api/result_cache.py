@@ -0,0 +1,138 @@
+# src/api/result_cache.py
+"""
+Cache of finished research runs.
+
+A full run (extract -> research -> analyze + highlighting) takes 30-60s, and
+popular questions are asked many times a day. Entries are keyed by
+(topic_key, query, model, output language) and hold the final state, the
+rendered reply, the artifact paths and the log lines the run emitted, so a
+hit can be replayed to the client right away. The query goes through
+`exact_query`, which keeps punctuation such as "C#" or "Node.js": replaying
+the answer to a different question is worse than a miss.
+
+Entries expire after RESULT_CACHE_TTL_S seconds, and are dropped early when
+one of their saved files is gone. Requests can bypass the cache with
+`force_refresh`.
+
+Entries live in the "results" namespace of the state backend, so with a
+shared STATE_BACKEND every worker replays runs finished by the others (the
+artifact check then also accepts files published to the ArtifactStore).
+Hit/miss counters are per process.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..state_backend import STATE, StateBackend
+from .cache_utils import exact_query
+
+ResultKey = Tuple[str, str, str, str]
+
+
+@dataclass
+class CachedResult:
+    state: Any
+    reply: str
+    doc_path: str
+    slides_path: Optional[str] = None
+    topic_label: str = ""
+    # log lines as the client saw them (already in the output language)
+    logs: List[str] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+
+    def age_seconds(self) -> float:
+        return time.time() - self.created_at
+
+    def artifacts_exist(self, need_slides: bool, exists: Callable[[str], bool] = os.path.exists) -> bool:
+        if not exists(self.doc_path):
+            return False
+        if need_slides:
+            return bool(self.slides_path) and exists(self.slides_path)
+        return True
+
+
+class ResultCache:
+    def __init__(
+        self,
+        ttl_seconds: float = 21600.0,
+        max_size: int = 256,
+        backend: StateBackend = STATE,
+        artifact_exists: Callable[[str], bool] = os.path.exists,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries = backend.namespace("results", ttl=ttl_seconds, max_size=max_size)
+        self._artifact_exists = artifact_exists
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.bypassed = 0
+        self.stored = 0
+
+    @staticmethod
+    def key(topic_key: str, query: str, model: str, language: str) -> ResultKey:
+        return (topic_key, exact_query(query), model, language)
+
+    @classmethod
+    def storage_key(cls, topic_key: str, query: str, model: str, language: str) -> str:
+        raw = "\x1f".join(cls.key(topic_key, query, model, language))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(
+        self,
+        topic_key: str,
+        query: str,
+        model: str,
+        language: str,
+        need_slides: bool = False,
+    ) -> Optional[CachedResult]:
+        """Fresh entry for the run, or None. `need_slides`: the caller replays the slides link too."""
+        key = self.storage_key(topic_key, query, model, language)
+        entry = self._entries.get(key)
+        if entry is not None and (
+            entry.age_seconds() > self.ttl_seconds
+            or not entry.artifacts_exist(need_slides, self._artifact_exists)
+        ):
+            self._entries.delete(key)
+            with self._lock:
+                self.expired += 1
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return entry
+
+    def put(self, topic_key: str, query: str, model: str, language: str, result: CachedResult) -> None:
+        if not exact_query(query):
+            return
+        self._entries.set(self.storage_key(topic_key, query, model, language), result)
+        with self._lock:
+            self.stored += 1
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self.bypassed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self._entries.backend.name,
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expired": self.expired,
+                "bypassed": self.bypassed,
+                "stored": self.stored,
+            }
@@ -1,25 +1,208 @@
 # src/api/routes/chat.py
 import os
 import json
-import threading
-from typing import Optional
-from queue import Queue
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from ...cancellation import CANCELLATION_STATS, CancellationToken, WorkflowCancelled
+from ...llm_hedge import HEDGE_POLICY
+from ...messages import localized_topic_label, render_message
+from ...metrics import RENDER_SECONDS, STREAM_STARTUP_SECONDS
 from ...save_utils import format_result_text, save_result_document_raw, save_result_slides
 from ..models import ChatRequest, ChatResponse
-from ..deps import TOPIC_WORKFLOWS, classify_topic_with_llm
-from ..translate import is_chinese, translate_text
+from ..deps import (
+    ARTIFACTS,
+    INFLIGHT_RUNS,
+    RESULT_CACHE,
+    RUN_SCHEDULER,
+    TOPIC_DOMAINS,
+    TOPIC_WORKFLOWS,
+    classify_topic,
+    guess_topic,
+)
+from ..inflight_runs import DONE, AnyRunChannel, RunChannel
+from ..log_translation import LogTranslator
+from ..result_cache import CachedResult
+from ..reply_translation import translate_reply
+from ..translate import TRANSLATION_MEMORY, is_chinese, translate_label, translate_text
+from ...state_backend import STATE
+from ...tracing import span, start_trace, use_span
 
 router = APIRouter()
 
 SAVED_DOCS_DIR = "saved_docs"
 
+# Startup work of /chat_stream (classification, speculative search)
+STARTUP_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="chat-startup")
+
+# Blocking work around the runs of /chat and /chat_stream: classification,
+# stream startup, reply formatting/translation and saving artifacts. The runs
+# themselves (`workflow.arun`) and the streams are async and hold no thread.
+# How many runs may start is decided by RUN_SCHEDULER.
+CHAT_WORKFLOW_WORKERS = int(os.getenv("CHAT_WORKFLOW_WORKERS", "32"))
+WORKFLOW_EXECUTOR = ThreadPoolExecutor(
+    max_workers=CHAT_WORKFLOW_WORKERS, thread_name_prefix="chat-workflow"
+)
+
+# Fallback topic when nothing better is known (admission guess, unknown topic)
+DEFAULT_TOPIC_KEY = "developer_tools"
+
+# Model used when the request doesn't pick one (also the workflows' default)
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# While a stream is idle, check for a disconnected client this often (seconds)
+DISCONNECT_POLL_S = float(os.getenv("CHAT_DISCONNECT_POLL_S", "2"))
+
+# How soon a dropped EventSource should reconnect (sent as the SSE `retry:` field)
+SSE_RETRY_MS = int(os.getenv("CHAT_SSE_RETRY_MS", "2000"))
+
+
+def run_in_workflow_executor(fn: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+    """
+    Run `fn` on the workflow executor in a fresh copy of the current context,
+    so per-run workflow state (`set_llm`, `set_log_callback`) stays private
+    to this request.
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return loop.run_in_executor(WORKFLOW_EXECUTOR, ctx.run, fn, *args)
+
+
+def admit_run(domain: str):
+    """Reserve a run in `domain` or fail fast with 429 + Retry-After."""
+    ticket = RUN_SCHEDULER.admit(domain)
+    if ticket is None:
+        retry_after = RUN_SCHEDULER.retry_after(domain)
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many requests for '{domain}' topics, retry in {retry_after}s",
+            headers={"Retry-After": str(retry_after)},
+        )
+    return ticket
+
+
+def sse_event(item: str, event_id: Optional[str] = None) -> str:
+    if event_id is None:
+        return f"data: {item}\n\n"
+    return f"id: {event_id}\ndata: {item}\n\n"
+
+
+async def next_event(q: "asyncio.Queue[Tuple[Any, str]]", request: Request) -> Optional[Tuple[Any, str]]:
+    """Next queued event; None once the client has disconnected."""
+    while True:
+        try:
+            return await asyncio.wait_for(q.get(), timeout=DISCONNECT_POLL_S)
+        except asyncio.TimeoutError:
+            if await request.is_disconnected():
+                return None
+
+
+class ChatRun:
+    """
+    One client's view of a chat run: the queue its events arrive on, the
+    drive task feeding it and its root span. Built by `start_chat_run`; the
+    SSE stream and the WebSocket transport read it the same way, so both
+    send the same events.
+    """
+
+    def __init__(
+        self,
+        q: "asyncio.Queue[Tuple[Optional[str], str]]",
+        root: Any,
+        cancel_token: CancellationToken,
+        started: float,
+    ) -> None:
+        self.q = q
+        self.root = root
+        self.cancel_token = cancel_token
+        self.started = started
+        self.task: Optional["asyncio.Task[None]"] = None
+        # Shared run followed; set by the drive task once the topic is known
+        self.channel: Optional[AnyRunChannel] = None
+        # False once the client can't come back (explicit cancel, closed socket):
+        # the shared run is then released without the resume grace period
+        self.resumable = True
+        self.finished = False
+        self.timings: Dict[str, float] = {}
+
+    def observe(self, item: str) -> None:
+        """Record startup timings and completion for an event about to be sent."""
+        elapsed_ms = (time.perf_counter() - self.started) * 1000
+        if "first_event_ms" not in self.timings:
+            self.timings["first_event_ms"] = elapsed_ms
+            STREAM_STARTUP_SECONDS.observe(elapsed_ms / 1000, phase="first_event")
+        if "topic_event_ms" not in self.timings and item.startswith('{"type": "topic"'):
+            self.timings["topic_event_ms"] = elapsed_ms
+            STREAM_STARTUP_SECONDS.observe(elapsed_ms / 1000, phase="topic_event")
+            print(
+                f"[timing] chat_stream first event {self.timings['first_event_ms']:.0f} ms, "
+                f"topic event {elapsed_ms:.0f} ms"
+            )
+        if item.startswith('{"type": "final"'):
+            self.finished = True
+
+    def close(self, reason: str = "client disconnected", resumable: bool = True) -> None:
+        """
+        The client stopped reading. An unfinished run is left: cancelled right
+        away while still starting up, else once no client follows the shared
+        run anymore (see `follow`).
+        """
+        if not self.finished and self.task is not None and not self.task.done():
+            print(f"[chat_stream] {reason}")
+            self.resumable = resumable
+            if self.channel is None:
+                # still starting up: nothing shared yet, stop right here
+                self.cancel_token.cancel(reason)
+            self.task.cancel()
+        self.root.set_attributes(finished=self.finished, **self.timings)
+        self.root.end()
+
+
+def resume_stream(request: Request, run: AnyRunChannel, after_seq: int) -> Response:
+    """Continue a dropped stream of `run` after event `after_seq`."""
+    if run.done and run.last_seq <= after_seq:
+        # nothing left to send; 204 tells EventSource to stop reconnecting
+        return Response(status_code=204)
+
+    root = start_trace("chat_stream.resume", after_seq=after_seq)
+
+    async def event_generator():
+        sub = run.subscribe(after_seq)
+        sent = 0
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            while True:
+                event = await next_event(sub, request)
+                if event is None:
+                    break
+                seq, item = event
+                if item == DONE:
+                    break
+                sent += 1
+                yield sse_event(item, run.event_id(seq))
+        finally:
+            if run.unsubscribe(sub) == 0:
+                run.release_later("all clients disconnected")
+            root.set_attribute("events", sent)
+            root.end()
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(req: ChatRequest) -> ChatResponse:
-    # 1) Decide topic: use user override if valid, else classify with LLM
+    root = start_trace("chat", query_chars=len(req.message), topic_override=req.topic)
+    with use_span(root):
+        return await _chat(req, root)
+
+
+async def _chat(req: ChatRequest, root: Any) -> ChatResponse:
+    # 1) Decide topic: use user override if valid, else route (lexical router, then LLM)
     if req.topic is not None and req.topic in TOPIC_WORKFLOWS:
         topic = req.topic
     elif req.topic is not None and req.topic not in TOPIC_WORKFLOWS:
@@ -31,132 +214,538 @@ async def chat(req: ChatRequest) -> ChatResponse:
             ),
         )
     else:
-        topic, topic_label = classify_topic_with_llm(req.message)
+        topic, topic_label = await run_in_workflow_executor(classify_topic, req.message)
 
     workflow = TOPIC_WORKFLOWS[topic]
+    root.set_attribute("topic", topic)
 
-    # 2) Run the selected workflow
-    result = workflow.run(req.message)
-    reply_text = format_result_text(req.message, result)
+    # 2) Same question answered recently? Serve the saved result.
+    if req.force_refresh:
+        RESULT_CACHE.record_bypass()
+    else:
+        # the result cache may live in SQLite/Redis: look it up off the event loop
+        cached = await asyncio.to_thread(RESULT_CACHE.get, topic, req.message, DEFAULT_MODEL, "English")
+        root.set_attribute("cache_hit", cached is not None)
+        if cached is not None:
+            return ChatResponse(
+                reply=cached.reply,
+                download_url=f"/download/{os.path.basename(cached.doc_path)}",
+                topic_used=topic,
+                logs=cached.logs,
+                cached=True,
+            )
+
+    # 3) Run the selected workflow natively async, once admitted
+    ticket = admit_run(TOPIC_DOMAINS[topic])
+    try:
+        await RUN_SCHEDULER.wait_for_slot(ticket)
+        result = await workflow.arun(req.message)
+        with span("render.format_reply"):
+            reply_text = await run_in_workflow_executor(format_result_text, req.message, result)
+    finally:
+        RUN_SCHEDULER.release(ticket)
 
     # 🆕 get logs from the result state
     logs = getattr(result, "log_messages", []) or []
 
-    # 3) Save summary to a file for download
-    path = save_result_document_raw(req.message, reply_text)
+    # 4) Save summary to a file for download (file and backend writes: on the executor)
+    def save() -> str:
+        path = save_result_document_raw(req.message, reply_text)
+        ARTIFACTS.publish(path)
+        RESULT_CACHE.put(
+            topic, req.message, DEFAULT_MODEL, "English",
+            CachedResult(state=result, reply=reply_text, doc_path=path, logs=list(logs)),
+        )
+        return path
+
+    path = await run_in_workflow_executor(save)
     filename = os.path.basename(path)
     download_url = f"/download/{filename}"
 
     return ChatResponse(reply=reply_text, download_url=download_url, topic_used=topic, logs=logs)
 
 
+@router.get("/translation_stats")
+async def translation_stats():
+    """Hit rates and sizes of the shared translation memory (LRU + SQLite)."""
+    return TRANSLATION_MEMORY.stats()
+
+
+@router.get("/scheduler_stats")
+async def scheduler_stats():
+    """Running / queued / rejected runs per domain."""
+    return RUN_SCHEDULER.stats()
+
+
+@router.get("/result_cache_stats")
+async def result_cache_stats():
+    """Hits, misses and bypasses of the finished-run cache."""
+    return RESULT_CACHE.stats()
+
+
+@router.get("/inflight_stats")
+async def inflight_stats():
+    """Runs currently streaming, and how many requests joined one instead of starting their own."""
+    return INFLIGHT_RUNS.stats()
+
+
+@router.get("/state_stats")
+async def state_stats():
+    """Which state backend this worker uses, its namespaces, and artifacts published/fetched."""
+    stats = await asyncio.to_thread(STATE.stats)
+    return {**stats, "artifacts": ARTIFACTS.stats()}
+
+
+@router.get("/cancellation_stats")
+async def cancellation_stats():
+    """Runs cancelled because the client went away, and the work that was skipped."""
+    return CANCELLATION_STATS.stats()
+
+
+@router.get("/hedge_stats")
+async def hedge_stats():
+    """Hedged LLM calls: per-provider calls, hedges, wins, losses and errors."""
+    if HEDGE_POLICY is None:
+        return {"enabled": False}
+    return {"enabled": True, **HEDGE_POLICY.stats()}
+
+
 @router.get("/chat_stream")
 async def chat_stream(
+    request: Request,
     message: str,
     model: Optional[str] = Query(None),
     temperature: Optional[str] = Query(None),
+    force_refresh: bool = Query(False),
 ):
     """
     Streaming chat endpoint using Server-Sent Events (SSE).
     The `message` comes from the query string, e.g. /chat_stream?message=...
+
+    Startup is overlapped: the response opens right away with the model/temperature
+    logs, then classification runs alongside a speculative prefetch of the
+    likely topic's first article search.
+
+    The stream is an async generator over an asyncio.Queue. The workflow runs
+    natively async (`workflow.arun`) in the request's drive task; only reply
+    formatting, translation and saving go to WORKFLOW_EXECUTOR. Events are
+    posted into the loop thread-safely from either side.
+
+    Runs go through RUN_SCHEDULER: over capacity the request gets 429 with
+    Retry-After; admitted requests that must wait get "queued" events with
+    their position and ETA.
+
+    Finished runs are kept in RESULT_CACHE; a repeated question (same topic,
+    normalized query, model and language) replays the saved logs and reply
+    immediately unless `force_refresh` is set.
+
+    Identical questions asked while a run is still going (same topic, query,
+    model, temperature, language) share that run through INFLIGHT_RUNS: the
+    later stream gets a replay of the run's events so far, then live ones.
+
+    Run events carry SSE ids (`<run_id>:<seq>`). A reconnecting EventSource
+    sends `Last-Event-ID` and continues the same run after that event,
+    instead of starting a new one.
+
+    If the client disconnects, its stream leaves the run. Once no stream
+    follows the run anymore (and none comes back within the resume grace
+    period), its CancellationToken and task are cancelled: in-flight LLM and
+    Firecrawl calls are abandoned and no reply translation, documents or
+    slides are produced.
     """
+    # Reconnect of a dropped EventSource: continue the run it was following
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id:
+        resumed = await INFLIGHT_RUNS.resume(last_event_id)
+        if resumed is not None:
+            print(f"[chat_stream] resuming run after event {last_event_id}")
+            return resume_stream(request, *resumed)
+
+    run = start_chat_run(message, model, temperature, force_refresh)
+
+    async def event_generator():
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            while True:
+                event = await next_event(run.q, request)
+                if event is None:
+                    break
+                event_id, item = event
+                if item == DONE:
+                    run.finished = True
+                    break
+                run.observe(item)
+                yield sse_event(item, event_id)
+        finally:
+            # Closed tab / EventSource.close(): leave the shared run; it is
+            # cancelled once no stream follows it (see `follow`)
+            run.close()
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+    )
+
+
+def start_chat_run(
+    message: str,
+    model: Optional[str] = None,
+    temperature: Optional[Any] = None,
+    force_refresh: bool = False,
+    trace_name: str = "chat_stream",
+) -> ChatRun:
+    """
+    Admit and start one chat run, returning the ChatRun its events arrive
+    on (see `chat_stream` for how a run proceeds). Raises HTTPException 429
+    when the run's domain is over capacity. Must be called on the event loop.
+    """
+    t_start = time.perf_counter()
     user_query = message
 
     # --- language detection ---
     user_is_chinese = is_chinese(user_query)
-    # Use an English query internally if Chinese
-    internal_query = (
-        translate_text(user_query, "English") if user_is_chinese else user_query
-    )
 
-    selected_model = model or "gpt-4o-mini"
+    selected_model = model or DEFAULT_MODEL
     selected_temperature = float(temperature) if temperature is not None else 0.1
 
     print("User selected model:", selected_model)
     print("User selected temperature:", selected_temperature)
 
-    # 1) classify topic
-    topic_key, topic_label = classify_topic_with_llm(internal_query)
+    # Admission: reserve a run in the likely domain (cheap guess, no LLM call).
+    # Over capacity, answer 429 before the stream opens.
+    admission_key = guess_topic(user_query) or DEFAULT_TOPIC_KEY
+    ticket = admit_run(TOPIC_DOMAINS[admission_key])
 
-    # 2) get the *instance* from TOPIC_WORKFLOWS
-    workflow = TOPIC_WORKFLOWS.get(topic_key)
-    if workflow is None:
-        workflow = TOPIC_WORKFLOWS.get("developer_tools")
-        topic_key = "developer_tools"
-        topic_label = "Developer Tools"
-
-    # If Chinese, we may also translate the topic label for UI
-    topic_label_display = (
-        translate_text(topic_label, "Chinese") if user_is_chinese else topic_label
+    # Root span of this request; the drive task and everything it starts
+    # (workflow nodes, research threads, Firecrawl/LLM calls) nest under it
+    root = start_trace(
+        trace_name,
+        model=selected_model,
+        temperature=selected_temperature,
+        language="Chinese" if user_is_chinese else "English",
+        query_chars=len(user_query),
+        force_refresh=force_refresh,
     )
-    q: Queue[str] = Queue()
 
-    def log_callback(msg: str) -> None:
-        out_msg = msg
-        if user_is_chinese:
-            # You can prefix if you want, but simplest: just translate the log
-            out_msg = translate_text(msg, "Chinese")
+    loop = asyncio.get_running_loop()
+    # (SSE id or None, payload)
+    q: "asyncio.Queue[Tuple[Optional[str], str]]" = asyncio.Queue()
+    cancel_token = CancellationToken()
+    chat_run = ChatRun(q, root, cancel_token, t_start)
+    # Shared run this stream follows; set once the topic is known
+    channel: Optional[AnyRunChannel] = None
+    # True if this request started `channel` (its closures publish the run's events)
+    owns_run = False
+
+    def post(item: str) -> None:
+        """
+        Thread-safe publish of an event (called from worker threads): into the
+        shared run's channel once this request owns one, else into `q`.
+        """
+        if cancel_token.cancelled:
+            # nobody is reading anymore; don't let the queue grow
+            CANCELLATION_STATS.record_dropped_event()
+            return
+        if owns_run:
+            channel.publish(item)
+        else:
+            loop.call_soon_threadsafe(q.put_nowait, (None, item))
+
+    # Log lines of the workflow run, stored with the result for cache replays
+    run_logs: List[str] = []
+    capture_logs = False
+
+    def emit_log(out_msg: str) -> None:
+        if capture_logs:
+            run_logs.append(out_msg)
         payload = {"type": "log", "message": out_msg}
-        q.put(json.dumps(payload))
+        post(json.dumps(payload))
 
-    # Initial log messages (model + temp)
-    q.put(json.dumps({"type": "log", "message": f"📌 Model selected: {selected_model}"}))
-    q.put(json.dumps({"type": "log", "message": f"🎛️ Temperature set to: {selected_temperature}"}))
+    # Chinese log lines are rendered from the message catalog; free-form parts
+    # are translated in micro-batches off the workflow thread
+    log_translator = LogTranslator(emit_log, "Chinese") if user_is_chinese else None
+    output_lang = "Chinese" if user_is_chinese else "English"
 
-    def run_workflow():
-        # set callback just for this run
+    def log_callback(msg: str) -> None:
+        if log_translator is not None:
+            log_translator.submit(msg)
+        else:
+            emit_log(msg)
+
+    # Initial log messages (model + temp) go out before any LLM call
+    emit_log(render_message("model_selected", output_lang, model=selected_model))
+    emit_log(render_message("temperature_set", output_lang, temperature=selected_temperature))
+
+    def classify(internal_query: str):
+        with span("classify"):
+            topic_key, topic_label = classify_topic(internal_query)
+        if TOPIC_WORKFLOWS.get(topic_key) is None:
+            topic_key, topic_label = DEFAULT_TOPIC_KEY, "Developer Tools"
+        return topic_key, topic_label
+
+    def prefetch(workflow: Any, topic_key: str, internal_query: str) -> Any:
+        with span("prefetch", topic=topic_key):
+            return workflow.prefetch_articles(internal_query)
+
+    def start_request() -> tuple:
+        """Translate (if needed), then classify while speculatively prefetching."""
+        # Use an English query internally if Chinese
+        internal_query = (
+            translate_text(user_query, "English") if user_is_chinese else user_query
+        )
+        if log_translator is not None:
+            # "Finding articles about: {query}" should show what the user typed
+            log_translator.seed(internal_query, user_query)
+
+        guessed_key = guess_topic(internal_query)
+        guessed_workflow = TOPIC_WORKFLOWS.get(guessed_key) if guessed_key else None
+
+        # copy_context: both run under the request's root span
+        classify_future = STARTUP_EXECUTOR.submit(
+            contextvars.copy_context().run, classify, internal_query
+        )
+        prefetch_future: Optional[Future] = None
+        if guessed_workflow is not None:
+            prefetch_future = STARTUP_EXECUTOR.submit(
+                contextvars.copy_context().run, prefetch, guessed_workflow, guessed_key, internal_query
+            )
+
+        topic_key, topic_label = classify_future.result()
+        cancel_token.check("startup")
+
+        if topic_key != guessed_key:
+            # Wrong guess: drop the prefetch if it hasn't started. If it is already
+            # running, its result stays in that workflow's Firecrawl cache.
+            if prefetch_future is not None and prefetch_future.cancel():
+                print(f"[speculation] cancelled prefetch for '{guessed_key}'")
+
+        # Topic labels come from the message catalog; LLM only for unknown labels
+        topic_label_display = localized_topic_label(topic_key, topic_label, output_lang)
+        if topic_label_display is None:
+            topic_label_display = translate_label(topic_label, output_lang)
+        return internal_query, topic_key, topic_label_display
+
+    def error_event() -> str:
+        """Terminal event of a failed run: the client stops instead of reconnecting."""
+        return json.dumps({"type": "error", "message": render_message("run_failed", output_lang)})
+
+    def emit_queued(position: int, eta_seconds: float) -> None:
+        post(json.dumps({
+            "type": "queued",
+            "position": position,
+            "eta_seconds": eta_seconds,
+            "message": render_message(
+                "queued", output_lang, position=position, eta=int(eta_seconds)
+            ),
+        }))
+
+    def replay_cached(cached: CachedResult, topic_label_display: str) -> None:
+        """Stream a cached run: its log lines, then the saved reply and artifacts."""
+        emit_log(render_message(
+            "cached_result", output_lang, minutes=int(cached.age_seconds() // 60)
+        ))
+        for line in cached.logs:
+            emit_log(line)
+        post(json.dumps({
+            "type": "final",
+            "reply": cached.reply,
+            "sections_streamed": False,
+            "cached": True,
+            "download_url": f"/download/{os.path.basename(cached.doc_path)}",
+            "slides_download_url": f"/download/{os.path.basename(cached.slides_path or '')}",
+            "topic_used": topic_label_display,
+        }))
+
+    async def run_workflow(internal_query: str, topic_key: str, topic_label_display: str):
+        nonlocal capture_logs
+        # get the *instance* from TOPIC_WORKFLOWS
+        workflow = TOPIC_WORKFLOWS[topic_key]
+
+        # per-run settings live in context vars of this (drive) task
         workflow.set_llm(selected_model, selected_temperature)
         workflow.set_log_callback(log_callback)
+        workflow.set_cancel_token(cancel_token)
+        capture_logs = True
         try:
-            result = workflow.run(internal_query)
+            result = await workflow.arun(internal_query)
+        finally:
+            workflow.set_log_callback(None)
+            workflow.set_cancel_token(None)
+
+        await run_in_workflow_executor(
+            finish_run, internal_query, topic_key, result, topic_label_display
+        )
+
+    def finish_run(internal_query: str, topic_key: str, result: Any, topic_label_display: str) -> None:
+        """Format, translate and save the reply, then post the final event (blocking)."""
+        cancel_token.check("format_reply")
+        with RENDER_SECONDS.time(step="format_reply"), span("render.format_reply"):
             reply_text_en = format_result_text(internal_query, result)
 
-            # translate final reply back to Chinese if needed
-            reply_text = (
-                translate_text(reply_text_en, "Chinese")
-                if user_is_chinese
-                else reply_text_en
-            )
+        if log_translator is not None:
+            # every translated log line goes out before the answer
+            log_translator.close()
+
+        # translate final reply back to Chinese if needed, streaming each
+        # section to the client as soon as it is translated
+        if user_is_chinese:
+            cancel_token.check("reply_translation")
+            def emit_section(index: int, total: int, text: str) -> None:
+                post(json.dumps({
+                    "type": "reply_section",
+                    "index": index,
+                    "total": total,
+                    "text": text,
+                }))
+
+            reply_text = translate_reply(reply_text_en, "Chinese", on_section=emit_section)
+        else:
+            reply_text = reply_text_en
 
+        cancel_token.check("artifacts")
+        with RENDER_SECONDS.time(step="document"), span("render.document"):
             text_path = save_result_document_raw(user_query, reply_text)
-            text_filename = os.path.basename(text_path)
-            download_url = f"/download/{text_filename}"
+        ARTIFACTS.publish(text_path)
+        text_filename = os.path.basename(text_path)
+        download_url = f"/download/{text_filename}"
 
+        with RENDER_SECONDS.time(step="slides"), span("render.slides"):
             slides_path = save_result_slides(user_query, result)
-            slides_filename = os.path.basename(slides_path)
-            slides_download_url = f"/download/{slides_filename}"
-
-            final_payload = {
-                "type": "final",
-                "reply": reply_text,
-                "download_url": download_url,
-                "slides_download_url": slides_download_url,
-                "topic_used": topic_label_display,
-            }
-            q.put(json.dumps(final_payload))
-        finally:
-            workflow.set_log_callback(None)
-            q.put("__DONE__")
+        ARTIFACTS.publish(slides_path)
+        slides_filename = os.path.basename(slides_path)
+        slides_download_url = f"/download/{slides_filename}"
 
-    # Run workflow in background thread so we can stream logs
-    threading.Thread(target=run_workflow, daemon=True).start()
+        RESULT_CACHE.put(
+            topic_key, internal_query, selected_model, output_lang,
+            CachedResult(
+                state=result,
+                reply=reply_text,
+                doc_path=text_path,
+                slides_path=slides_path,
+                topic_label=topic_label_display,
+                logs=list(run_logs),
+            ),
+        )
 
-    def event_generator():
-        # First send topic info so UI can update title immediately
-        topic_payload = {
-            "type": "topic",
-            "topic_key": topic_key,
-            "topic_label": topic_label_display,
+        final_payload = {
+            "type": "final",
+            "reply": reply_text,
+            # the client already rendered the reply from reply_section events
+            "sections_streamed": user_is_chinese,
+            "download_url": download_url,
+            "slides_download_url": slides_download_url,
+            "topic_used": topic_label_display,
         }
-        yield f"data: {json.dumps(topic_payload)}\n\n"
+        post(json.dumps(final_payload))
 
-        while True:
-            item = q.get()
-            if item == "__DONE__":
-                break
-            yield f"data: {item}\n\n"
+    async def shared_run(run: RunChannel, internal_query: str, topic_key: str, topic_label_display: str) -> None:
+        """Wait for a run slot, then run; owned by the channel, not by one stream."""
+        try:
+            # Admission used a guess; queue in the classified topic's domain
+            RUN_SCHEDULER.reassign(ticket, TOPIC_DOMAINS[topic_key])
+            await RUN_SCHEDULER.wait_for_slot(ticket, on_position=emit_queued)
 
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-    )
\ No newline at end of file
+            await run_workflow(internal_query, topic_key, topic_label_display)
+        except WorkflowCancelled as e:
+            print(f"chat_stream run cancelled ({e})")
+        except asyncio.CancelledError:
+            print("chat_stream run cancelled (no clients left)")
+        except Exception as e:
+            print("chat_stream workflow failed:", repr(e))
+            post(error_event())
+        finally:
+            RUN_SCHEDULER.release(ticket)
+            if log_translator is not None:
+                if cancel_token.cancelled:
+                    log_translator.discard()
+                else:
+                    # flush on the executor: close() waits for pending batches
+                    await run_in_workflow_executor(log_translator.close)
+            INFLIGHT_RUNS.finish(run)
+
+    async def follow(run: AnyRunChannel) -> None:
+        """Copy the shared run's events (replay, then live) into this stream."""
+        sub = run.subscribe()
+        try:
+            while True:
+                seq, item = await sub.get()
+                if item == DONE:
+                    break
+                q.put_nowait((run.event_id(seq), item))
+        finally:
+            if run.unsubscribe(sub) == 0:
+                if chat_run.resumable:
+                    # cancelled unless a client resumes within the grace period
+                    run.release_later("all clients disconnected")
+                else:
+                    run.release("all clients gone")
+
+    async def drive() -> None:
+        """Startup, then start or join the shared run; events come back through `q`."""
+        nonlocal channel, owns_run
+        try:
+            internal_query, topic_key, topic_label_display = (
+                await run_in_workflow_executor(start_request)
+            )
+            post(json.dumps({
+                "type": "topic",
+                "topic_key": topic_key,
+                "topic_label": topic_label_display,
+            }))
+            root.set_attribute("topic", topic_key)
+
+            if force_refresh:
+                RESULT_CACHE.record_bypass()
+            else:
+                cached = await asyncio.to_thread(
+                    RESULT_CACHE.get,
+                    topic_key, internal_query, selected_model, output_lang, need_slides=True,
+                )
+                root.set_attribute("cache_hit", cached is not None)
+                if cached is not None:
+                    # no run needed: give the slot back before replaying
+                    RUN_SCHEDULER.release(ticket)
+                    replay_cached(cached, topic_label_display)
+                    return
+
+            run_key = INFLIGHT_RUNS.key(
+                topic_key, internal_query, selected_model, selected_temperature, output_lang
+            )
+            channel = await INFLIGHT_RUNS.join(run_key)
+            if channel is not None:
+                # same question is already running: follow it, no run of our own
+                RUN_SCHEDULER.release(ticket)
+                root.set_attribute("joined_run", True)
+                emit_log(render_message("joined_run", output_lang))
+            else:
+                channel = INFLIGHT_RUNS.start(run_key, cancel_token)
+                owns_run = True
+                channel.task = asyncio.create_task(
+                    shared_run(channel, internal_query, topic_key, topic_label_display)
+                )
+            chat_run.channel = channel
+            await follow(channel)
+        except WorkflowCancelled as e:
+            print(f"chat_stream run cancelled ({e})")
+            root.set_attribute("cancelled", True)
+        except asyncio.CancelledError:
+            print("chat_stream stream cancelled (client gone)")
+            root.set_attribute("cancelled", True)
+        except Exception as e:
+            print("chat_stream workflow failed:", repr(e))
+            root.record_error(e)
+            # startup or joining failed (a failing shared run reports itself
+            # to every follower in `shared_run`)
+            q.put_nowait((None, error_event()))
+        finally:
+            if not owns_run:
+                # startup failed, cache hit or joined run: the ticket and the
+                # translator are ours to clean up (else `shared_run` does it)
+                RUN_SCHEDULER.release(ticket)
+                if log_translator is not None:
+                    log_translator.discard()
+            q.put_nowait((None, DONE))
+
+    with use_span(root, end=False):
+        chat_run.task = asyncio.create_task(drive())
+    return chat_run
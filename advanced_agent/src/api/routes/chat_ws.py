@@ -0,0 +1,224 @@
+# src/api/routes/chat_ws.py
+"""
+WebSocket transport for chat runs: several concurrent runs over one
+connection, instead of one SSE connection per question (browsers allow only
+a handful of those per host).
+
+Client -> server (JSON text frames):
+  {"type": "start", "message": "...", "run_id": "a1", "model": ..., "temperature": ..., "force_refresh": false}
+  {"type": "cancel", "run_id": "a1"}
+  {"type": "pause", "run_id": "a1"} / {"type": "resume", "run_id": "a1"}
+  {"type": "ping"}
+
+Server -> client: the /chat_stream events (`topic`, `queued`, `log`,
+`reply_section`, `final`; a failed run sends {"type": "error", "message": ...}
+instead of `final`) unchanged, each with the `run_id` added, then one
+{"type": "done", "run_id": ..., "status": "finished" | "failed" | "cancelled"}
+per run. Problems come back as {"type": "error", "run_id": ..., "status": 400 | 404 | 409 | 429 | 500, "detail": ...}
+(plus "retry_after" for 429).
+
+Backpressure: frames go out through one bounded send queue. When the client
+reads slowly, the per-run forwarders block on it and events wait in the
+runs' own queues; a client that doesn't read a frame for
+CHAT_WS_SEND_TIMEOUT_S is disconnected. `pause` stops forwarding a run (its
+events are kept) until `resume`.
+
+Cancelling a run, or closing the socket, leaves the runs like a closed SSE
+stream does, without the resume grace period: a run nobody else follows is
+cancelled right away.
+"""
+import asyncio
+import json
+import os
+import uuid
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from ..inflight_runs import DONE
+from ..models import ChatRunRequest
+from .chat import ChatRun, start_chat_run
+
+router = APIRouter()
+
+# Concurrent runs per connection
+CHAT_WS_MAX_RUNS = int(os.getenv("CHAT_WS_MAX_RUNS", "8"))
+# Frames waiting to be written to the socket, across all runs
+CHAT_WS_SEND_QUEUE = int(os.getenv("CHAT_WS_SEND_QUEUE", "256"))
+# A client that doesn't take a frame for this long is dropped
+CHAT_WS_SEND_TIMEOUT_S = float(os.getenv("CHAT_WS_SEND_TIMEOUT_S", "30"))
+
+
+def tag_event(run_id: str, item: str) -> str:
+    """Add `run_id` to a serialized run event (a JSON object) without re-parsing it."""
+    return '{"run_id": ' + json.dumps(run_id) + ", " + item[1:]
+
+
+class ChatConnection:
+    def __init__(self, websocket: WebSocket) -> None:
+        self.websocket = websocket
+        self.outbox: "asyncio.Queue[str]" = asyncio.Queue(maxsize=CHAT_WS_SEND_QUEUE)
+        self.runs: Dict[str, ChatRun] = {}
+        self.forwarders: Dict[str, "asyncio.Task[None]"] = {}
+        # set: forward the run's events; cleared by `pause`
+        self.flowing: Dict[str, asyncio.Event] = {}
+
+    async def serve(self) -> None:
+        sender = asyncio.create_task(self._send_loop())
+        receiver = asyncio.create_task(self._receive_loop())
+        try:
+            # the sender gives up on a stalled or broken socket; then nothing
+            # would drain the outbox, so stop receiving too
+            await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            sender.cancel()
+            receiver.cancel()
+            for task in self.forwarders.values():
+                task.cancel()
+            for run in self.runs.values():
+                run.close("websocket closed", resumable=False)
+            self.runs.clear()
+
+    async def _receive_loop(self) -> None:
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            text = message.get("text")
+            try:
+                if text is None:
+                    await self.error(None, 400, "Only text frames are accepted")
+                else:
+                    await self._handle(text)
+            except (WebSocketDisconnect, asyncio.CancelledError):
+                raise
+            except Exception as e:
+                # one bad message must not take down the other runs on this socket
+                print(f"[chat_ws] failed to handle a message: {e!r}")
+                await self.error(None, 500, "Internal error handling the message")
+
+    async def _send_loop(self) -> None:
+        while True:
+            frame = await self.outbox.get()
+            try:
+                await asyncio.wait_for(self.websocket.send_text(frame), timeout=CHAT_WS_SEND_TIMEOUT_S)
+            except asyncio.TimeoutError:
+                print(f"[chat_ws] client not reading for {CHAT_WS_SEND_TIMEOUT_S:.0f}s, closing")
+                await self.websocket.close(code=1013)
+                return
+            except Exception:
+                # socket already gone; `serve` cleans up
+                return
+
+    async def send(self, payload: Dict[str, Any]) -> None:
+        await self.outbox.put(json.dumps(payload))
+
+    async def error(self, run_id: Optional[str], status: int, detail: str, **extra: Any) -> None:
+        await self.send({"type": "error", "run_id": run_id, "status": status, "detail": detail, **extra})
+
+    # ---------------------------
+    # Client messages
+    # ---------------------------
+    async def _handle(self, text: str) -> None:
+        try:
+            data = json.loads(text)
+            kind = data.get("type")
+        except (ValueError, AttributeError):
+            await self.error(None, 400, "Messages must be JSON objects")
+            return
+
+        run_id = data.get("run_id")
+        if run_id is not None and not isinstance(run_id, str):
+            await self.error(None, 400, "run_id must be a string")
+            return
+        if kind == "start":
+            await self._start(data)
+        elif kind == "cancel":
+            await self._cancel(run_id)
+        elif kind in ("pause", "resume"):
+            flowing = self.flowing.get(run_id)
+            if flowing is None:
+                await self.error(run_id, 404, "Unknown run")
+            elif kind == "pause":
+                flowing.clear()
+            else:
+                flowing.set()
+        elif kind == "ping":
+            await self.send({"type": "pong"})
+        else:
+            await self.error(run_id, 400, f"Unknown message type '{kind}'")
+
+    async def _start(self, data: Dict[str, Any]) -> None:
+        try:
+            req = ChatRunRequest.model_validate(data)
+        except ValidationError as e:
+            await self.error(data.get("run_id"), 400, str(e))
+            return
+        run_id = req.run_id or uuid.uuid4().hex[:12]
+        if run_id in self.runs:
+            await self.error(run_id, 409, "A run with this id is already going")
+            return
+        if len(self.runs) >= CHAT_WS_MAX_RUNS:
+            await self.error(run_id, 429, f"At most {CHAT_WS_MAX_RUNS} concurrent runs per connection")
+            return
+
+        try:
+            run = start_chat_run(
+                req.message, req.model, req.temperature, req.force_refresh, trace_name="chat_ws"
+            )
+        except HTTPException as e:
+            extra = {}
+            if e.headers and "Retry-After" in e.headers:
+                extra["retry_after"] = int(e.headers["Retry-After"])
+            await self.error(run_id, e.status_code, str(e.detail), **extra)
+            return
+
+        self.runs[run_id] = run
+        self.flowing[run_id] = asyncio.Event()
+        self.flowing[run_id].set()
+        self.forwarders[run_id] = asyncio.create_task(self._forward(run_id, run))
+
+    async def _cancel(self, run_id: Optional[str]) -> None:
+        task = self.forwarders.get(run_id)
+        if task is None:
+            await self.error(run_id, 404, "Unknown run")
+            return
+        task.cancel()
+        await asyncio.wait([task])
+        run = self._forget(run_id)
+        if run is None:
+            # it ended on its own meanwhile
+            return
+        run.close("cancelled by client", resumable=False)
+        await self.send({"type": "done", "run_id": run_id, "status": "cancelled"})
+
+    # ---------------------------
+    # Run events -> socket
+    # ---------------------------
+    async def _forward(self, run_id: str, run: ChatRun) -> None:
+        """Copy one run's events to the send queue (waits while paused or while the client lags)."""
+        while True:
+            _, item = await run.q.get()
+            if item == DONE:
+                break
+            run.observe(item)
+            await self.flowing[run_id].wait()
+            await self.outbox.put(tag_event(run_id, item))
+        status = "finished" if run.finished else "failed"
+        run.finished = True
+        self._forget(run_id)
+        run.close()
+        await self.send({"type": "done", "run_id": run_id, "status": status})
+
+    def _forget(self, run_id: str) -> Optional[ChatRun]:
+        self.forwarders.pop(run_id, None)
+        self.flowing.pop(run_id, None)
+        return self.runs.pop(run_id, None)
+
+
+@router.websocket("/chat_ws")
+async def chat_ws(websocket: WebSocket) -> None:
+    """Multiplexed chat runs over one WebSocket; see the module docstring for the protocol."""
+    await websocket.accept()
+    await ChatConnection(websocket).serve()
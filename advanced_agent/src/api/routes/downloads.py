@@ -1,32 +1,119 @@
 # src/api/routes/downloads.py
+import asyncio
 import os
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from urllib.parse import quote
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+
+from ..deps import ARTIFACTS, DOWNLOAD_CACHE
+from ..download_cache import Artifact, etag_matches, negotiate_encoding, parse_range
 
 router = APIRouter()
 
 SAVED_DOCS_DIR = "saved_docs"
 SAVED_SLIDES_DIR = "saved_slides"
 
+PPTX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+TEXT_MEDIA_TYPE = "text/plain; charset=utf-8"
+
+# Artifact names are timestamped and never rewritten
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def _read_range(path: str, start: int, end: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start + 1)
+
+
 @router.get("/download/{filename}")
-async def download_file(filename: str):
-    # pick media_type based on extension
+async def download_file(filename: str, request: Request):
+    # pick media_type based on extension; pptx is already zip-compressed
     if filename.lower().endswith(".pptx"):
-        file_path = os.path.join(SAVED_SLIDES_DIR, filename)
-        media_type = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
-        if not os.path.exists(file_path):
-            # You'd see a clean 404, not a 500
-            raise HTTPException(status_code=404, detail="File not found")
+        folder, media_type, compressible = SAVED_SLIDES_DIR, PPTX_MEDIA_TYPE, False
     else:
-        file_path = os.path.join(SAVED_DOCS_DIR, filename)
-        media_type = "text/plain; charset=utf-8"
-        if not os.path.exists(file_path):
+        folder, media_type, compressible = SAVED_DOCS_DIR, TEXT_MEDIA_TYPE, True
+
+    # Repeat downloads are answered from memory; otherwise a file saved by
+    # another worker is fetched from the shared state backend first (see
+    # ArtifactStore), then read and hashed once
+    artifact = DOWNLOAD_CACHE.peek(os.path.join(folder, filename))
+    if artifact is None:
+        file_path = await asyncio.to_thread(ARTIFACTS.ensure_local, folder, filename)
+        if file_path is None:
             # You'd see a clean 404, not a 500
             raise HTTPException(status_code=404, detail="File not found")
+        artifact = await asyncio.to_thread(DOWNLOAD_CACHE.load, file_path)
+
+    headers = {
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": _content_disposition(filename),
+    }
+    if compressible:
+        headers["Vary"] = "Accept-Encoding"
+
+    # A Range request gets the identity body (and is dropped if If-Range is stale)
+    range_header = request.headers.get("range")
+    if range_header is not None:
+        if_range = request.headers.get("if-range")
+        if if_range is not None and if_range.strip() != artifact.etag():
+            range_header = None
+
+    # Compressed variant for text, built once per artifact and encoding
+    encoding = None
+    body = artifact.body
+    if compressible and range_header is None:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        encoded = await asyncio.to_thread(DOWNLOAD_CACHE.encoded, artifact, encoding) if encoding else None
+        if encoded is None:
+            encoding = None
+        else:
+            body = encoded
+            headers["Content-Encoding"] = encoding
 
-    # Let FileResponse set Content-Disposition correctly
-    return FileResponse(
-        path=file_path,
-        media_type=media_type,
-        filename=filename,  # Starlette will generate the header safely
-    )
+    headers["ETag"] = artifact.etag(encoding)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, headers["ETag"]):
+        headers.pop("Content-Encoding", None)
+        headers.pop("Content-Disposition")
+        return Response(status_code=304, headers=headers)
+
+    if range_header is not None:
+        return await _range_response(artifact, range_header, media_type, headers)
+    if body is None:
+        # too large to keep in memory: stream it from disk
+        return FileResponse(path=artifact.path, media_type=media_type, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+async def _range_response(artifact: Artifact, range_header: str, media_type: str, headers: dict) -> Response:
+    """206 for one satisfiable byte range, 416 if unsatisfiable, full 200 if ignorable."""
+    try:
+        byte_range = parse_range(range_header, artifact.size)
+    except ValueError:
+        return Response(
+            status_code=416,
+            headers={**headers, "Content-Range": f"bytes */{artifact.size}"},
+        )
+    if byte_range is None:
+        # several ranges or a malformed header: send the whole file
+        if artifact.body is None:
+            return FileResponse(path=artifact.path, media_type=media_type, headers=headers)
+        return Response(content=artifact.body, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    if artifact.body is not None:
+        chunk = artifact.body[start : end + 1]
+    else:
+        chunk = await asyncio.to_thread(_read_range, artifact.path, start, end)
+    headers["Content-Range"] = f"bytes {start}-{end}/{artifact.size}"
+    return Response(content=chunk, status_code=206, media_type=media_type, headers=headers)
@@ -0,0 +1,14 @@
+# src/api/routes/health.py
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..deps import WARMUP
+
+router = APIRouter()
+
+
+@router.get("/ready")
+async def ready() -> JSONResponse:
+    """Readiness probe: 503 until the startup warm-up has finished."""
+    status = WARMUP.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
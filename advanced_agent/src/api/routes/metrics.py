@@ -0,0 +1,84 @@
+# src/api/routes/metrics.py
+from typing import Iterable, List
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ...cancellation import CANCELLATION_STATS
+from ...llm_hedge import HEDGE_POLICY
+from ...metrics import REGISTRY, CollectedMetric, render_latest
+from .. import deps
+from ..deps import DOWNLOAD_CACHE, INFLIGHT_RUNS, RESULT_CACHE, RUN_SCHEDULER, TOPIC_CACHE, TOPIC_WORKFLOWS
+from ..translate import TRANSLATION_MEMORY
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _collect_api_state() -> Iterable[CollectedMetric]:
+    """Gauges and counters read from the components that already track them."""
+    scheduler = RUN_SCHEDULER.stats()
+    for field, kind, help_text in (
+        ("running", "gauge", "Runs currently executing, per domain."),
+        ("queued", "gauge", "Runs waiting for a slot, per domain."),
+        ("admitted", "counter", "Runs admitted by the scheduler, per domain."),
+        ("rejected", "counter", "Runs rejected with 429, per domain."),
+    ):
+        yield (
+            f"agent_scheduler_{field}" + ("_total" if kind == "counter" else ""),
+            kind,
+            help_text,
+            [({"domain": domain}, stats[field]) for domain, stats in scheduler.items()],
+        )
+
+    inflight = INFLIGHT_RUNS.stats()
+    yield ("agent_active_runs", "gauge", "Streaming runs in this process.", [({}, inflight["active_runs"])])
+    yield ("agent_stream_subscribers", "gauge", "Streams following a run.", [({}, inflight["subscribers"])])
+    yield ("agent_runs_joined_total", "counter", "Requests that joined an identical in-flight run.",
+           [({}, inflight["runs_joined"])])
+    yield ("agent_streams_resumed_total", "counter", "Streams resumed via Last-Event-ID.",
+           [({}, inflight["streams_resumed"])])
+
+    cache_samples: List = []
+    result_cache = RESULT_CACHE.stats()
+    cache_samples += [({"cache": "result", "result": "hit"}, result_cache["hits"]),
+                      ({"cache": "result", "result": "miss"}, result_cache["misses"])]
+    topic_cache = TOPIC_CACHE.stats()
+    cache_samples += [({"cache": "topic", "result": "hit"}, topic_cache["hits"]),
+                      ({"cache": "topic", "result": "miss"}, topic_cache["misses"])]
+    translation = TRANSLATION_MEMORY.stats()
+    cache_samples += [({"cache": "translation", "result": "hit"}, translation["memory_hits"] + translation["db_hits"]),
+                      ({"cache": "translation", "result": "miss"}, translation["misses"])]
+    downloads = DOWNLOAD_CACHE.stats()
+    cache_samples += [({"cache": "download", "result": "hit"}, downloads["hits"]),
+                      ({"cache": "download", "result": "miss"}, downloads["loads"])]
+    yield ("agent_cache_lookups_total", "counter", "Cache lookups by cache and result.", cache_samples)
+
+    # TOPIC_ROUTER is rebuilt when the topic configs change; read it from deps
+    yield ("agent_topic_router_skipped_llm_total", "counter",
+           "Classifications answered by the lexical router without the LLM.",
+           [({}, deps.TOPIC_ROUTER.stats()["skipped_llm"])])
+
+    yield ("agent_workflows_built", "gauge", "Topic workflows constructed in this process.",
+           [({}, TOPIC_WORKFLOWS.stats()["built"])])
+
+    if HEDGE_POLICY is not None:
+        hedge = HEDGE_POLICY.stats()["providers"]
+        yield ("agent_llm_hedge_total", "counter",
+               "Hedged LLM calls per provider (outcome: calls, hedged, wins, losses, errors).",
+               [({"provider": provider, "outcome": outcome}, value)
+                for provider, counts in sorted(hedge.items()) for outcome, value in counts.items()])
+
+    cancelled = CANCELLATION_STATS.stats()
+    yield ("agent_runs_cancelled_total", "counter", "Runs cancelled because every client left.",
+           [({}, cancelled["runs_cancelled"])])
+
+
+REGISTRY.add_collector(_collect_api_state)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of this process's metrics."""
+    return PlainTextResponse(render_latest(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,13 +1,32 @@
 # src/api/routes/topics.py
+import asyncio
+
 from fastapi import APIRouter
 
 from ..models import TopicRequest, TopicResponse
-from ..deps import classify_topic_with_llm
+from .. import deps
+from ..deps import classify_topic as route_query_topic
 
 router = APIRouter()
 
 
 @router.post("/classify_topic", response_model=TopicResponse)
 async def classify_topic(req: TopicRequest) -> TopicResponse:
-    key, label = classify_topic_with_llm(req.message)
+    # may call the LLM and read the shared state backend: keep it off the loop
+    key, label = await asyncio.to_thread(route_query_topic, req.message)
     return TopicResponse(topic_key=key, topic_label=label)
+
+
+@router.get("/topic_router_stats")
+async def topic_router_stats():
+    """
+    How many LLM classifications the lexical router skipped, how often it
+    agreed with the LLM, and the classification cache hit rate.
+    """
+    return {**deps.TOPIC_ROUTER.stats(), "cache": deps.TOPIC_CACHE.stats()}
+
+
+@router.get("/workflow_stats")
+async def workflow_stats():
+    """Which topic workflows are built, how long construction took, and how often each is used."""
+    return deps.TOPIC_WORKFLOWS.stats()
@@ -0,0 +1,215 @@
+# src/api/run_scheduler.py
+"""
+Admission control for workflow runs.
+
+Each domain (tools / career / software_engineering) has a fixed number of
+concurrently running workflows and a bounded wait queue:
+
+- `admit(domain)` reserves a place in line, or returns None when the queue
+  is full so the API can answer 429 with a Retry-After hint right away.
+- `wait_for_slot(ticket, on_position)` waits (asynchronously, no thread) until
+  the run may start, reporting queue position changes and an ETA.
+- `release(ticket)` frees the slot and records the run time used for ETAs.
+
+Limits come from env vars, per domain first, then global:
+RUN_SCHEDULER_<DOMAIN>_MAX_RUNNING / RUN_SCHEDULER_MAX_RUNNING (default 4),
+RUN_SCHEDULER_<DOMAIN>_MAX_QUEUED / RUN_SCHEDULER_MAX_QUEUED (default 16).
+
+All methods must be called from the event loop thread.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, Optional
+
+# Used for ETAs until a domain has finished a few runs
+DEFAULT_RUN_SECONDS = float(os.getenv("RUN_SCHEDULER_DEFAULT_RUN_S", "45"))
+
+
+@dataclass
+class DomainLimits:
+    max_running: int = 4
+    max_queued: int = 16
+
+    @classmethod
+    def from_env(cls, domain: str) -> "DomainLimits":
+        prefix = f"RUN_SCHEDULER_{domain.upper()}_"
+
+        def read(name: str, default: int) -> int:
+            value = os.getenv(prefix + name) or os.getenv(f"RUN_SCHEDULER_{name}")
+            return int(value) if value else default
+
+        return cls(max_running=read("MAX_RUNNING", 4), max_queued=read("MAX_QUEUED", 16))
+
+
+@dataclass(eq=False)
+class RunTicket:
+    domain: str
+    admitted_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    _ready: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class _DomainQueue:
+    def __init__(self, limits: DomainLimits) -> None:
+        self.limits = limits
+        self.running = 0
+        self.waiting: Deque[RunTicket] = deque()
+        self.durations: Deque[float] = deque(maxlen=50)
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait_s = 0.0
+
+    def avg_run_seconds(self) -> float:
+        if not self.durations:
+            return DEFAULT_RUN_SECONDS
+        return sum(self.durations) / len(self.durations)
+
+    def eta_seconds(self, position: int) -> float:
+        """Rough wait for the ticket at 1-based `position` in the queue."""
+        waves = math.ceil(position / max(self.limits.max_running, 1))
+        return round(waves * self.avg_run_seconds(), 1)
+
+
+class RunScheduler:
+    def __init__(self, domains: Iterable[str]) -> None:
+        self._domains: Dict[str, _DomainQueue] = {
+            d: _DomainQueue(DomainLimits.from_env(d)) for d in domains
+        }
+        # Replaced (after being set) on every queue change; waiters hold the old one
+        self._changed = asyncio.Event()
+
+    def _queue(self, domain: str) -> _DomainQueue:
+        if domain not in self._domains:
+            self._domains[domain] = _DomainQueue(DomainLimits.from_env(domain))
+        return self._domains[domain]
+
+    # ---------------------------
+    # Admission
+    # ---------------------------
+    def admit(self, domain: str) -> Optional[RunTicket]:
+        """Reserve a place for a run in `domain`; None if its queue is full."""
+        dq = self._queue(domain)
+        if dq.running >= dq.limits.max_running and len(dq.waiting) >= dq.limits.max_queued:
+            dq.rejected += 1
+            return None
+        dq.admitted += 1
+        ticket = RunTicket(domain)
+        if dq.running < dq.limits.max_running and not dq.waiting:
+            self._start(dq, ticket)
+        else:
+            dq.waiting.append(ticket)
+        return ticket
+
+    def retry_after(self, domain: str) -> int:
+        """Seconds a rejected client should wait before retrying."""
+        dq = self._queue(domain)
+        return max(1, int(dq.eta_seconds(len(dq.waiting) + 1)))
+
+    def reassign(self, ticket: RunTicket, domain: str) -> None:
+        """
+        Move a ticket to another domain (admission used a cheap topic guess and
+        the classifier disagreed). A waiting ticket keeps its place in line; a
+        started one keeps running and now counts against `domain`. Either way
+        the new domain may briefly exceed its bounds.
+        """
+        if ticket.domain == domain:
+            return
+        old = self._queue(ticket.domain)
+        new = self._queue(domain)
+        ticket.domain = domain
+        if ticket.started_at is not None:
+            old.running -= 1
+            new.running += 1
+        else:
+            if ticket in old.waiting:
+                old.waiting.remove(ticket)
+            new.waiting.append(ticket)
+            self._pump(new)
+        self._pump(old)
+
+    # ---------------------------
+    # Waiting / running
+    # ---------------------------
+    def position(self, ticket: RunTicket) -> int:
+        """1-based position in the wait queue, 0 once the run may start."""
+        if ticket.started_at is not None:
+            return 0
+        try:
+            return self._queue(ticket.domain).waiting.index(ticket) + 1
+        except ValueError:
+            return 0
+
+    def eta_seconds(self, ticket: RunTicket) -> float:
+        return self._queue(ticket.domain).eta_seconds(self.position(ticket))
+
+    async def wait_for_slot(
+        self,
+        ticket: RunTicket,
+        on_position: Optional[Callable[[int, float], Any]] = None,
+    ) -> None:
+        """
+        Wait until `ticket` may run. `on_position(position, eta_seconds)` is
+        called whenever the ticket's queue position changes. If the waiting
+        task is cancelled (e.g. client gone), the ticket leaves the queue.
+        """
+        last_position = None
+        try:
+            while not ticket._ready.is_set():
+                changed = self._changed
+                position = self.position(ticket)
+                if position and position != last_position and on_position is not None:
+                    on_position(position, self.eta_seconds(ticket))
+                last_position = position
+                await changed.wait()
+        except asyncio.CancelledError:
+            self.release(ticket)
+            raise
+
+    def release(self, ticket: RunTicket) -> None:
+        """Give back the slot (or queue place) held by `ticket`."""
+        dq = self._queue(ticket.domain)
+        if ticket.started_at is None:
+            if ticket in dq.waiting:
+                dq.waiting.remove(ticket)
+                self._notify()
+            return
+        dq.running -= 1
+        dq.durations.append(time.monotonic() - ticket.started_at)
+        ticket.started_at = None
+        self._pump(dq)
+
+    def _start(self, dq: _DomainQueue, ticket: RunTicket) -> None:
+        dq.running += 1
+        ticket.started_at = time.monotonic()
+        dq.total_wait_s += ticket.started_at - ticket.admitted_at
+        ticket._ready.set()
+
+    def _pump(self, dq: _DomainQueue) -> None:
+        while dq.waiting and dq.running < dq.limits.max_running:
+            self._start(dq, dq.waiting.popleft())
+        self._notify()
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            domain: {
+                "max_running": dq.limits.max_running,
+                "max_queued": dq.limits.max_queued,
+                "running": dq.running,
+                "queued": len(dq.waiting),
+                "admitted": dq.admitted,
+                "rejected": dq.rejected,
+                "avg_run_s": round(dq.avg_run_seconds(), 1),
+                "avg_wait_s": round(dq.total_wait_s / dq.admitted, 2) if dq.admitted else 0.0,
+            }
+            for domain, dq in self._domains.items()
+        }
@@ -0,0 +1,171 @@
+# src/api/static_assets.py
+"""
+Serving of the fingerprinted frontend bundle built by `build_static.py`.
+
+`static_dist/` holds content-hashed files (main.3f2a9c1d.js), their
+precompressed `.br`/`.gz` siblings and `manifest.json` (logical name ->
+hashed name). A hashed file never changes, so it is served with an
+immutable Cache-Control and the best precompressed variant the client
+accepts; nothing is compressed per request.
+
+index.html stays unhashed: it is rendered through the manifest (the
+stylesheet and script URLs point at the hashed files, and every JS module
+gets a modulepreload link so the import graph loads in parallel) and served
+with `no-cache`, so a deploy is picked up on the next page load.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from .download_cache import etag_matches, negotiate_encoding
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Accept-Encoding token -> file suffix, in order of preference
+PRECOMPRESSED = {"br": ".br", "gzip": ".gz"}
+
+# name.<8 hex>.ext, as written by build_static.py
+_HASHED_RE = re.compile(r"\.[0-9a-f]{8}\.[\w]+$")
+# src="..." / href="..." in index.html
+_ASSET_ATTR_RE = re.compile(r"""\b(src|href)=(["'])([^"']+)\2""")
+
+
+def logical_asset(ref: str) -> str:
+    """'../static_build/main.js' / '/static/styles.css' -> manifest key."""
+    ref = ref.split("?", 1)[0].split("#", 1)[0]
+    for marker in ("static_build/", "static/"):
+        if marker in ref:
+            return ref.split(marker, 1)[1]
+    return ref.lstrip("./")
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that prefers `<file>.br` / `<file>.gz` and marks hashed files immutable."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # full path -> {encoding: (variant path, stat)}; the bundle is immutable
+        self._variants: Dict[str, Dict[str, Tuple[str, os.stat_result]]] = {}
+
+    def _variants_of(self, full_path: str) -> Dict[str, Tuple[str, os.stat_result]]:
+        variants = self._variants.get(full_path)
+        if variants is None:
+            variants = {}
+            for encoding, suffix in PRECOMPRESSED.items():
+                try:
+                    variants[encoding] = (full_path + suffix, os.stat(full_path + suffix))
+                except OSError:
+                    pass
+            self._variants[full_path] = variants
+        return variants
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        headers = {}
+        if _HASHED_RE.search(full_path):
+            headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+
+        variants = self._variants_of(full_path)
+        encoding = None
+        if variants:
+            headers["Vary"] = "Accept-Encoding"
+            # byte ranges refer to the identity body
+            if "range" not in request_headers:
+                encoding = negotiate_encoding(request_headers.get("accept-encoding", ""), variants)
+
+        if encoding is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+        else:
+            variant_path, variant_stat = variants[encoding]
+            headers["Content-Encoding"] = encoding
+            response = FileResponse(
+                variant_path,
+                status_code=status_code,
+                stat_result=variant_stat,
+                headers=headers,
+                # content type of the original, not of .br/.gz
+                media_type=mimetypes.guess_type(full_path)[0] or "application/octet-stream",
+            )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+class StaticManifest:
+    """`static_dist/manifest.json` plus the index.html rendered through it."""
+
+    def __init__(self, dist_dir: str, index_path: str, url_prefix: str = "/static_dist") -> None:
+        self.dist_dir = dist_dir
+        self.index_path = index_path
+        self.url_prefix = url_prefix
+        self.manifest_path = os.path.join(dist_dir, "manifest.json")
+        self._lock = threading.Lock()
+        # (manifest mtime, index mtime) -> (html, etag)
+        self._rendered: Optional[Tuple[Tuple[float, float], bytes, str]] = None
+
+    @property
+    def available(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    def files(self) -> Dict[str, str]:
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("files", {})
+
+    def url(self, logical: str, files: Dict[str, str]) -> Optional[str]:
+        hashed = files.get(logical)
+        return f"{self.url_prefix}/{hashed}" if hashed else None
+
+    def render_index(self) -> Tuple[bytes, str]:
+        """index.html with asset URLs from the manifest, re-rendered after a rebuild."""
+        key = (os.path.getmtime(self.manifest_path), os.path.getmtime(self.index_path))
+        with self._lock:
+            if self._rendered is not None and self._rendered[0] == key:
+                return self._rendered[1], self._rendered[2]
+
+        files = self.files()
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            html = f.read()
+
+        def rewrite(m: "re.Match[str]") -> str:
+            url = self.url(logical_asset(m.group(3)), files)
+            return f"{m.group(1)}={m.group(2)}{url}{m.group(2)}" if url else m.group(0)
+
+        html = _ASSET_ATTR_RE.sub(rewrite, html)
+        preloads = "".join(
+            f'  <link rel="modulepreload" href="{self.url(name, files)}" />\n'
+            for name in sorted(files)
+            if name.endswith(".js")
+        )
+        html = html.replace("</head>", preloads + "</head>", 1)
+
+        body = html.encode("utf-8")
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        with self._lock:
+            self._rendered = (key, body, etag)
+        return body, etag
+
+    def index_response(self, if_none_match: Optional[str]) -> Response:
+        body, etag = self.render_index()
+        headers = {"Cache-Control": REVALIDATE_CACHE_CONTROL, "ETag": etag}
+        if if_none_match and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="text/html", headers=headers)
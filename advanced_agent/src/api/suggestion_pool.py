@@ -0,0 +1,226 @@
+# src/api/suggestion_pool.py
+"""
+Rotating pool of pre-generated sample questions for /suggestions.
+
+A background thread asks the LLM for a batch of questions, translates the
+whole batch to Chinese in one call, and adds the (English, Chinese) pairs to
+a bounded pool; the oldest pairs rotate out as new batches come in. The
+endpoint only samples from memory. Until the first batch arrives it samples
+from DEFAULT_SUGGESTIONS, which are written in both languages.
+
+With a shared state backend (sqlite/redis) the pool is also stored there:
+workers adopt a pool another worker refreshed recently instead of calling
+the LLM themselves.
+"""
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+# (English, Chinese)
+Suggestion = Tuple[str, str]
+
+DEFAULT_SUGGESTIONS: List[Suggestion] = [
+    ("What are some good Python IDEs for beginners?",
+     "有哪些适合初学者的 Python IDE？"),
+    ("What are the pros and cons of using VS Code vs JetBrains IDEs?",
+     "VS Code 和 JetBrains IDE 各有哪些优缺点？"),
+    ("Which managed Postgres services should I consider on AWS, GCP, or Azure?",
+     "在 AWS、GCP 或 Azure 上应该考虑哪些托管 Postgres 服务？"),
+    ("What are good alternatives to AWS Lambda for serverless backends?",
+     "有哪些可以替代 AWS Lambda 的无服务器后端方案？"),
+    ("What are the best coding interview platforms for LeetCode-style problems?",
+     "练习 LeetCode 类题目最好的编程面试平台有哪些？"),
+    ("How can I improve the architecture of a microservices-based system?",
+     "如何改进基于微服务的系统架构？"),
+    ("What are good resources to learn system design for backend engineers?",
+     "后端工程师学习系统设计有哪些好的资源？"),
+    ("What tools can help me monitor and debug a distributed system?",
+     "有哪些工具可以帮助我监控和调试分布式系统？"),
+    ("What are some best practices for designing multi-tenant SaaS architecture?",
+     "设计多租户 SaaS 架构有哪些最佳实践？"),
+    ("How should I structure my software engineering resume for senior roles?",
+     "申请高级职位时，软件工程师简历应该如何组织？"),
+]
+
+LANGUAGE_INDEX = {"English": 0, "Chinese": 1}
+
+SYSTEM_PROMPT = (
+    "You generate example user questions for a research assistant that helps "
+    "software developers with:\n"
+    "- developer tools & IDEs\n"
+    "- APIs & backend services\n"
+    "- cloud & databases\n"
+    "- SaaS products\n"
+    "- software engineering practices\n"
+    "- developer careers (interviews, resumes, learning roadmaps)\n\n"
+    "Return ONLY a JSON array of strings. No explanation, no code fences."
+)
+
+
+def generate_sample_questions(llm: Any, n: int = 10) -> List[str]:
+    """
+    Ask `llm` for `n` example questions as a JSON array. Returns [] if the
+    output can't be parsed. A random token in the prompt keeps batches from
+    repeating each other.
+    """
+    rand_seed = random.randint(0, 10_000)
+    now_iso = datetime.now().isoformat(timespec="seconds")
+    user = (
+        f"Generate {n} diverse example questions a developer might ask this assistant.\n"
+        f"Randomizer token: {rand_seed} at {now_iso}.\n"
+        "Return strictly JSON like:\n"
+        '["question1", "question2", ...]'
+    )
+    raw = llm.invoke([SystemMessage(content=SYSTEM_PROMPT), HumanMessage(content=user)]).content.strip()
+
+    start, end = raw.find("["), raw.rfind("]")
+    if start == -1 or end <= start:
+        print("Failed to find a JSON array in the suggestions output")
+        return []
+    try:
+        parsed = json.loads(raw[start : end + 1])
+    except Exception as e:
+        print("Failed to parse JSON array from LLM output:", e)
+        return []
+    if not isinstance(parsed, list):
+        return []
+    return [str(q).strip() for q in parsed if str(q).strip()][:n]
+
+
+class SuggestionPool:
+    def __init__(
+        self,
+        llm: Any,
+        translate_batch: Callable[[List[str], str], List[str]],
+        size: int = 60,
+        batch_size: int = 10,
+        refresh_s: float = 300.0,
+        shared: Optional[Any] = None,
+    ) -> None:
+        self.llm = llm
+        self.translate_batch = translate_batch
+        self.size = size
+        self.batch_size = batch_size
+        self.refresh_s = refresh_s
+        self.shared = shared
+
+        self._pool: List[Suggestion] = []
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.updated_at = 0.0
+        self.refreshes = 0
+        self.adopted = 0
+        self.failures = 0
+        self.served = 0
+
+    # ---------------------------
+    # Serving
+    # ---------------------------
+    def sample(self, language: str = "English", n: int = 5) -> List[str]:
+        """`n` random questions in `language` ("English" / "Chinese"), from memory."""
+        index = LANGUAGE_INDEX.get(language, 0)
+        with self._lock:
+            pool = self._pool if len(self._pool) >= n else self._pool + DEFAULT_SUGGESTIONS
+            picked = random.sample(pool, k=min(n, len(pool)))
+            self.served += 1
+        return [pair[index] for pair in picked]
+
+    # ---------------------------
+    # Refreshing
+    # ---------------------------
+    def refresh(self) -> int:
+        """Add one generated batch (or adopt a fresh shared pool); returns pairs added."""
+        with self._refresh_lock:
+            if self._adopt_shared():
+                return 0
+            questions = generate_sample_questions(self.llm, self.batch_size)
+            if not questions:
+                raise ValueError("LLM returned no suggestions")
+            translated = self.translate_batch(questions, "Chinese")
+            pairs = list(zip(questions, translated))
+
+            with self._lock:
+                known = {en.lower() for en, _ in pairs}
+                kept = [pair for pair in self._pool if pair[0].lower() not in known]
+                # newest first; the oldest rotate out
+                self._pool = (pairs + kept)[: self.size]
+                pool = list(self._pool)
+            self.updated_at = time.time()
+            self.refreshes += 1
+            if self.shared is not None:
+                self.shared.set("pool", {"pairs": pool, "updated_at": self.updated_at})
+            return len(pairs)
+
+    def _adopt_shared(self) -> bool:
+        """Take the shared pool if another worker refreshed it within `refresh_s`."""
+        if self.shared is None:
+            return False
+        stored = self.shared.get("pool")
+        if not stored or stored["updated_at"] <= self.updated_at:
+            return False
+        if time.time() - stored["updated_at"] >= self.refresh_s:
+            return False
+        with self._lock:
+            self._pool = [tuple(pair) for pair in stored["pairs"]][: self.size]
+        self.updated_at = stored["updated_at"]
+        self.adopted += 1
+        return True
+
+    def fill(self, min_size: Optional[int] = None) -> int:
+        """Refresh until the pool holds `min_size` pairs (default: one batch); used at warm-up."""
+        target = min(min_size or self.batch_size, self.size)
+        attempts = 0
+        while len(self._pool) < target and attempts < 3:
+            attempts += 1
+            self.refresh()
+        return len(self._pool)
+
+    def start(self) -> None:
+        """Start the background refresh thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="suggestion-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        delay = 0.0
+        failed_in_row = 0
+        while not self._stop.wait(delay):
+            try:
+                self.refresh()
+                failed_in_row = 0
+                # fill up quickly, then rotate one batch per interval
+                delay = 0.0 if len(self._pool) < self.size // 2 else self.refresh_s
+            except Exception as e:
+                self.failures += 1
+                failed_in_row += 1
+                print(f"[suggestions] refresh failed: {e!r}")
+                delay = min(self.refresh_s, 30.0 * failed_in_row)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._pool)
+        return {
+            "size": size,
+            "capacity": self.size,
+            "updated_at": self.updated_at,
+            "refreshes": self.refreshes,
+            "adopted": self.adopted,
+            "failures": self.failures,
+            "served": self.served,
+            "running": self._thread is not None and self._thread.is_alive(),
+        }
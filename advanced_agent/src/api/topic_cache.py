@@ -0,0 +1,94 @@
+# src/api/topic_cache.py
+"""
+Cache of query -> (topic_key, label) classifications.
+
+Keys are normalized queries (see `normalize_query`). The whole cache is tied
+to a fingerprint of the TOPIC_CONFIGS labels/descriptions and is dropped as
+soon as that set changes. If TOPIC_CACHE_PATH is set, entries are persisted
+to a JSON file so popular queries survive restarts.
+
+With a `shared` namespace (STATE_BACKEND sqlite/redis) classifications are
+also written through to it, and local misses are looked up there, so one
+worker's classification serves every worker. Shared keys include the
+fingerprint, so a config change starts a fresh key space.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from typing import Optional, Tuple
+
+from ..state_backend import Namespace
+from .cache_utils import PersistentLRUCache, normalize_query
+
+
+class TopicClassificationCache:
+    def __init__(
+        self,
+        fingerprint: str,
+        max_size: int = 5000,
+        path: str = "",
+        flush_every: int = 20,
+        shared: Optional[Namespace] = None,
+    ) -> None:
+        self._shared = shared if shared is not None and shared.shared else None
+        self._entries = PersistentLRUCache(
+            max_size,
+            path=path,
+            flush_every=flush_every,
+            meta={"fingerprint": fingerprint},
+            name="topic cache",
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        return self._entries.meta["fingerprint"]
+
+    # ---------------------------
+    # Lookup
+    # ---------------------------
+    def get(self, query: str, fingerprint: str) -> Optional[Tuple[str, str]]:
+        self._check_fingerprint(fingerprint)
+        key = normalize_query(query)
+        if not key:
+            return None
+        cached = self._entries.get(key)
+        if cached is None and self._shared is not None:
+            cached = self._shared.get(self._shared_key(key, fingerprint))
+            if cached is not None:
+                self._entries.put(key, list(cached))
+        return tuple(cached) if cached is not None else None
+
+    def peek(self, query: str, fingerprint: str) -> Optional[Tuple[str, str]]:
+        """Like `get`, but without touching hit/miss counters or recency."""
+        if fingerprint != self.fingerprint:
+            return None
+        cached = self._entries.peek(normalize_query(query))
+        return tuple(cached) if cached is not None else None
+
+    def put(self, query: str, topic_key: str, label: str, fingerprint: str) -> None:
+        self._check_fingerprint(fingerprint)
+        key = normalize_query(query)
+        if not key:
+            return
+        self._entries.put(key, [topic_key, label])
+        if self._shared is not None:
+            self._shared.set(self._shared_key(key, fingerprint), [topic_key, label])
+
+    @staticmethod
+    def _shared_key(key: str, fingerprint: str) -> str:
+        return f"{fingerprint[:16]}:{key}"
+
+    def _check_fingerprint(self, fingerprint: str) -> None:
+        if fingerprint != self.fingerprint:
+            print("[topic cache] TOPIC_CONFIGS changed, invalidating classification cache")
+            self._entries.reset({"fingerprint": fingerprint})
+
+    def topic_counts(self) -> Counter:
+        """How many remembered queries map to each topic (a proxy for traffic)."""
+        return Counter(value[0] for _, value in self._entries.items())
+
+    def flush(self) -> None:
+        self._entries.flush()
+
+    def stats(self) -> dict:
+        return self._entries.stats()
@@ -0,0 +1,309 @@
+# src/api/topic_router.py
+"""
+Offline lexical topic router.
+
+Scores a query against every topic with BM25 over a small corpus built from
+`TOPIC_CONFIGS` labels/descriptions, a keyword lexicon and (optionally) logged
+past LLM classifications. When the best topic wins by a clear margin the LLM
+classifier is skipped entirely.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import random
+import re
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from ..topics.registry import TopicConfig
+
+# Extra vocabulary per topic key; labels/descriptions alone are too short.
+TOPIC_KEYWORDS: Dict[str, List[str]] = {
+    "developer_tools": [
+        "ide", "editor", "vscode", "vs code", "jetbrains", "intellij", "pycharm", "vim",
+        "neovim", "debugger", "linter", "formatter", "git", "github", "gitlab", "terminal",
+        "copilot", "build tool", "bazel", "gradle", "maven", "webpack", "vite", "npm",
+        "package manager", "profiler", "devtools",
+    ],
+    "saas": [
+        "saas", "crm", "helpdesk", "ticketing", "salesforce", "hubspot", "zendesk",
+        "slack", "notion", "asana", "trello", "subscription", "b2b", "b2c", "invoicing",
+        "email marketing", "project management software", "collaboration",
+    ],
+    "api": [
+        "api", "apis", "sdk", "rest", "graphql", "grpc", "webhook", "webhooks",
+        "api gateway", "kong", "apigee", "postman", "stripe", "twilio", "payments api",
+        "rate limiting", "openapi", "swagger",
+    ],
+    "ai_ml": [
+        "llm", "llms", "gpt", "openai", "anthropic", "claude", "gemini", "embedding",
+        "embeddings", "vector database", "vector db", "pinecone", "weaviate", "qdrant",
+        "fine tuning", "fine-tuning", "rag", "machine learning", "ml", "ai", "mlops",
+        "inference", "hugging face", "langchain",
+    ],
+    "security": [
+        "auth", "authentication", "authorization", "identity", "iam", "sso", "oauth",
+        "oidc", "saml", "mfa", "2fa", "auth0", "okta", "keycloak", "clerk", "zero trust",
+        "waf", "firewall", "bot detection", "fraud", "vulnerability", "secrets",
+        "pentest", "siem",
+    ],
+    "cloud": [
+        "cloud", "aws", "gcp", "azure", "google cloud", "kubernetes", "k8s", "eks", "gke",
+        "aks", "serverless", "lambda", "cloud functions", "ec2", "s3", "storage", "cdn",
+        "hosting", "vps", "heroku", "vercel", "netlify", "fly.io", "terraform", "infrastructure",
+    ],
+    "database": [
+        "database", "databases", "db", "sql", "nosql", "postgres", "postgresql", "mysql",
+        "mariadb", "sqlite", "mongodb", "mongo", "redis", "dynamodb", "cassandra",
+        "snowflake", "bigquery", "redshift", "clickhouse", "supabase", "neon",
+        "planetscale", "cockroachdb", "data warehouse", "oltp", "olap", "managed postgres",
+        "postgres hosting", "database hosting",
+    ],
+    "resume_tools": [
+        "resume", "resumes", "cv", "ats", "applicant tracking", "cover letter",
+        "resume builder", "resume checker", "keywords", "linkedin profile",
+    ],
+    "job_search": [
+        "job", "jobs", "job board", "job search", "hiring", "remote jobs", "salary",
+        "salaries", "levels.fyi", "glassdoor", "indeed", "linkedin jobs", "job market",
+        "offer", "compensation",
+    ],
+    "learning_platform": [
+        "learn", "learning", "course", "courses", "bootcamp", "roadmap", "tutorial",
+        "udemy", "coursera", "edx", "pluralsight", "certification", "beginner",
+        "study plan", "skills",
+    ],
+    "coding_interview": [
+        "coding interview", "leetcode", "hackerrank", "codesignal", "algorithms",
+        "data structures", "mock interview", "neetcode", "competitive programming",
+        "technical interview",
+    ],
+    "system_design": [
+        "system design", "system design interview", "scalability", "distributed systems",
+        "grokking", "design interview", "high level design", "low level design",
+    ],
+    "behavioral_interview": [
+        "behavioral", "behavioral interview", "star method", "soft skills",
+        "career coaching", "career coach", "leadership principles", "interview coaching",
+    ],
+    "architecture_design": [
+        "architecture", "microservices", "monolith", "event driven", "ddd",
+        "domain driven design", "design patterns", "clean architecture", "hexagonal",
+        "multi-tenant", "scalable architecture", "cqrs",
+    ],
+    "code_quality": [
+        "code quality", "refactoring", "refactor", "clean code", "code smells",
+        "static analysis", "sonarqube", "technical debt", "code review", "maintainability",
+    ],
+    "testing": [
+        "testing", "test", "tests", "unit test", "unit testing", "integration testing",
+        "e2e", "end to end", "pytest", "jest", "cypress", "playwright", "selenium",
+        "tdd", "test coverage", "qa", "load testing",
+    ],
+    "agile": [
+        "agile", "scrum", "kanban", "sprint", "jira", "retrospective", "standup",
+        "backlog", "story points", "velocity", "product owner",
+    ],
+    "cicd": [
+        "ci", "cd", "ci/cd", "cicd", "continuous integration", "continuous delivery",
+        "continuous deployment", "pipeline", "pipelines", "jenkins", "github actions",
+        "circleci", "gitlab ci", "argo", "argocd", "deployment",
+    ],
+}
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "best", "by", "can", "do", "does", "for",
+    "from", "good", "how", "i", "in", "is", "it", "me", "my", "of", "on", "or", "should",
+    "some", "that", "the", "there", "to", "top", "use", "vs", "what", "which", "who",
+    "why", "with", "you", "your", "recommend", "recommended", "alternatives", "tools",
+    "tool", "platform", "platforms", "compare", "comparison",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens plus adjacent bigrams, stopwords removed."""
+    words = [w.strip("./-") for w in _TOKEN_RE.findall(text.lower())]
+    words = [w for w in words if w and w not in _STOPWORDS]
+    bigrams = [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return words + bigrams
+
+
+class LexicalTopicRouter:
+    """
+    BM25 router over one "document" per topic.
+
+    Each term maps to a precomputed weight vector over topics, so scoring a
+    query is just the element-wise sum of its terms' vectors.
+    """
+
+    def __init__(
+        self,
+        topic_docs: Mapping[str, Iterable[str]],
+        min_score: float = 2.0,
+        min_margin: float = 0.35,
+        min_guess_score: float = 1.0,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> None:
+        self.topic_keys: List[str] = list(topic_docs.keys())
+        self.min_score = min_score
+        self.min_margin = min_margin
+        # below this (or on a tie) there is no lexical match worth guessing from
+        self.min_guess_score = min_guess_score
+        self._k1 = k1
+        self._b = b
+        self._docs: Dict[str, List[str]] = {k: [] for k in self.topic_keys}
+        for key, texts in topic_docs.items():
+            for text in texts:
+                self._docs[key].extend(tokenize(text))
+        self._term_vectors: Dict[str, List[float]] = {}
+        self._build_index()
+
+        self._lock = threading.Lock()
+        self._stats = {"routed": 0, "skipped_llm": 0, "fallbacks": 0, "compared": 0, "agreed": 0}
+
+    # ---------------------------
+    # Index
+    # ---------------------------
+    def _build_index(self) -> None:
+        n_topics = len(self.topic_keys)
+        lengths = [len(self._docs[k]) for k in self.topic_keys]
+        avg_len = (sum(lengths) / n_topics) if n_topics else 1.0
+
+        term_freqs: Dict[str, List[int]] = {}
+        for idx, key in enumerate(self.topic_keys):
+            for term in self._docs[key]:
+                term_freqs.setdefault(term, [0] * n_topics)[idx] += 1
+
+        vectors: Dict[str, List[float]] = {}
+        for term, tfs in term_freqs.items():
+            df = sum(1 for tf in tfs if tf)
+            idf = math.log(1 + (n_topics - df + 0.5) / (df + 0.5))
+            vec = []
+            for tf, dl in zip(tfs, lengths):
+                norm = self._k1 * (1 - self._b + self._b * dl / (avg_len or 1.0))
+                vec.append(idf * tf * (self._k1 + 1) / (tf + norm) if tf else 0.0)
+            vectors[term] = vec
+        self._term_vectors = vectors
+
+    def add_examples(self, examples: Iterable[Tuple[str, str]]) -> None:
+        """Fold (query, topic_key) pairs into the corpus and rebuild the index."""
+        added = False
+        for query, key in examples:
+            if key in self._docs:
+                self._docs[key].extend(tokenize(query))
+                added = True
+        if added:
+            self._build_index()
+
+    # ---------------------------
+    # Scoring
+    # ---------------------------
+    def scores(self, query: str) -> List[Tuple[str, float]]:
+        """All topics with their BM25 score, best first."""
+        totals = [0.0] * len(self.topic_keys)
+        for term in set(tokenize(query)):
+            vec = self._term_vectors.get(term)
+            if vec is None:
+                continue
+            totals = [t + v for t, v in zip(totals, vec)]
+        ranked = sorted(zip(self.topic_keys, totals), key=lambda kv: kv[1], reverse=True)
+        return ranked
+
+    def route(self, query: str) -> Tuple[Optional[str], str]:
+        """
+        Returns (topic_key or None, best_guess_key).
+        The first element is set only when the router is confident; the guess
+        is "" when no topic clearly matches (e.g. every score is 0).
+        """
+        ranked = self.scores(query)
+        if not ranked:
+            return None, ""
+        best_key, best = ranked[0]
+        second = ranked[1][1] if len(ranked) > 1 else 0.0
+        if best < self.min_guess_score or best <= second:
+            return None, ""
+        margin = (best - second) / best
+        confident = best >= self.min_score and margin >= self.min_margin
+        return (best_key if confident else None), best_key
+
+    # ---------------------------
+    # Stats
+    # ---------------------------
+    def record(self, skipped_llm: bool, guess: str = "", llm_key: str = "") -> None:
+        """Count one classification; compare the router's guess to the LLM when both exist."""
+        with self._lock:
+            self._stats["routed"] += 1
+            self._stats["skipped_llm" if skipped_llm else "fallbacks"] += 1
+            if guess and llm_key:
+                self._stats["compared"] += 1
+                if guess == llm_key:
+                    self._stats["agreed"] += 1
+
+    def record_shadow(self, guess: str, llm_key: str) -> None:
+        """Agreement sample for a query the router answered on its own."""
+        with self._lock:
+            self._stats["compared"] += 1
+            if guess == llm_key:
+                self._stats["agreed"] += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            s = dict(self._stats)
+        s["skip_rate"] = s["skipped_llm"] / s["routed"] if s["routed"] else 0.0
+        s["agreement_rate"] = s["agreed"] / s["compared"] if s["compared"] else 0.0
+        return s
+
+
+def load_history(path: str) -> List[Tuple[str, str]]:
+    """Read logged (query, topic_key) classifications from a JSONL file."""
+    examples: List[Tuple[str, str]] = []
+    if not path or not os.path.exists(path):
+        return examples
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+                examples.append((row["query"], row["topic_key"]))
+            except (ValueError, KeyError):
+                continue
+    return examples
+
+
+_history_lock = threading.Lock()
+
+
+def append_history(path: str, query: str, topic_key: str) -> None:
+    """Log an LLM classification so future router builds can learn from it."""
+    if not path:
+        return
+    line = json.dumps({"query": query, "topic_key": topic_key}, ensure_ascii=False)
+    with _history_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def build_topic_router(configs: Mapping[str, TopicConfig]) -> LexicalTopicRouter:
+    """Build the router from topic configs, the keyword lexicon and optional history."""
+    docs = {
+        key: [cfg.label, cfg.label, cfg.description, *TOPIC_KEYWORDS.get(key, [])]
+        for key, cfg in configs.items()
+    }
+    router = LexicalTopicRouter(
+        docs,
+        min_score=float(os.getenv("TOPIC_ROUTER_MIN_SCORE", "2.0")),
+        min_margin=float(os.getenv("TOPIC_ROUTER_MIN_MARGIN", "0.35")),
+        min_guess_score=float(os.getenv("TOPIC_ROUTER_MIN_GUESS_SCORE", "1.0")),
+    )
+    router.add_examples(load_history(os.getenv("TOPIC_ROUTER_HISTORY", "")))
+    return router
+
+
+def should_shadow() -> bool:
+    """Sample confident routes for an LLM agreement check (TOPIC_ROUTER_SHADOW_RATE)."""
+    rate = float(os.getenv("TOPIC_ROUTER_SHADOW_RATE", "0"))
+    return rate > 0 and random.random() < rate
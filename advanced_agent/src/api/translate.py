@@ -1,21 +1,55 @@
 # --- Translation helpers ---
+import json
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional
+
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_openai import ChatOpenAI
 
-translator_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+from ..metrics import LLM_CALLBACKS, TRANSLATION_SECONDS
+from ..tracing import current_span, traced
+from .translation_memory import TranslationMemory
+
+TRANSLATOR_MODEL = "gpt-4o-mini"
+translator_llm = ChatOpenAI(model=TRANSLATOR_MODEL, temperature=0, callbacks=LLM_CALLBACKS)
+
+# Every translation goes through the shared memory first (LRU, then SQLite)
+TRANSLATION_MEMORY = TranslationMemory(
+    path=os.getenv("TRANSLATION_MEMORY_PATH", ".cache/translation_memory.sqlite3"),
+    memory_size=int(os.getenv("TRANSLATION_MEMORY_SIZE", "5000")),
+    max_rows=int(os.getenv("TRANSLATION_MEMORY_MAX_ROWS", "100000")),
+)
 
 def is_chinese(text: str) -> bool:
     """Heuristic: check if there's at least one CJK character."""
     return any("\u4e00" <= ch <= "\u9fff" for ch in text)
 
+def lookup_translation(text: str, target_lang: str) -> Optional[str]:
+    """Translation memory lookup only; never calls the LLM."""
+    return TRANSLATION_MEMORY.get(text.strip(), target_lang, TRANSLATOR_MODEL)
+
+
+@traced("translate.text")
 def translate_text(text: str, target_lang: str) -> str:
     """
     Translate arbitrary text into target_lang ("English", "Chinese", etc.)
+    Results are kept in the translation memory.
     """
     text = text.strip()
     if not text:
         return text
 
+    cached = TRANSLATION_MEMORY.get(text, target_lang, TRANSLATOR_MODEL)
+    current_span().set_attributes(target_lang=target_lang, chars=len(text), cache_hit=cached is not None)
+    if cached is not None:
+        return cached
+    translated = _translate_uncached(text, target_lang)
+    TRANSLATION_MEMORY.put(text, target_lang, TRANSLATOR_MODEL, translated)
+    return translated
+
+
+def _translate_uncached(text: str, target_lang: str) -> str:
     system = (
         f"You are a precise translator. "
         f"Translate the user's text into {target_lang}. "
@@ -26,5 +60,74 @@ def translate_text(text: str, target_lang: str) -> str:
         SystemMessage(content=system),
         HumanMessage(content=text),
     ]
-    resp = translator_llm.invoke(messages)
+    with TRANSLATION_SECONDS.time(kind="text"):
+        resp = translator_llm.invoke(messages)
     return resp.content.strip()
+
+
+@traced("translate.batch")
+def translate_batch(texts: List[str], target_lang: str) -> List[str]:
+    """
+    Translate several short texts with a single LLM call.
+    The texts go out as a JSON array and must come back as one of the same
+    length; otherwise we fall back to translating them one by one.
+    """
+    if not texts:
+        return []
+
+    # Only texts missing from the translation memory go to the LLM
+    known: Dict[str, str] = {}
+    misses: List[str] = []
+    for text in texts:
+        key = text.strip()
+        if not key or key in known or key in misses:
+            continue
+        cached = TRANSLATION_MEMORY.get(key, target_lang, TRANSLATOR_MODEL)
+        if cached is not None:
+            known[key] = cached
+        else:
+            misses.append(key)
+    current_span().set_attributes(
+        target_lang=target_lang, texts=len(texts), cache_hits=len(known), cache_misses=len(misses),
+        chars=sum(len(t) for t in misses),
+    )
+
+    for text, out in zip(misses, _translate_batch_uncached(misses, target_lang)):
+        known[text] = out
+        TRANSLATION_MEMORY.put(text, target_lang, TRANSLATOR_MODEL, out)
+    return [known.get(t.strip(), t.strip()) for t in texts]
+
+
+def _translate_batch_uncached(texts: List[str], target_lang: str) -> List[str]:
+    if not texts:
+        return []
+    if len(texts) == 1:
+        return [_translate_uncached(texts[0], target_lang)]
+
+    system = (
+        f"You are a precise translator. "
+        f"The user sends a JSON array of strings. Translate every string into {target_lang}. "
+        f"Preserve technical terms, emojis and formatting. "
+        f"Return ONLY a JSON array with the same number of strings, in the same order."
+    )
+    messages = [
+        SystemMessage(content=system),
+        HumanMessage(content=json.dumps(texts, ensure_ascii=False)),
+    ]
+    try:
+        with TRANSLATION_SECONDS.time(kind="batch"):
+            raw = translator_llm.invoke(messages).content.strip()
+        start, end = raw.find("["), raw.rfind("]")
+        parsed = json.loads(raw[start : end + 1])
+        if isinstance(parsed, list) and len(parsed) == len(texts):
+            return [str(t).strip() for t in parsed]
+        print("Batch translation returned a mismatched array, translating one by one")
+    except Exception as e:
+        print("Batch translation failed, translating one by one:", e)
+    return [_translate_uncached(t, target_lang) for t in texts]
+
+
+@lru_cache(maxsize=256)
+def translate_label(label: str, target_lang: str) -> str:
+    """Topic labels are a small fixed set, so their translations are memoized."""
+    return translate_text(label, target_lang)
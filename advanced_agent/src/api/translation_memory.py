@@ -0,0 +1,174 @@
+# src/api/translation_memory.py
+"""
+Translation memory shared by every request.
+
+Translations are keyed by (source text hash, target language, model). Lookups
+go to an in-memory LRU first and then to a SQLite table, so company
+descriptions, recommendation boilerplate and suggestion questions are only
+ever translated once per model. Both layers are size-bounded: the LRU by
+entry count, SQLite by evicting the least recently used rows.
+
+A SQLite hit doesn't write: its `last_used` is kept in memory and written
+in one batch every `FLUSH_EVERY` inserts or touched keys, before the
+eviction check.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .cache_utils import LRUCache
+
+# Inserts / pending `last_used` updates between two flush + eviction passes
+FLUSH_EVERY = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    key         TEXT PRIMARY KEY,
+    target_lang TEXT NOT NULL,
+    model       TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    last_used   REAL NOT NULL
+)
+"""
+
+
+def memory_key(text: str, target_lang: str, model: str) -> str:
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{model}:{target_lang}:{digest}"
+
+
+class TranslationMemory:
+    def __init__(
+        self,
+        path: str = "",
+        memory_size: int = 5000,
+        max_rows: int = 100_000,
+    ) -> None:
+        self.path = path
+        self.max_rows = max_rows
+        self._front: LRUCache[str, str] = LRUCache(memory_size)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._inserts = 0
+        # key -> last_used not yet written to SQLite
+        self._touched: Dict[str, float] = {}
+        self.db_hits = 0
+        self.misses = 0
+        if path:
+            self._open()
+
+    def _open(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            conn.commit()
+            self._conn = conn
+        except sqlite3.Error as e:
+            print(f"[translation memory] could not open {self.path}, memory only: {e}")
+            self._conn = None
+
+    # ---------------------------
+    # Lookup
+    # ---------------------------
+    def get(self, text: str, target_lang: str, model: str) -> Optional[str]:
+        key = memory_key(text, target_lang, model)
+        cached = self._front.get(key)
+        if cached is not None:
+            return cached
+        if self._conn is None:
+            self.misses += 1
+            return None
+
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT translation FROM translations WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._touched[key] = time.time()
+                    if len(self._touched) >= FLUSH_EVERY:
+                        self._flush_locked()
+                        self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"[translation memory] lookup failed: {e}")
+                row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.db_hits += 1
+        self._front.put(key, row[0])
+        return row[0]
+
+    def put(self, text: str, target_lang: str, model: str, translation: str) -> None:
+        key = memory_key(text, target_lang, model)
+        self._front.put(key, translation)
+        if self._conn is None:
+            return
+
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO translations "
+                    "(key, target_lang, model, source, translation, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, target_lang, model, text, translation, time.time()),
+                )
+                self._touched.pop(key, None)
+                self._inserts += 1
+                # Check the bound every few hundred inserts, not on every write
+                if self._inserts % FLUSH_EVERY == 0:
+                    self._flush_locked()
+                    self._evict_locked()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"[translation memory] write failed: {e}")
+
+    def _flush_locked(self) -> None:
+        """Write the pending `last_used` updates of SQLite hits."""
+        if not self._touched:
+            return
+        touched, self._touched = self._touched, {}
+        self._conn.executemany(
+            "UPDATE translations SET last_used = ? WHERE key = ?",
+            [(used, key) for key, used in touched.items()],
+        )
+
+    def _evict_locked(self) -> None:
+        (rows,) = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()
+        excess = rows - self.max_rows
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM translations WHERE key IN ("
+                "SELECT key FROM translations ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+
+    def db_size(self) -> int:
+        if self._conn is None:
+            return 0
+        with self._lock:
+            (rows,) = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()
+        return rows
+
+    def stats(self) -> Dict[str, Any]:
+        memory_hits = self._front.hits
+        total = memory_hits + self.db_hits + self.misses
+        return {
+            "memory": self._front.stats(),
+            "db_path": self.path,
+            "db_size": self.db_size(),
+            "db_max_rows": self.max_rows,
+            "memory_hits": memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": (memory_hits + self.db_hits) / total if total else 0.0,
+        }
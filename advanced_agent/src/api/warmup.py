@@ -0,0 +1,183 @@
+# src/api/warmup.py
+"""
+Startup warm-up, run once per process from the app's lifespan (`create_app`).
+
+Steps, in order (each one timed; a failing step is recorded and skipped):
+  1. workflows         build the selected topic workflows (compiles their graphs)
+  2. structured_output pre-build `with_structured_output` runnables for each
+                       workflow's schemas (analysis_model & co.)
+  3. llm_connections   open the OpenAI-compatible HTTP pools (sync and async)
+  4. firecrawl         open each workflow's async Firecrawl pool
+  5. suggestions       generate the first batch of /suggestions questions
+  6. queries           replay WARMUP_QUERIES_PATH (one query per line):
+                       classify it and prefetch its article search, which fills
+                       the classification and Firecrawl caches
+
+`/ready` answers 503 until the warm-up is over (or timed out after
+WARMUP_TIMEOUT_S), so a load balancer only routes to warm instances.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def load_queries(path: str, limit: int) -> List[str]:
+    """Non-empty, non-comment lines of `path` (missing file: no queries)."""
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        queries = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return queries[:limit]
+
+
+class WarmUp:
+    def __init__(
+        self,
+        workflows: Any,
+        topic_keys: Callable[[], List[str]],
+        classify: Callable[[str], Tuple[str, str]],
+        suggestions: Optional[Any] = None,
+        llms: Iterable[Any] = (),
+        queries: Iterable[str] = (),
+        enabled: bool = True,
+        timeout_s: float = 120.0,
+        query_workers: int = 4,
+    ) -> None:
+        self.workflows = workflows
+        self.topic_keys = topic_keys
+        self.classify = classify
+        self.suggestions = suggestions
+        self.llms = list(llms)
+        self.queries = list(queries)
+        self.enabled = enabled
+        self.timeout_s = timeout_s
+        self.query_workers = query_workers
+
+        self.state = "pending" if enabled else "disabled"
+        self.started_at: Optional[float] = None
+        self.duration_ms: Optional[float] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.state in ("done", "timed_out", "disabled")
+
+    # ---------------------------
+    # Run
+    # ---------------------------
+    async def run(self) -> None:
+        """Run every step; the instance reports ready afterwards, whatever failed."""
+        if not self.enabled or self.state != "pending":
+            return
+        self.state = "running"
+        self.started_at = time.time()
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._run_steps(), timeout=self.timeout_s)
+            self.state = "done"
+        except asyncio.TimeoutError:
+            print(f"[warmup] not finished after {self.timeout_s:.0f}s, reporting ready anyway")
+            self.state = "timed_out"
+        self.duration_ms = round((time.perf_counter() - t0) * 1000, 1)
+        print(f"[warmup] {self.state} in {self.duration_ms:.0f} ms")
+
+    async def _run_steps(self) -> None:
+        keys = [key for key in self.topic_keys() if key in self.workflows]
+        await self._step("workflows", asyncio.to_thread(self._build_workflows, keys))
+        built = self.workflows.built()
+        workflows = [built[key] for key in keys if key in built]
+        await self._step("structured_output", asyncio.to_thread(self._build_structured, workflows))
+        await self._step("llm_connections", self._open_llm_pools())
+        await self._step("firecrawl", self._open_firecrawl_pools(workflows))
+        if self.suggestions is not None:
+            await self._step("suggestions", asyncio.to_thread(self.suggestions.fill))
+        if self.queries:
+            await self._step("queries", asyncio.to_thread(self._replay_queries))
+
+    async def _step(self, name: str, work: Any) -> None:
+        t0 = time.perf_counter()
+        entry: Dict[str, Any] = {}
+        try:
+            entry["result"] = await work
+        except Exception as e:
+            entry["error"] = repr(e)
+            print(f"[warmup] {name} failed: {e!r}")
+        entry["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        self.steps[name] = entry
+
+    # ---------------------------
+    # Steps
+    # ---------------------------
+    def _build_workflows(self, keys: List[str]) -> List[str]:
+        self.workflows.warm_up(keys, background=False)
+        return [key for key in keys if self.workflows.is_built(key)]
+
+    @staticmethod
+    def _build_structured(workflows: List[Any]) -> int:
+        return sum(workflow.warm_up() for workflow in workflows)
+
+    def _distinct_clients(self) -> List[Tuple[Any, Any]]:
+        """(sync, async) OpenAI clients of the known models, one pair per HTTP pool."""
+        pairs: Dict[int, Tuple[Any, Any]] = {}
+        for llm in self.llms + self._workflow_llms():
+            sync_client = getattr(llm, "root_client", None)
+            if sync_client is None:
+                continue
+            pool = getattr(sync_client, "_client", sync_client)
+            pairs.setdefault(id(pool), (sync_client, getattr(llm, "root_async_client", None)))
+        return list(pairs.values())
+
+    def _workflow_llms(self) -> List[Any]:
+        llms = []
+        for workflow in self.workflows.built().values():
+            llms += [llm for llm in (workflow.llm, workflow._hedge_llm) if llm is not None]
+        return llms
+
+    async def _open_llm_pools(self) -> int:
+        """A models listing per pool: no tokens spent, but DNS/TLS/HTTP2 set up."""
+        opened = 0
+        for sync_client, async_client in self._distinct_clients():
+            await asyncio.to_thread(sync_client.models.list)
+            if async_client is not None:
+                # async connections belong to this (the server's) event loop
+                await async_client.models.list()
+            opened += 1
+        return opened
+
+    @staticmethod
+    async def _open_firecrawl_pools(workflows: List[Any]) -> int:
+        results = await asyncio.gather(
+            *(workflow.awarm_connections() for workflow in workflows), return_exceptions=True
+        )
+        failed = [r for r in results if isinstance(r, Exception)]
+        if failed:
+            raise failed[0]
+        return len(results)
+
+    def _replay_queries(self) -> Dict[str, int]:
+        def replay(query: str) -> bool:
+            try:
+                topic_key, _ = self.classify(query)
+                self.workflows[topic_key].prefetch_articles(query)
+                return True
+            except Exception as e:
+                print(f"[warmup] replaying '{query}' failed: {e!r}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=self.query_workers, thread_name_prefix="warmup") as pool:
+            results = list(pool.map(replay, self.queries))
+        return {"replayed": sum(results), "failed": len(results) - sum(results)}
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "state": self.state,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "steps": dict(self.steps),
+            "queries": len(self.queries),
+        }
@@ -0,0 +1,91 @@
+# src/cancellation.py
+"""
+Cooperative cancellation of workflow runs.
+
+A `CancellationToken` is created per request and handed to the workflow
+(`RootWorkflow.set_cancel_token`). Graph steps and research workers check it
+and raise `WorkflowCancelled`, pending research futures are cancelled, and
+the API skips artifact generation. `CANCELLATION_STATS` counts the work that
+was skipped because nobody was listening anymore.
+"""
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from typing import Any, Dict, Optional
+
+
+class WorkflowCancelled(BaseException):
+    """
+    Raised inside a run once its token is cancelled.
+
+    Like `asyncio.CancelledError` it derives from BaseException, so the
+    `except Exception` blocks around individual steps don't swallow it.
+    """
+
+
+class CancellationStats:
+    """Process-wide counters of cancelled runs and the work they skipped."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.runs_cancelled = 0
+        self.futures_cancelled = 0
+        self.events_dropped = 0
+        # stage name -> how many times it was skipped (graph steps, artifacts, ...)
+        self.skipped: Counter = Counter()
+
+    def record_run(self) -> None:
+        with self._lock:
+            self.runs_cancelled += 1
+
+    def record_skip(self, stage: str) -> None:
+        with self._lock:
+            self.skipped[stage] += 1
+
+    def record_futures(self, count: int) -> None:
+        with self._lock:
+            self.futures_cancelled += count
+
+    def record_dropped_event(self) -> None:
+        with self._lock:
+            self.events_dropped += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "runs_cancelled": self.runs_cancelled,
+                "research_futures_cancelled": self.futures_cancelled,
+                "events_dropped": self.events_dropped,
+                "skipped_stages": dict(self.skipped),
+            }
+
+
+CANCELLATION_STATS = CancellationStats()
+
+
+class CancellationToken:
+    """Thread-safe, one-way cancel flag for a single run."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """Cancel the run. Returns False if it was already cancelled."""
+        if self._event.is_set():
+            return False
+        self.reason = reason
+        self._event.set()
+        CANCELLATION_STATS.record_run()
+        return True
+
+    def check(self, stage: str) -> None:
+        """Raise `WorkflowCancelled` (and count `stage` as skipped) if cancelled."""
+        if self._event.is_set():
+            CANCELLATION_STATS.record_skip(stage)
+            raise WorkflowCancelled(f"{stage}: {self.reason}")
@@ -1,12 +1,62 @@
 import os
+import asyncio
 import concurrent.futures
-from typing import Any
+import threading
+import time
+from typing import Any, Optional
 
-from firecrawl import FirecrawlApp
+from firecrawl import AsyncFirecrawl, FirecrawlApp
 from dotenv import load_dotenv
 
+from .metrics import FIRECRAWL_CACHE, FIRECRAWL_SECONDS
+from .state_backend import STATE
+from .tracing import KIND_CLIENT, current_span, traced
+
 load_dotenv()
 
+# Search/scrape results, shared by every workflow (and every worker process
+# when STATE_BACKEND is sqlite/redis)
+FIRECRAWL_CACHE_TTL_S = float(os.getenv("FIRECRAWL_CACHE_TTL_S", "86400"))
+FIRECRAWL_CACHE_SIZE = int(os.getenv("FIRECRAWL_CACHE_SIZE", "5000"))
+SEARCH_CACHE = STATE.namespace("firecrawl:search", ttl=FIRECRAWL_CACHE_TTL_S, max_size=FIRECRAWL_CACHE_SIZE)
+SCRAPE_CACHE = STATE.namespace("firecrawl:scrape", ttl=FIRECRAWL_CACHE_TTL_S, max_size=FIRECRAWL_CACHE_SIZE)
+
+
+def _search_key(key: tuple[str, int]) -> str:
+    query, num_results = key
+    return f"{num_results}:{query}"
+
+
+def _payload_bytes(result: Any) -> int:
+    """Markdown bytes in a search/scrape result (web docs, a list or one document)."""
+    docs = getattr(result, "web", None) or getattr(result, "data", None)
+    if docs is None:
+        docs = result if isinstance(result, list) else [result]
+    total = 0
+    for doc in docs:
+        markdown = doc.get("markdown") if isinstance(doc, dict) else getattr(doc, "markdown", None)
+        total += len((markdown or "").encode("utf-8"))
+    return total
+
+
+def _count_cache(op: str, result: str, payload: Any = None) -> None:
+    FIRECRAWL_CACHE.inc(op=op, result=result)
+    span = current_span()
+    if span.recording:
+        span.set_attribute("cache", result)
+        if payload is not None:
+            span.set_attribute("bytes", _payload_bytes(payload))
+
+
+def _observe(op: str, outcome: str, t0: float, payload: Any = None) -> None:
+    FIRECRAWL_SECONDS.observe(time.perf_counter() - t0, op=op, outcome=outcome)
+    span = current_span()
+    if span.recording:
+        span.set_attribute("outcome", outcome)
+        if payload is not None:
+            span.set_attribute("bytes", _payload_bytes(payload))
+
+
 class FirecrawlService:
     def __init__(self, timeout_seconds: float = 60.0):
         api_key = os.getenv("FIRECRAWL_API_KEY")
@@ -14,22 +64,67 @@ class FirecrawlService:
             raise ValueError("Environment variable FIRECRAWL_API_KEY not found")
 
         self.app = FirecrawlApp(api_key=api_key)
+        self._api_key = api_key
+        # Async client for the `arun` path, created on first use
+        self._async_app: Optional[AsyncFirecrawl] = None
 
         # Caches to avoid unnecessary external calls
-        self._search_cache: dict[tuple[str, int], Any] = {}
-        self._scrape_cache: dict[str, Any] = {}
+        self._search_cache = SEARCH_CACHE
+        self._scrape_cache = SCRAPE_CACHE
+        # In-flight searches, so a speculative prefetch and the real search share one call
+        self._search_inflight: dict[tuple[str, int], concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
 
         self.timeout_seconds = timeout_seconds
 
+    def _claim_search(self, key: tuple[str, int]) -> tuple[concurrent.futures.Future, bool]:
+        """
+        The in-flight future for `key`, and whether the caller owns it (and
+        must run the search). The lock only guards `_search_inflight`; cache
+        reads happen before, outside it.
+        """
+        with self._lock:
+            pending = self._search_inflight.get(key)
+            if pending is not None:
+                return pending, False
+            pending = concurrent.futures.Future()
+            self._search_inflight[key] = pending
+            return pending, True
+
     # ------------------------------------------------------------
     # 🔍 SEARCH with forced timeout
     # ------------------------------------------------------------
+    @traced("firecrawl.search", KIND_CLIENT)
     def search_companies(self, query: str, num_results: int = 5):
+        current_span().set_attributes(query=query, num_results=num_results)
         key = (query, num_results)
-        if key in self._search_cache:
-            return self._search_cache[key]
+        cached = self._search_cache.get(_search_key(key))
+        if cached is not None:
+            _count_cache("search", "hit", cached)
+            return cached
+        pending, owner = self._claim_search(key)
+        _count_cache("search", "miss" if owner else "joined")
 
+        if not owner:
+            # Someone (e.g. a speculative prefetch) is already running this search
+            try:
+                return pending.result(timeout=self.timeout_seconds)
+            except concurrent.futures.TimeoutError:
+                print(f"[TIMEOUT] waiting for in-flight search '{query}'")
+                return []
+
+        result = []
+        try:
+            result = self._search_uncached(key, query, num_results)
+        finally:
+            with self._lock:
+                self._search_inflight.pop(key, None)
+            pending.set_result(result)
+        return result
+
+    def _search_uncached(self, key: tuple[str, int], query: str, num_results: int):
         print(f"Searching company pricing for: {query}")
+        t0 = time.perf_counter()
 
         def _do_search():
             return self.app.search(
@@ -45,28 +140,38 @@ class FirecrawlService:
 
         except concurrent.futures.TimeoutError:
             print(f"[TIMEOUT] search took longer than {self.timeout_seconds}s for '{query}'")
+            _observe("search", "timeout", t0)
             return []
 
         except Exception as e:
             print(f"[ERROR] search failed for '{query}': {e}")
+            _observe("search", "error", t0)
             return []
 
         # Optional sanity check
         if not result:
             print(f"[WARN] search returned empty result for '{query}'")
+            _observe("search", "empty", t0)
             return []
 
-        self._search_cache[key] = result
+        _observe("search", "ok", t0, result)
+        self._search_cache.set(_search_key(key), result)
         return result
 
     # ------------------------------------------------------------
     # 🌐 SCRAPE with forced timeout
     # ------------------------------------------------------------
+    @traced("firecrawl.scrape", KIND_CLIENT)
     def scrape_company_pages(self, url: str):
-        if url in self._scrape_cache:
-            return self._scrape_cache[url]
+        current_span().set_attributes(url=url)
+        cached = self._scrape_cache.get(url)
+        if cached is not None:
+            _count_cache("scrape", "hit", cached)
+            return cached
+        _count_cache("scrape", "miss")
 
         print("Scraping", url)
+        t0 = time.perf_counter()
 
         def _do_scrape():
             return self.app.scrape(
@@ -81,18 +186,134 @@ class FirecrawlService:
 
         except concurrent.futures.TimeoutError:
             print(f"[TIMEOUT] scrape took longer than {self.timeout_seconds}s for {url}")
+            _observe("scrape", "timeout", t0)
             return None
 
         except Exception as e:
             print(f"[ERROR] scrape failed for {url}: {e}")
+            _observe("scrape", "error", t0)
             return None
 
         if not result:
             print(f"[WARN] scrape returned empty result for {url}")
+            _observe("scrape", "empty", t0)
             return None
 
-        self._scrape_cache[url] = result
+        _observe("scrape", "ok", t0, result)
+        self._scrape_cache.set(url, result)
+        return result
+
+    # ------------------------------------------------------------
+    # ⚡ Async variants (same caches and in-flight searches)
+    # ------------------------------------------------------------
+    def _get_async_app(self) -> AsyncFirecrawl:
+        if self._async_app is None:
+            self._async_app = AsyncFirecrawl(api_key=self._api_key)
+        return self._async_app
+
+    async def awarm_up(self) -> None:
+        """
+        Open the async client's pooled connection with a free API call, so the
+        first search of a request doesn't pay for DNS/TLS. (The sync client
+        uses one-off requests, there is no pool to warm.)
+        """
+        await asyncio.wait_for(self._get_async_app().get_concurrency(), timeout=self.timeout_seconds)
+
+    @traced("firecrawl.search", KIND_CLIENT)
+    async def asearch_companies(self, query: str, num_results: int = 5):
+        current_span().set_attributes(query=query, num_results=num_results)
+        key = (query, num_results)
+        # the shared backend may be SQLite/Redis: keep its I/O off the event loop
+        cached = await asyncio.to_thread(self._search_cache.get, _search_key(key))
+        if cached is not None:
+            _count_cache("search", "hit", cached)
+            return cached
+        pending, owner = self._claim_search(key)
+        _count_cache("search", "miss" if owner else "joined")
+
+        if not owner:
+            # Joins a search started by either the sync or the async path
+            try:
+                return await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(pending)), self.timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                print(f"[TIMEOUT] waiting for in-flight search '{query}'")
+                return []
+
+        result = []
+        try:
+            result = await self._asearch_uncached(key, query, num_results)
+        finally:
+            with self._lock:
+                self._search_inflight.pop(key, None)
+            pending.set_result(result)
+        return result
+
+    async def _asearch_uncached(self, key: tuple[str, int], query: str, num_results: int):
+        print(f"Searching company pricing for: {query}")
+        t0 = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                self._get_async_app().search(
+                    query=f"{query} company pricing",
+                    limit=num_results,
+                    scrape_options={ "formats": ["markdown"] },
+                ),
+                self.timeout_seconds,
+            )
+
+        except asyncio.TimeoutError:
+            print(f"[TIMEOUT] search took longer than {self.timeout_seconds}s for '{query}'")
+            _observe("search", "timeout", t0)
+            return []
+
+        except Exception as e:
+            print(f"[ERROR] search failed for '{query}': {e}")
+            _observe("search", "error", t0)
+            return []
+
+        if not result:
+            print(f"[WARN] search returned empty result for '{query}'")
+            _observe("search", "empty", t0)
+            return []
+
+        _observe("search", "ok", t0, result)
+        await asyncio.to_thread(self._search_cache.set, _search_key(key), result)
         return result
 
+    @traced("firecrawl.scrape", KIND_CLIENT)
+    async def ascrape_company_pages(self, url: str):
+        current_span().set_attributes(url=url)
+        cached = await asyncio.to_thread(self._scrape_cache.get, url)
+        if cached is not None:
+            _count_cache("scrape", "hit", cached)
+            return cached
+        _count_cache("scrape", "miss")
 
+        print("Scraping", url)
+        t0 = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                self._get_async_app().scrape(url, formats=["markdown"]),
+                self.timeout_seconds,
+            )
+
+        except asyncio.TimeoutError:
+            print(f"[TIMEOUT] scrape took longer than {self.timeout_seconds}s for {url}")
+            _observe("scrape", "timeout", t0)
+            return None
+
+        except Exception as e:
+            print(f"[ERROR] scrape failed for {url}: {e}")
+            _observe("scrape", "error", t0)
+            return None
 
+        if not result:
+            print(f"[WARN] scrape returned empty result for {url}")
+            _observe("scrape", "empty", t0)
+            return None
+
+        _observe("scrape", "ok", t0, result)
+        await asyncio.to_thread(self._scrape_cache.set, url, result)
+        return result
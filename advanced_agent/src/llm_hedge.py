@@ -0,0 +1,382 @@
+# src/llm_hedge.py
+"""
+Hedged LLM calls for latency-critical steps.
+
+If the primary model has not answered (or has not streamed its first token)
+within a percentile-based delay, the same request is fired at a secondary
+model and whichever answers first wins. The number of hedged calls is capped
+and per-provider win/loss statistics are recorded.
+
+Hedging is disabled unless `LLM_HEDGE_SECONDARY_MODEL` is set.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional
+
+from dotenv import load_dotenv
+from langchain_core.language_models import BaseChatModel
+
+load_dotenv()
+
+# Shared pool for primary/secondary calls (hedged calls are short-lived)
+_HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+
+
+def provider_of(model_name: str) -> str:
+    """Map a model name to its provider (same rules as `RootWorkflow.set_llm`)."""
+    if "deepseek" in model_name:
+        return "deepseek"
+    if "claude" in model_name:
+        return "anthropic"
+    return "openai"
+
+
+def model_name_of(llm: Any) -> str:
+    """Best-effort model name of a chat model or structured-output runnable."""
+    for attr in ("model_name", "model"):
+        name = getattr(llm, attr, None)
+        if isinstance(name, str):
+            return name
+    # `llm.with_structured_output(...)` returns a RunnableSequence whose first step is the model
+    first = getattr(llm, "first", None)
+    if first is not None and first is not llm:
+        return model_name_of(getattr(first, "bound", first))
+    return "unknown"
+
+
+@dataclass
+class HedgeConfig:
+    """
+    secondary_model: model the request is re-sent to when the primary is slow.
+    percentile: latency percentile of the primary used as the hedge delay.
+    min_delay_s / max_delay_s: clamp for the computed delay.
+    default_delay_s: delay used until `min_samples` latencies are recorded.
+    max_hedge_rate: max fraction of the recent call window allowed to hedge.
+    wait_for: "response" (full answer) or "first_token" (first streamed chunk).
+    """
+    secondary_model: str
+    percentile: float = 0.95
+    min_delay_s: float = 1.0
+    max_delay_s: float = 20.0
+    default_delay_s: float = 8.0
+    min_samples: int = 20
+    max_hedge_rate: float = 0.1
+    wait_for: str = "response"
+
+    @classmethod
+    def from_env(cls) -> Optional["HedgeConfig"]:
+        secondary = os.getenv("LLM_HEDGE_SECONDARY_MODEL", "").strip()
+        if not secondary:
+            return None
+        return cls(
+            secondary_model=secondary,
+            percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95")),
+            min_delay_s=float(os.getenv("LLM_HEDGE_MIN_DELAY", "1.0")),
+            max_delay_s=float(os.getenv("LLM_HEDGE_MAX_DELAY", "20.0")),
+            default_delay_s=float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "8.0")),
+            max_hedge_rate=float(os.getenv("LLM_HEDGE_MAX_RATE", "0.1")),
+            wait_for=os.getenv("LLM_HEDGE_WAIT_FOR", "response"),
+        )
+
+
+class HedgePolicy:
+    """
+    Runs `invoke` calls with an optional hedge to a secondary model.
+
+    Latencies are tracked per (label, primary model) so the classifier and the
+    final recommendation get their own percentile-based delays.
+    """
+
+    def __init__(self, config: HedgeConfig, window: int = 200) -> None:
+        self.config = config
+        self._lock = threading.Lock()
+        self._latencies: Dict[tuple[str, str], Deque[float]] = {}
+        self._recent_hedges: Deque[bool] = deque(maxlen=window)
+        self._window = window
+        # provider -> {"calls", "hedged", "wins", "losses", "errors"}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    # ---------------------------
+    # Bookkeeping
+    # ---------------------------
+    def _bump(self, provider: str, field: str) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(
+                provider,
+                {"calls": 0, "hedged": 0, "wins": 0, "losses": 0, "errors": 0},
+            )
+            stats[field] += 1
+
+    def _record_latency(self, label: str, model: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._latencies.setdefault((label, model), deque(maxlen=self._window))
+            samples.append(seconds)
+
+    def _latency_recorder(self, label: str, model: str, start: float) -> Callable[[], None]:
+        """
+        Records the primary's latency (to its first token or its response)
+        once, when called. It is also called when a losing primary is
+        cancelled, which gives a lower-bound sample; without those samples
+        only the fast calls would be kept and the delay would keep shrinking.
+        """
+        recorded = threading.Event()
+
+        def record() -> None:
+            if not recorded.is_set():
+                recorded.set()
+                self._record_latency(label, model, time.monotonic() - start)
+
+        return record
+
+    def hedge_delay(self, label: str, model: str) -> float:
+        """Current hedge delay for `model` under `label`, in seconds."""
+        cfg = self.config
+        with self._lock:
+            samples = sorted(self._latencies.get((label, model), ()))
+        if len(samples) < cfg.min_samples:
+            delay = cfg.default_delay_s
+        else:
+            idx = min(len(samples) - 1, int(cfg.percentile * len(samples)))
+            delay = samples[idx]
+        return max(cfg.min_delay_s, min(cfg.max_delay_s, delay))
+
+    def _allow_hedge(self) -> bool:
+        with self._lock:
+            # At most `max_hedge_rate * window` hedges within the last `window` calls
+            budget = self.config.max_hedge_rate * self._window
+            allowed = sum(self._recent_hedges) + 1 <= budget
+            self._recent_hedges.append(allowed)
+        return allowed
+
+    def _note_unhedged(self) -> None:
+        with self._lock:
+            self._recent_hedges.append(False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of per-provider win/loss statistics and the recent hedge rate."""
+        with self._lock:
+            recent = len(self._recent_hedges)
+            return {
+                "secondary_model": self.config.secondary_model,
+                "recent_hedge_rate": (sum(self._recent_hedges) / recent) if recent else 0.0,
+                "providers": {p: dict(s) for p, s in self._stats.items()},
+            }
+
+    # ---------------------------
+    # Calls
+    # ---------------------------
+    def _call(
+        self,
+        llm: Any,
+        messages: Any,
+        first_token: threading.Event,
+        stream: bool,
+        on_first: Optional[Callable[[], None]] = None,
+    ) -> Any:
+        """`on_first` runs when the response (or, streaming, its first chunk) arrives."""
+        if not stream:
+            result = llm.invoke(messages)
+            first_token.set()
+            if on_first is not None:
+                on_first()
+            return result
+
+        acc = None
+        for chunk in llm.stream(messages):
+            if acc is None:
+                first_token.set()
+                if on_first is not None:
+                    on_first()
+                acc = chunk
+            else:
+                acc = acc + chunk
+        first_token.set()
+        return acc
+
+    def invoke(self, primary: Any, messages: Any, secondary: Any, label: str = "default") -> Any:
+        """
+        Invoke `primary`, hedging to `secondary` if it is slower than the
+        current percentile delay. Structured-output runnables always wait for
+        the full response since their partial chunks cannot be merged.
+        """
+        primary_model = model_name_of(primary)
+        secondary_model = model_name_of(secondary) if secondary is not None else primary_model
+        if secondary is None or secondary_model == primary_model:
+            return primary.invoke(messages)
+
+        stream = self.config.wait_for == "first_token" and isinstance(primary, BaseChatModel)
+        p_provider = provider_of(primary_model)
+        s_provider = provider_of(secondary_model)
+        self._bump(p_provider, "calls")
+
+        delay = self.hedge_delay(label, primary_model)
+        start = time.monotonic()
+        p_first = threading.Event()
+        # the primary keeps running after a hedge (threads can't be cancelled),
+        # so its latency is recorded even when it is slow or loses
+        record_primary = self._latency_recorder(label, primary_model, start)
+        p_future = _HEDGE_EXECUTOR.submit(
+            self._call, primary, messages, p_first, stream, record_primary
+        )
+
+        if stream:
+            p_first.wait(delay)
+        else:
+            wait([p_future], timeout=delay)
+
+        if p_first.is_set() or p_future.done() or not self._allow_hedge():
+            if p_first.is_set() or p_future.done():
+                self._note_unhedged()
+            try:
+                return p_future.result()
+            except Exception:
+                self._bump(p_provider, "errors")
+                raise
+
+        print(
+            f"[HEDGE:{label}] {primary_model} slower than {delay:.2f}s, "
+            f"hedging to {secondary_model}"
+        )
+        self._bump(p_provider, "hedged")
+        self._bump(s_provider, "calls")
+        s_future = _HEDGE_EXECUTOR.submit(
+            self._call, secondary, messages, threading.Event(), stream
+        )
+        racers = {p_future: p_provider, s_future: s_provider}
+        pending = set(racers)
+        last_exc: Optional[BaseException] = None
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                exc = fut.exception()
+                if exc is not None:
+                    self._bump(racers[fut], "errors")
+                    last_exc = exc
+                    continue
+                winner = racers[fut]
+                self._bump(winner, "wins")
+                for other in pending:
+                    other.cancel()  # best effort; a running call is simply ignored
+                    self._bump(racers[other], "losses")
+                return fut.result()
+
+        assert last_exc is not None
+        raise last_exc
+
+    # ---------------------------
+    # Async calls (same policy, asyncio tasks instead of threads)
+    # ---------------------------
+    async def _acall(
+        self,
+        llm: Any,
+        messages: Any,
+        first_token: asyncio.Event,
+        stream: bool,
+        on_first: Optional[Callable[[], None]] = None,
+    ) -> Any:
+        if not stream:
+            result = await llm.ainvoke(messages)
+            first_token.set()
+            if on_first is not None:
+                on_first()
+            return result
+
+        acc = None
+        async for chunk in llm.astream(messages):
+            if acc is None:
+                first_token.set()
+                if on_first is not None:
+                    on_first()
+                acc = chunk
+            else:
+                acc = acc + chunk
+        first_token.set()
+        return acc
+
+    async def ainvoke(self, primary: Any, messages: Any, secondary: Any, label: str = "default") -> Any:
+        """Async counterpart of `invoke`; the losing call is cancelled, not just ignored."""
+        primary_model = model_name_of(primary)
+        secondary_model = model_name_of(secondary) if secondary is not None else primary_model
+        if secondary is None or secondary_model == primary_model:
+            return await primary.ainvoke(messages)
+
+        stream = self.config.wait_for == "first_token" and isinstance(primary, BaseChatModel)
+        p_provider = provider_of(primary_model)
+        s_provider = provider_of(secondary_model)
+        self._bump(p_provider, "calls")
+
+        delay = self.hedge_delay(label, primary_model)
+        start = time.monotonic()
+        p_first = asyncio.Event()
+        record_primary = self._latency_recorder(label, primary_model, start)
+        p_task = asyncio.ensure_future(
+            self._acall(primary, messages, p_first, stream, record_primary)
+        )
+        racers = {p_task: p_provider}
+
+        try:
+            if stream:
+                try:
+                    await asyncio.wait_for(asyncio.shield(p_first.wait()), delay)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.wait([p_task], timeout=delay)
+
+            if p_first.is_set() or p_task.done() or not self._allow_hedge():
+                if p_first.is_set() or p_task.done():
+                    self._note_unhedged()
+                try:
+                    return await p_task
+                except Exception:
+                    self._bump(p_provider, "errors")
+                    raise
+
+            print(
+                f"[HEDGE:{label}] {primary_model} slower than {delay:.2f}s, "
+                f"hedging to {secondary_model}"
+            )
+            self._bump(p_provider, "hedged")
+            self._bump(s_provider, "calls")
+            s_task = asyncio.ensure_future(
+                self._acall(secondary, messages, asyncio.Event(), stream)
+            )
+            racers[s_task] = s_provider
+            pending = set(racers)
+            last_exc: Optional[BaseException] = None
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    exc = task.exception()
+                    if exc is not None:
+                        self._bump(racers[task], "errors")
+                        last_exc = exc
+                        continue
+                    self._bump(racers[task], "wins")
+                    for other in pending:
+                        self._bump(racers[other], "losses")
+                    return task.result()
+
+            assert last_exc is not None
+            raise last_exc
+        finally:
+            if len(racers) > 1 and not p_task.done():
+                # the primary lost the race: it took at least this long
+                record_primary()
+            # Loser (or everything, if we were cancelled) stops right away
+            for task in racers:
+                if not task.done():
+                    task.cancel()
+
+
+HEDGE_CONFIG = HedgeConfig.from_env()
+HEDGE_POLICY: Optional[HedgePolicy] = HedgePolicy(HEDGE_CONFIG) if HEDGE_CONFIG else None
@@ -0,0 +1,247 @@
+# src/messages.py
+"""
+Message catalog for workflow log lines and topic labels.
+
+Most strings shown to users are fixed templates, so their Chinese renderings
+are written here once instead of being sent to an LLM translator on every
+request. Only the free-form parameters of a template (error messages,
+extracted keywords, the query itself) ever need machine translation.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# template_id -> {language: template}
+MESSAGES: Dict[str, Dict[str, str]] = {
+    # ---- API / stream ----
+    "model_selected": {
+        "English": "📌 Model selected: {model}",
+        "Chinese": "📌 已选择模型：{model}",
+    },
+    "temperature_set": {
+        "English": "🎛️ Temperature set to: {temperature}",
+        "Chinese": "🎛️ 温度已设置为：{temperature}",
+    },
+    "queued": {
+        "English": "⏳ Server is busy, you are #{position} in line (about {eta}s)",
+        "Chinese": "⏳ 服务器繁忙，您当前排在第 {position} 位（约 {eta} 秒）",
+    },
+    "joined_run": {
+        "English": "🔗 The same question is being researched right now, following that run",
+        "Chinese": "🔗 相同的问题正在研究中，正在同步该研究的进度",
+    },
+    "cached_result": {
+        "English": "⚡ This question was researched {minutes} min ago, showing the saved result",
+        "Chinese": "⚡ 该问题已在 {minutes} 分钟前研究过，显示已保存的结果",
+    },
+    "run_failed": {
+        "English": "❌ Something went wrong while answering, please try again",
+        "Chinese": "❌ 回答时出现错误，请重试",
+    },
+    # ---- Shared workflow steps ----
+    "finding_articles": {
+        "English": "Finding articles/resources about: {query}",
+        "Chinese": "正在查找相关文章/资源：{query}",
+    },
+    "extracted_tools": {
+        "English": "Extracted tools/platforms: {names}",
+        "Chinese": "已提取的工具/平台：{names}",
+    },
+    "extraction_error": {
+        "English": "Extraction error: {error}",
+        "Chinese": "提取出错：{error}",
+    },
+    "researching_tool": {
+        "English": "researching: {tool}",
+        "Chinese": "正在研究：{tool}",
+    },
+    "no_web_results": {
+        "English": "no web results for {tool}",
+        "Chinese": "未找到 {tool} 的网页结果",
+    },
+    "no_url": {
+        "English": "no URL for {tool}, skipping",
+        "Chinese": "{tool} 没有 URL，已跳过",
+    },
+    "scraping_tool": {
+        "English": "no markdown in search result for {tool}, scraping {url}",
+        "Chinese": "{tool} 的搜索结果中没有 Markdown 内容，正在抓取 {url}",
+    },
+    "no_content": {
+        "English": "no content (markdown/scrape) for {tool}, skipping analysis",
+        "Chinese": "{tool} 没有可用内容（Markdown/抓取），跳过分析",
+    },
+    "research_error": {
+        "English": "error while researching {tool}: {error}",
+        "Chinese": "研究 {tool} 时出错：{error}",
+    },
+    # ---- Tools (CS products) workflow ----
+    "no_extracted_names": {
+        "English": "⚠️ No extracted names found, falling back to direct search",
+        "Chinese": "⚠️ 未提取到名称，改为直接搜索",
+    },
+    "researching_tools": {
+        "English": "{topic} 🔬 Researching specific tools/products: {names}",
+        "Chinese": "{topic} 🔬 正在研究具体的工具/产品：{names}",
+    },
+    "generating_recommendations": {
+        "English": "Generating recommendations",
+        "Chinese": "正在生成推荐",
+    },
+    # ---- Career workflow ----
+    "analysis_error": {
+        "English": "Analysis error for {name}: {error}",
+        "Chinese": "分析 {name} 时出错：{error}",
+    },
+    "no_extracted_tools": {
+        "English": "⚠️ No extracted tools found, falling back to direct search",
+        "Chinese": "⚠️ 未提取到工具，改为直接搜索",
+    },
+    "researching_resources": {
+        "English": "🔬 Researching specific resources: {names}",
+        "Chinese": "🔬 正在研究具体资源：{names}",
+    },
+    "generating_career_plan": {
+        "English": "Generating career action plan and recommendations",
+        "Chinese": "正在生成职业行动计划和建议",
+    },
+    "career_plan_ok": {
+        "English": "Successfully generated CareerActionPlan",
+        "Chinese": "已成功生成职业行动计划",
+    },
+    "career_plan_error": {
+        "English": "❌ Error generating CareerActionPlan: {error}",
+        "Chinese": "❌ 生成职业行动计划出错：{error}",
+    },
+    "career_fallback_error": {
+        "English": "❌ Fallback recommendation error: {error}",
+        "Chinese": "❌ 备用推荐生成出错：{error}",
+    },
+    # ---- Software engineering workflow ----
+    "no_content_found": {
+        "English": "No content found; continuing with empty extraction.",
+        "Chinese": "未找到内容；以空结果继续。",
+    },
+    "extracted_keywords": {
+        "English": "Extracted keywords/concepts: {names}",
+        "Chinese": "已提取的关键词/概念：{names}",
+    },
+    "extraction_failed": {
+        "English": "Extraction failed: {error}",
+        "Chinese": "提取失败：{error}",
+    },
+    "analyzing_resources": {
+        "English": "Analyzing aggregated resources",
+        "Chinese": "正在分析汇总的资源",
+    },
+    "no_detailed_content": {
+        "English": "No detailed content to analyze; skipping analysis.",
+        "Chinese": "没有可分析的详细内容；跳过分析。",
+    },
+    "analysis_failed": {
+        "English": "Analysis failed: {error}",
+        "Chinese": "分析失败：{error}",
+    },
+    "generating_final_recommendations": {
+        "English": "Generating final recommendations",
+        "Chinese": "正在生成最终推荐",
+    },
+}
+
+# Parameters that are free-form English text and still need a translator.
+# Everything else (tool names, URLs, model names, numbers) is kept verbatim.
+FREE_FORM_PARAMS: Dict[str, Tuple[str, ...]] = {
+    "finding_articles": ("query",),
+    "extraction_error": ("error",),
+    "research_error": ("error",),
+    "researching_tools": ("topic",),
+    "analysis_error": ("error",),
+    "career_plan_error": ("error",),
+    "career_fallback_error": ("error",),
+    "extracted_keywords": ("names",),
+    "extraction_failed": ("error",),
+    "analysis_failed": ("error",),
+}
+
+# topic_key -> Chinese label (English labels live in TOPIC_CONFIGS)
+TOPIC_LABELS_ZH: Dict[str, str] = {
+    "developer_tools": "开发者工具",
+    "saas": "SaaS 产品",
+    "api": "API 平台",
+    "ai_ml": "AI 与机器学习平台",
+    "security": "安全与身份认证",
+    "cloud": "云与基础设施",
+    "database": "数据库与数据平台",
+    "resume_tools": "简历优化与 ATS 工具",
+    "job_search": "求职平台与市场分析",
+    "learning_platform": "学习平台与技能路线图",
+    "coding_interview": "编程面试平台",
+    "system_design": "系统设计面试平台",
+    "behavioral_interview": "行为面试与职业辅导工具",
+    "architecture_design": "架构设计建议",
+    "code_quality": "代码质量建议",
+    "testing": "测试",
+    "agile": "敏捷工具",
+    "cicd": "CI/CD 工具",
+}
+
+
+class LogEvent(str):
+    """
+    A structured log line: template id + params.
+
+    It *is* the English rendering (a `str`), so existing log callbacks and
+    `print` keep working; localized consumers can call `render`.
+    """
+
+    template_id: str
+    params: Dict[str, Any]
+
+    def __new__(cls, template_id: str, **params: Any) -> "LogEvent":
+        text = MESSAGES[template_id]["English"].format(**params)
+        obj = super().__new__(cls, text)
+        obj.template_id = template_id
+        obj.params = params
+        return obj
+
+    def free_texts(self) -> List[str]:
+        """Parameter values that need an LLM translator."""
+        return [
+            str(self.params[name])
+            for name in FREE_FORM_PARAMS.get(self.template_id, ())
+            if str(self.params.get(name, "")).strip()
+        ]
+
+    def render(
+        self,
+        language: str,
+        translate_free: Optional[Callable[[str], str]] = None,
+    ) -> str:
+        """
+        Render in `language` from the catalog. Free-form params are passed
+        through `translate_free` (if given); all other params are verbatim.
+        """
+        template = MESSAGES[self.template_id].get(language)
+        if template is None:
+            return str(self)
+        params = dict(self.params)
+        if translate_free is not None:
+            for name in FREE_FORM_PARAMS.get(self.template_id, ()):
+                value = str(params.get(name, ""))
+                if value.strip():
+                    params[name] = translate_free(value)
+        return template.format(**params)
+
+
+def render_message(template_id: str, language: str = "English", **params: Any) -> str:
+    """Render a catalog message with no free-form translation."""
+    return LogEvent(template_id, **params).render(language)
+
+
+def localized_topic_label(topic_key: str, label: str, language: str) -> Optional[str]:
+    """Precomputed label for `topic_key` in `language`, or None if not in the catalog."""
+    if language == "English":
+        return label
+    if language == "Chinese":
+        return TOPIC_LABELS_ZH.get(topic_key)
+    return None
@@ -0,0 +1,391 @@
+# src/metrics.py
+"""
+In-process metrics, exposed at /metrics in the Prometheus text format.
+
+Three kinds, all thread-safe and labelled:
+  - Counter:   only goes up (cache hits, timeouts, fallbacks)
+  - Gauge:     current value (set directly, or computed at scrape time)
+  - Histogram: latency distributions (graph nodes, LLM / Firecrawl calls,
+               translation, ai_highlight, slide rendering, HTTP requests)
+
+Numbers that other components already keep (result cache, topic cache,
+translation memory, scheduler queues, in-flight runs) are not counted twice:
+`REGISTRY.add_collector` registers a function that reads them when /metrics
+is scraped.
+
+Metrics are per process; with several workers, scrape each one (or
+aggregate in Prometheus).
+"""
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from . import tracing
+
+LabelValues = Tuple[str, ...]
+# (name, type, help, [(labels, value)]) produced by collectors at scrape time
+Sample = Tuple[Dict[str, str], float]
+CollectedMetric = Tuple[str, str, str, List[Sample]]
+
+# Seconds; graph nodes and LLM calls run from ~100ms to a minute
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+    return "{" + inner + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(k))} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(k))} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket (non-cumulative) + overflow, sum, count]
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+                self._series[key] = series
+            counts, totals = series
+            counts[index] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the `with` block (also when it raises)."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return int(series[1][1]) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, (list(c), list(t))) for k, (c, t) in self._series.items()]
+        lines = []
+        for key, (counts, (total, count)) in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                bucket_labels = {**labels, "le": _format_value(bound)}
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {_format_value(count)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[CollectedMetric]]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type, name: str, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, *args, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets)
+
+    def add_collector(self, collector: Callable[[], Iterable[CollectedMetric]]) -> None:
+        """Register a function returning (name, type, help, samples) tuples at scrape time."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                collected = list(collector())
+            except Exception as e:
+                print(f"[metrics] collector {getattr(collector, '__name__', collector)} failed: {e}")
+                continue
+            for name, kind, help_text, samples in collected:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# ---------------------------
+# Workflow metrics
+# ---------------------------
+NODE_SECONDS = REGISTRY.histogram(
+    "agent_graph_node_duration_seconds",
+    "Duration of LangGraph nodes (extract_tools, research, analyze, extract_resources, recommend).",
+    ["node", "workflow"],
+)
+WORKFLOW_EVENTS = REGISTRY.counter(
+    "agent_workflow_events_total",
+    "Log events emitted by workflows, by message catalog id.",
+    ["event"],
+)
+FALLBACKS = REGISTRY.counter(
+    "agent_fallbacks_total",
+    "Steps that failed and fell back to a default result (e.g. 'Analysis failed').",
+    ["kind"],
+)
+
+# ---------------------------
+# External calls
+# ---------------------------
+LLM_SECONDS = REGISTRY.histogram(
+    "agent_llm_call_duration_seconds",
+    "Duration of chat model calls.",
+    ["model", "outcome"],
+)
+LLM_TOKENS = REGISTRY.counter(
+    "agent_llm_tokens_total",
+    "Tokens reported by chat model responses.",
+    ["model", "kind"],
+)
+FIRECRAWL_SECONDS = REGISTRY.histogram(
+    "agent_firecrawl_call_duration_seconds",
+    "Duration of Firecrawl calls (outcome: ok, empty, timeout, error).",
+    ["op", "outcome"],
+)
+FIRECRAWL_CACHE = REGISTRY.counter(
+    "agent_firecrawl_cache_total",
+    "Firecrawl cache lookups (result: hit, miss, joined).",
+    ["op", "result"],
+)
+
+# ---------------------------
+# Streams
+# ---------------------------
+STREAM_STARTUP_SECONDS = REGISTRY.histogram(
+    "agent_stream_startup_seconds",
+    "Time from a chat run's start to its first event / its topic event (phase: first_event, topic_event).",
+    ["phase"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0),
+)
+
+# ---------------------------
+# Post-processing
+# ---------------------------
+TRANSLATION_SECONDS = REGISTRY.histogram(
+    "agent_translation_duration_seconds",
+    "Duration of translation LLM calls (kind: text, batch).",
+    ["kind"],
+)
+RENDER_SECONDS = REGISTRY.histogram(
+    "agent_render_duration_seconds",
+    "Duration of reply rendering steps (ai_highlight, document, slides).",
+    ["step"],
+)
+
+# ---------------------------
+# HTTP
+# ---------------------------
+HTTP_SECONDS = REGISTRY.histogram(
+    "agent_http_request_duration_seconds",
+    "Time until the response starts, by route template (streams: time to open the stream).",
+    ["method", "route", "status"],
+)
+
+
+def model_label(llm: Any) -> str:
+    for attr in ("model_name", "model"):
+        value = getattr(llm, attr, None)
+        if isinstance(value, str) and value:
+            return value
+    return type(llm).__name__
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """LangChain callback timing every chat model call and counting its tokens."""
+
+    def __init__(self) -> None:
+        self._starts: Dict[UUID, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, serialized, kwargs)
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, serialized, kwargs)
+
+    def _start(self, run_id: UUID, serialized: Optional[Dict[str, Any]], kwargs: Dict[str, Any]) -> None:
+        params = kwargs.get("invocation_params") or {}
+        model = (
+            params.get("model_name")
+            or params.get("model")
+            or ((serialized or {}).get("kwargs") or {}).get("model_name")
+            or ((serialized or {}).get("kwargs") or {}).get("model")
+            or "unknown"
+        )
+        with self._lock:
+            self._starts[run_id] = (time.perf_counter(), str(model))
+
+    def _finish(self, run_id: UUID, outcome: str) -> Optional[str]:
+        with self._lock:
+            started = self._starts.pop(run_id, None)
+        if started is None:
+            return None
+        t0, model = started
+        LLM_SECONDS.observe(time.perf_counter() - t0, model=model, outcome=outcome)
+        return model
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        model = self._finish(run_id, "ok")
+        if model is None:
+            return
+        usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+        for kind in ("prompt_tokens", "completion_tokens"):
+            if usage.get(kind):
+                LLM_TOKENS.inc(usage[kind], model=model, kind=kind.split("_")[0])
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "error")
+
+
+# Passed as `callbacks=` when chat models are built
+LLM_CALLBACKS: List[BaseCallbackHandler] = (
+    [LLMMetricsCallback()] if os.getenv("LLM_METRICS", "1") != "0" else []
+)
+if tracing.TRACE_SAMPLE_RATE > 0 or tracing.TRACE_SLOW_MS > 0:
+    LLM_CALLBACKS.append(tracing.LLMTracingCallback())
+
+
+def render_latest() -> str:
+    return REGISTRY.render()
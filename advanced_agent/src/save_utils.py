@@ -4,13 +4,12 @@ from datetime import datetime
 from typing import Any, Iterable, List
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
-from pptx import Presentation
-from pptx.util import Inches, Pt
 
 from .format_text import to_document
+from .metrics import LLM_CALLBACKS, RENDER_SECONDS
 
 load_dotenv()
-renderer_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+renderer_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, callbacks=LLM_CALLBACKS)
 
 def _get_items_from_result(result: Any) -> Iterable[Any]:
     """
@@ -209,7 +208,8 @@ Task:
 - Use Markdown bold: **like this**.
 - Return ONLY the modified text.
 """
-    response = renderer_llm.invoke(prompt)
+    with RENDER_SECONDS.time(step="ai_highlight"):
+        response = renderer_llm.invoke(prompt)
     return response.content.strip()
 
 
@@ -238,6 +238,9 @@ def save_result_slides(query: str, result: Any) -> str:
       - Final slide with recommendations / analysis
     Returns the path to the .pptx file.
     """
+    # python-pptx (and its lxml/PIL imports) is only loaded once slides are requested
+    from pptx import Presentation
+
     prs = Presentation()
 
     # ---------- 1) Title slide ----------
@@ -0,0 +1,452 @@
+# src/state_backend.py
+"""
+Pluggable store for state that must be shared between server processes.
+
+Caches (Firecrawl results, finished runs, topic classifications), the run
+registry and artifact metadata all go through one backend, chosen with
+STATE_BACKEND:
+
+    memory                  in-process (default; one worker, same as before)
+    sqlite:///path/state.db one file shared by every worker on the host
+    redis://host:6379/0     shared by workers on any host (needs `redis`)
+
+Data is grouped in namespaces (`STATE.namespace("results", ttl=...)`), each
+holding key -> value entries with an optional TTL, plus append-only lists
+(used for run event logs). The memory backend keeps values as they are; the
+shared ones pickle them, so values must be picklable.
+
+`RedisBackend` accepts any client object with the redis-py methods it uses
+(get/set/delete/rpush/lrange/pexpire/exists/zadd/zrem/zcard/zpopmin), so a
+local stand-in can replace a server.
+
+`namespace(..., max_size=N)` caps a namespace on every backend: the memory
+backend evicts least recently used entries on each write; SQLite and Redis
+drop the oldest-written entries in a trim pass every `TRIM_EVERY` writes to
+the namespace, so they may briefly hold up to that many extra entries.
+"""
+from __future__ import annotations
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Writes to a capped namespace between two trim passes (SQLite, Redis)
+TRIM_EVERY = int(os.getenv("STATE_TRIM_EVERY", "50"))
+
+
+class StateBackend(ABC):
+    """Interface of the state backends; see the module docstring."""
+
+    name = "base"
+    # True if other processes see the same data
+    shared = False
+
+    @abstractmethod
+    def get(self, ns: str, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, ns: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, ns: str, key: str) -> None:
+        ...
+
+    def exists(self, ns: str, key: str) -> bool:
+        return self.get(ns, key) is not None
+
+    @abstractmethod
+    def append(self, ns: str, key: str, value: Any, ttl: Optional[float] = None) -> int:
+        """Append to the list at `key`; returns its new length."""
+
+    @abstractmethod
+    def read_list(self, ns: str, key: str, start: int = 0) -> List[Any]:
+        """Items of the list at `key` from index `start` on."""
+
+    @abstractmethod
+    def set_limit(self, ns: str, max_size: int) -> None:
+        """Cap the entry count of `ns` (list items are not counted)."""
+
+    def namespace(self, name: str, ttl: Optional[float] = None, max_size: Optional[int] = None) -> "Namespace":
+        if max_size is not None:
+            self.set_limit(name, max_size)
+        return Namespace(self, name, ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "shared": self.shared}
+
+
+class Namespace:
+    """Keys of one namespace, with a default TTL."""
+
+    def __init__(self, backend: StateBackend, name: str, ttl: Optional[float] = None) -> None:
+        self.backend = backend
+        self.name = name
+        self.ttl = ttl
+
+    @property
+    def shared(self) -> bool:
+        return self.backend.shared
+
+    def get(self, key: str, default: Optional[Any] = None) -> Optional[Any]:
+        value = self.backend.get(self.name, key)
+        return default if value is None else value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.backend.set(self.name, key, value, ttl if ttl is not None else self.ttl)
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(self.name, key)
+
+    def exists(self, key: str) -> bool:
+        return self.backend.exists(self.name, key)
+
+    def append(self, key: str, value: Any, ttl: Optional[float] = None) -> int:
+        return self.backend.append(self.name, key, value, ttl if ttl is not None else self.ttl)
+
+    def read_list(self, key: str, start: int = 0) -> List[Any]:
+        return self.backend.read_list(self.name, key, start)
+
+
+def _expires_at(ttl: Optional[float]) -> Optional[float]:
+    return time.time() + ttl if ttl else None
+
+
+def _expired(expires_at: Optional[float]) -> bool:
+    return expires_at is not None and expires_at <= time.time()
+
+
+# ---------------------------
+# In-process
+# ---------------------------
+class MemoryBackend(StateBackend):
+    """Per-process dicts; namespaces with a limit evict least recently used entries."""
+
+    name = "memory"
+    shared = False
+
+    def __init__(self) -> None:
+        self._data: Dict[str, "OrderedDict[str, Tuple[Optional[float], Any]]"] = {}
+        self._lists: Dict[Tuple[str, str], Tuple[Optional[float], List[Any]]] = {}
+        self._limits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def set_limit(self, ns: str, max_size: int) -> None:
+        with self._lock:
+            self._limits[ns] = max_size
+
+    def get(self, ns: str, key: str) -> Optional[Any]:
+        with self._lock:
+            entries = self._data.get(ns)
+            if not entries or key not in entries:
+                return None
+            expires_at, value = entries[key]
+            if _expired(expires_at):
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return value
+
+    def set(self, ns: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            entries = self._data.setdefault(ns, OrderedDict())
+            entries[key] = (_expires_at(ttl), value)
+            entries.move_to_end(key)
+            limit = self._limits.get(ns)
+            while limit is not None and len(entries) > limit:
+                entries.popitem(last=False)
+
+    def delete(self, ns: str, key: str) -> None:
+        with self._lock:
+            self._data.get(ns, {}).pop(key, None)
+            self._lists.pop((ns, key), None)
+
+    def append(self, ns: str, key: str, value: Any, ttl: Optional[float] = None) -> int:
+        with self._lock:
+            _, items = self._lists.get((ns, key), (None, []))
+            items.append(value)
+            self._lists[(ns, key)] = (_expires_at(ttl), items)
+            return len(items)
+
+    def read_list(self, ns: str, key: str, start: int = 0) -> List[Any]:
+        with self._lock:
+            expires_at, items = self._lists.get((ns, key), (None, []))
+            if _expired(expires_at):
+                self._lists.pop((ns, key), None)
+                return []
+            return items[start:]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sizes = {ns: len(entries) for ns, entries in self._data.items()}
+        return {**super().stats(), "namespaces": sizes}
+
+
+# ---------------------------
+# SQLite (one host, many processes)
+# ---------------------------
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    ns         TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    value      BLOB NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (ns, key)
+);
+CREATE TABLE IF NOT EXISTS list_items (
+    ns         TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    idx        INTEGER NOT NULL,
+    value      BLOB NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (ns, key, idx)
+);
+"""
+
+
+class SQLiteBackend(StateBackend):
+    """
+    One SQLite file (WAL mode) shared by the workers of a host. Each thread
+    gets its own connection; expired rows are pruned every `prune_every` writes.
+    """
+
+    name = "sqlite"
+    shared = True
+
+    def __init__(self, path: str, prune_every: int = 500) -> None:
+        self.path = path
+        self.prune_every = prune_every
+        self._local = threading.local()
+        self._writes = 0
+        # ns -> max entries, and writes since its last trim
+        self._limits: Dict[str, int] = {}
+        self._ns_writes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.executescript(_SQLITE_SCHEMA)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _wrote(self) -> None:
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.prune_every == 0
+        if due:
+            self.prune()
+
+    def set_limit(self, ns: str, max_size: int) -> None:
+        with self._lock:
+            self._limits[ns] = max_size
+
+    def _maybe_trim(self, ns: str) -> None:
+        with self._lock:
+            limit = self._limits.get(ns)
+            if limit is None:
+                return
+            self._ns_writes[ns] = self._ns_writes.get(ns, 0) + 1
+            if self._ns_writes[ns] < TRIM_EVERY:
+                return
+            self._ns_writes[ns] = 0
+        self.trim(ns, limit)
+
+    def trim(self, ns: str, max_size: int) -> None:
+        """Keep the `max_size` most recently written entries of `ns`."""
+        # INSERT OR REPLACE gives a rewritten row a new, highest rowid
+        self._conn().execute(
+            "DELETE FROM kv WHERE rowid IN ("
+            " SELECT rowid FROM kv WHERE ns = ? ORDER BY rowid DESC LIMIT -1 OFFSET ?)",
+            (ns, max_size),
+        )
+
+    def prune(self) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        conn.execute("DELETE FROM list_items WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+
+    def get(self, ns: str, key: str) -> Optional[Any]:
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM kv WHERE ns = ? AND key = ?", (ns, key)
+        ).fetchone()
+        if row is None or _expired(row[1]):
+            return None
+        return pickle.loads(row[0])
+
+    def set(self, ns: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO kv (ns, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (ns, key, pickle.dumps(value), _expires_at(ttl)),
+        )
+        self._wrote()
+        self._maybe_trim(ns)
+
+    def delete(self, ns: str, key: str) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM kv WHERE ns = ? AND key = ?", (ns, key))
+        conn.execute("DELETE FROM list_items WHERE ns = ? AND key = ?", (ns, key))
+
+    def exists(self, ns: str, key: str) -> bool:
+        row = self._conn().execute(
+            "SELECT expires_at FROM kv WHERE ns = ? AND key = ?", (ns, key)
+        ).fetchone()
+        return row is not None and not _expired(row[0])
+
+    def append(self, ns: str, key: str, value: Any, ttl: Optional[float] = None) -> int:
+        conn = self._conn()
+        # IMMEDIATE: the next index is read and written without another writer in between
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            (next_idx,) = conn.execute(
+                "SELECT COALESCE(MAX(idx) + 1, 0) FROM list_items WHERE ns = ? AND key = ?",
+                (ns, key),
+            ).fetchone()
+            conn.execute(
+                "INSERT INTO list_items (ns, key, idx, value, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (ns, key, next_idx, pickle.dumps(value), _expires_at(ttl)),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._wrote()
+        return next_idx + 1
+
+    def read_list(self, ns: str, key: str, start: int = 0) -> List[Any]:
+        rows = self._conn().execute(
+            "SELECT value, expires_at FROM list_items WHERE ns = ? AND key = ? AND idx >= ? ORDER BY idx",
+            (ns, key, start),
+        ).fetchall()
+        return [pickle.loads(value) for value, expires_at in rows if not _expired(expires_at)]
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self._conn().execute("SELECT ns, COUNT(*) FROM kv GROUP BY ns").fetchall()
+        return {**super().stats(), "path": self.path, "namespaces": dict(rows)}
+
+
+# ---------------------------
+# Redis (any number of hosts)
+# ---------------------------
+class RedisBackend(StateBackend):
+    """
+    Keys are `<prefix><ns>:<key>`; TTLs map to PX/PEXPIRE, so Redis does the
+    expiry. Capped namespaces also keep a sorted set of their keys by write
+    time (`<prefix>__index__:<ns>`) to find the oldest entries when trimming.
+    """
+
+    name = "redis"
+    shared = True
+
+    def __init__(self, url: str = "", client: Any = None, prefix: str = "agent:") -> None:
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError(
+                    "STATE_BACKEND=redis://... needs the `redis` package (pip install redis)"
+                ) from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        # ns -> max entries, and writes since its last trim
+        self._limits: Dict[str, int] = {}
+        self._ns_writes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, ns: str, key: str) -> str:
+        return f"{self.prefix}{ns}:{key}"
+
+    def _index_key(self, ns: str) -> str:
+        # sorted set of the namespace's keys, scored by write time
+        return f"{self.prefix}__index__:{ns}"
+
+    def set_limit(self, ns: str, max_size: int) -> None:
+        with self._lock:
+            self._limits[ns] = max_size
+
+    def _maybe_trim(self, ns: str, key: str) -> None:
+        with self._lock:
+            limit = self._limits.get(ns)
+            if limit is None:
+                return
+            self._ns_writes[ns] = self._ns_writes.get(ns, 0) + 1
+            due = self._ns_writes[ns] >= TRIM_EVERY
+            if due:
+                self._ns_writes[ns] = 0
+        self.client.zadd(self._index_key(ns), {key: time.time()})
+        if due:
+            self.trim(ns, limit)
+
+    def trim(self, ns: str, max_size: int) -> None:
+        """Delete the oldest-written entries of `ns` beyond `max_size`."""
+        index = self._index_key(ns)
+        excess = int(self.client.zcard(index)) - max_size
+        if excess <= 0:
+            return
+        oldest = [member for member, _ in self.client.zpopmin(index, excess)]
+        keys = [self._key(ns, m.decode() if isinstance(m, bytes) else m) for m in oldest]
+        self.client.delete(*keys)
+
+    def get(self, ns: str, key: str) -> Optional[Any]:
+        raw = self.client.get(self._key(ns, key))
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, ns: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        px = int(ttl * 1000) if ttl else None
+        self.client.set(self._key(ns, key), pickle.dumps(value), px=px)
+        self._maybe_trim(ns, key)
+
+    def delete(self, ns: str, key: str) -> None:
+        self.client.delete(self._key(ns, key))
+        if ns in self._limits:
+            self.client.zrem(self._index_key(ns), key)
+
+    def exists(self, ns: str, key: str) -> bool:
+        return bool(self.client.exists(self._key(ns, key)))
+
+    def append(self, ns: str, key: str, value: Any, ttl: Optional[float] = None) -> int:
+        full_key = self._key(ns, key)
+        length = self.client.rpush(full_key, pickle.dumps(value))
+        if ttl:
+            self.client.pexpire(full_key, int(ttl * 1000))
+        return int(length)
+
+    def read_list(self, ns: str, key: str, start: int = 0) -> List[Any]:
+        return [pickle.loads(raw) for raw in self.client.lrange(self._key(ns, key), start, -1)]
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "prefix": self.prefix}
+
+
+def build_state_backend(spec: str) -> StateBackend:
+    """Backend for a STATE_BACKEND value (see the module docstring)."""
+    spec = (spec or "memory").strip()
+    if spec == "memory":
+        return MemoryBackend()
+    if spec.startswith("sqlite:"):
+        path = spec[len("sqlite:"):]
+        if path.startswith("///"):
+            path = path[3:]
+        return SQLiteBackend(path or "state/state.db")
+    if spec.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(spec, prefix=os.getenv("STATE_KEY_PREFIX", "agent:"))
+    raise ValueError(f"Unknown STATE_BACKEND '{spec}' (use memory, sqlite:///path or redis://...)")
+
+
+STATE = build_state_backend(os.getenv("STATE_BACKEND", "memory"))
+print(f"[state] backend: {STATE.name}")
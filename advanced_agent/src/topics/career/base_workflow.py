@@ -1,16 +1,12 @@
 # src/topics/career/base_workflow.py
-from concurrent.futures import as_completed, ThreadPoolExecutor
+import asyncio
+from concurrent.futures import as_completed
 from typing import Any, Dict, List, Optional, Type, TypeVar, Generic, Callable
 
-from langchain_anthropic import ChatAnthropic
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
-from langchain_deepseek import ChatDeepSeek
-from langchain_community.chat_models import QianfanChatEndpoint
 
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from ..cs.base_workflow import CompanyT
 from ..software_engineering.base_workflow import LogCallback
 from ...firecrawl import FirecrawlService
 from .base_models import (
@@ -22,6 +18,7 @@ from .base_models import (
 )
 
 from .base_prompts import CareerBasePrompts, HasToolPrompts
+from ...metrics import FALLBACKS
 from ..root_workflow import RootWorkflow
 
 TState = TypeVar("TState", bound=CareerBaseResearchState)
@@ -38,6 +35,9 @@ class CareerBaseWorkflow(RootWorkflow, Generic[TState, TInfo, TAnalysis, TPrompt
       - topic_label
       - article_query_suffix
       - official_site_suffix
+
+    Every node has a sync and an async implementation: `run` drives the graph
+    with `invoke` (threads), `arun` with `ainvoke` (one event loop).
     """
 
     state_cls: Type[TState] = CareerBaseResearchState  # type: ignore
@@ -66,9 +66,9 @@ class CareerBaseWorkflow(RootWorkflow, Generic[TState, TInfo, TAnalysis, TPrompt
 
     def _build_workflow(self):
         graph = StateGraph(self.state_cls)
-        graph.add_node("extract_tools", self._extract_tools_step)
-        graph.add_node("research", self._research_step)
-        graph.add_node("analyze", self._analyze_step)
+        graph.add_node("extract_tools", self._node("extract_tools", self._extract_tools_step, self._aextract_tools_step))
+        graph.add_node("research", self._node("research", self._research_step, self._aresearch_step))
+        graph.add_node("analyze", self._node("analyze", self._analyze_step, self._aanalyze_step))
         graph.set_entry_point("extract_tools")
         graph.add_edge("extract_tools", "research")
         graph.add_edge("research", "analyze")
@@ -77,19 +77,16 @@ class CareerBaseWorkflow(RootWorkflow, Generic[TState, TInfo, TAnalysis, TPrompt
 
 
     # ---- Steps ----
+    def _article_query(self, query: str) -> str:
+        return f"{query} {self.article_query_suffix}"
+
     def _extract_tools_step(self, state: TState) -> Dict[str, Any]:
-        self._log(f"Finding articles/resources about: {state.query}")
+        self._check_cancelled("extract")
+        self._log_event("finding_articles", query=state.query)
 
-        article_query = f"{state.query} {self.article_query_suffix}"
+        article_query = self._article_query(state.query)
         search_results = self.firecrawl.search_companies(article_query, num_results=3)
-
-        # Normalize Firecrawl search results → web_results (list of docs)
-        if hasattr(search_results, "web"):
-            web_results = search_results.web
-        elif isinstance(search_results, dict):
-            web_results = search_results.get("web", [])
-        else:
-            web_results = search_results
+        web_results = self._normalize_web_results(search_results)
 
         all_content = ""
         for result in web_results:
@@ -107,63 +104,179 @@ class CareerBaseWorkflow(RootWorkflow, Generic[TState, TInfo, TAnalysis, TPrompt
                 if scraped and getattr(scraped, "markdown", None):
                     all_content += scraped.markdown[:1500] + "\n\n"
 
-        messages = [
-            SystemMessage(content=self.prompts.TOOL_EXTRACTION_SYSTEM),
-            HumanMessage(content=self.prompts.tool_extraction_user(state.query, all_content)),
-        ]
+        try:
+            response = self.llm.invoke(self._extraction_messages(state.query, all_content))
+            return {"extracted_tools": self._parse_tool_names(response)}
+        except Exception as e:
+            self._log_event("extraction_error", error=e)
+            return {"extracted_tools": []}
+
+    async def _aextract_tools_step(self, state: TState) -> Dict[str, Any]:
+        self._check_cancelled("extract")
+        self._log_event("finding_articles", query=state.query)
+
+        article_query = self._article_query(state.query)
+        search_results = await self.firecrawl.asearch_companies(article_query, num_results=3)
+        web_results = self._normalize_web_results(search_results)
+
+        async def content_of(result: Any) -> str:
+            markdown = getattr(result, "markdown", None)
+            if markdown:
+                return markdown
+            url = getattr(result, "url", None) or (
+                result.get("url") if isinstance(result, dict) else ""
+            )
+            if not url:
+                return ""
+            scraped = await self.firecrawl.ascrape_company_pages(url)
+            if scraped and getattr(scraped, "markdown", None):
+                return scraped.markdown[:1500] + "\n\n"
+            return ""
+
+        all_content = "".join(await asyncio.gather(*(content_of(r) for r in web_results)))
 
         try:
-            response = self.llm.invoke(messages)
-            tool_names = [
-                name.strip()
-                for name in response.content.strip().split("\n")
-                if name.strip()
-            ]
-            self._log(f"Extracted tools/platforms: {', '.join(tool_names[:5])}")
-            return {"extracted_tools": tool_names}
+            response = await self.llm.ainvoke(self._extraction_messages(state.query, all_content))
+            return {"extracted_tools": self._parse_tool_names(response)}
         except Exception as e:
-            self._log(f"Extraction error: {e}")
+            self._log_event("extraction_error", error=e)
             return {"extracted_tools": []}
 
-    def _analyze_company_content(self, name: str, content: str) -> TAnalysis:
-        structured_llm = self.llm.with_structured_output(self.analysis_cls)
+    @staticmethod
+    def _normalize_web_results(search_results: Any) -> List[Any]:
+        # Normalize Firecrawl search results → web_results (list of docs)
+        if hasattr(search_results, "web"):
+            return search_results.web
+        if isinstance(search_results, dict):
+            return search_results.get("web", [])
+        return search_results
 
-        messages = [
-            SystemMessage(content=self.prompts.TOOL_ANALYSIS_SYSTEM),
-            HumanMessage(content=self.prompts.tool_analysis_user(name, content)),
+    def _extraction_messages(self, query: str, all_content: str) -> List[Any]:
+        return [
+            SystemMessage(content=self.prompts.TOOL_EXTRACTION_SYSTEM),
+            HumanMessage(content=self.prompts.tool_extraction_user(query, all_content)),
+        ]
+
+    def _parse_tool_names(self, response: Any) -> List[str]:
+        tool_names = [
+            name.strip()
+            for name in response.content.strip().split("\n")
+            if name.strip()
         ]
+        self._log_event("extracted_tools", names=", ".join(tool_names[:5]))
+        return tool_names
+
+    def _analyze_company_content(self, name: str, content: str) -> TAnalysis:
+        self._check_cancelled("tool_analysis")
+        structured_llm = self._structured(self.analysis_cls)
+
         try:
-            analysis = structured_llm.invoke(messages)
+            analysis = structured_llm.invoke(self._tool_analysis_messages(name, content))
             return analysis
         except Exception as e:
-            self._log(f"Analysis error for {name}: {e}")
-            # Provide a minimal default
-            return self.analysis_cls(
-                pricing_model="Unknown",
-                pricing_details=None,
-                is_open_source=None,
-                tech_stack=[],
-                description="Analysis failed",
-                api_available=None,
-                language_support=[],
-                integration_capabilities=[],
-                target_roles=[],
-                seniority_focus=None,
-            )
+            self._log_event("analysis_error", name=name, error=e)
+            return self._fallback_analysis()
+
+    async def _aanalyze_company_content(self, name: str, content: str) -> TAnalysis:
+        self._check_cancelled("tool_analysis")
+        structured_llm = self._structured(self.analysis_cls)
 
-    def _research_single_tool(self, tool_name: str) -> Optional[CompanyT]:
-        self._log(f"researching: {tool_name}")
+        try:
+            return await structured_llm.ainvoke(self._tool_analysis_messages(name, content))
+        except Exception as e:
+            self._log_event("analysis_error", name=name, error=e)
+            return self._fallback_analysis()
+
+    def _tool_analysis_messages(self, name: str, content: str) -> List[Any]:
+        return [
+            SystemMessage(content=self.prompts.TOOL_ANALYSIS_SYSTEM),
+            HumanMessage(content=self.prompts.tool_analysis_user(name, content)),
+        ]
+
+    def _fallback_analysis(self) -> TAnalysis:
+        # Provide a minimal default
+        FALLBACKS.inc(kind="tool_analysis")
+        return self.analysis_cls(
+            pricing_model="Unknown",
+            pricing_details=None,
+            is_open_source=None,
+            tech_stack=[],
+            description="Analysis failed",
+            api_available=None,
+            language_support=[],
+            integration_capabilities=[],
+            target_roles=[],
+            seniority_focus=None,
+        )
+
+    def _research_single_tool(self, tool_name: str) -> Optional[TInfo]:
+        self._check_cancelled("research_tool")
+        self._log_event("researching_tool", tool=tool_name)
         tool_query = f"{tool_name} official site"
 
         tool_search_results = self.firecrawl.search_companies(tool_query, num_results=1)
         web_results = self._get_web_results(tool_search_results)
 
         if not web_results:
-            self._log(f"no web results for {tool_name}")
+            self._log_event("no_web_results", tool=tool_name)
+            return None
+
+        doc = web_results[0]
+        company = self._company_from_doc(tool_name, doc)
+        if company is None:
+            return None
+
+        # Prefer search markdown if available
+        content = getattr(doc, "markdown", None)
+
+        if not content:
+            self._log_event("scraping_tool", tool=tool_name, url=company.website)
+            scraped = self.firecrawl.scrape_company_pages(company.website)
+            if scraped and getattr(scraped, "markdown", None):
+                content = scraped.markdown
+
+        if content:
+            analysis = self._analyze_company_content(company.name, content)
+            self._apply_analysis(company, analysis)
+        else:
+            self._log_event("no_content", tool=tool_name)
+
+        return company
+
+    async def _aresearch_single_tool(self, tool_name: str) -> Optional[TInfo]:
+        self._check_cancelled("research_tool")
+        self._log_event("researching_tool", tool=tool_name)
+        tool_query = f"{tool_name} official site"
+
+        tool_search_results = await self.firecrawl.asearch_companies(tool_query, num_results=1)
+        web_results = self._get_web_results(tool_search_results)
+
+        if not web_results:
+            self._log_event("no_web_results", tool=tool_name)
             return None
 
         doc = web_results[0]
+        company = self._company_from_doc(tool_name, doc)
+        if company is None:
+            return None
+
+        content = getattr(doc, "markdown", None)
+        if not content:
+            self._log_event("scraping_tool", tool=tool_name, url=company.website)
+            scraped = await self.firecrawl.ascrape_company_pages(company.website)
+            if scraped and getattr(scraped, "markdown", None):
+                content = scraped.markdown
+
+        if content:
+            analysis = await self._aanalyze_company_content(company.name, content)
+            self._apply_analysis(company, analysis)
+        else:
+            self._log_event("no_content", tool=tool_name)
 
+        return company
+
+    def _company_from_doc(self, tool_name: str, doc: Any) -> Optional[TInfo]:
+        """Company stub from the tool's top search result (None without a URL)."""
         url = getattr(doc, "url", "") or ""
         desc = ""
 
@@ -174,10 +287,10 @@ class CareerBaseWorkflow(RootWorkflow, Generic[TState, TInfo, TAnalysis, TPrompt
                 url = getattr(meta, "url", "") or url
 
         if not url:
-            self._log(f"no URL for {tool_name}, skipping")
+            self._log_event("no_url", tool=tool_name)
             return None
 
-        company = self.info_cls(  # type: ignore
+        return self.info_cls(  # type: ignore
             name=tool_name,
             description=desc,
             website=url,
@@ -185,107 +298,93 @@ class CareerBaseWorkflow(RootWorkflow, Generic[TState, TInfo, TAnalysis, TPrompt
             competitors=[],
         )
 
-        # Prefer search markdown if available
-        content = getattr(doc, "markdown", None)
-
-        if not content:
-            self._log(f"no markdown in search result for {tool_name}, scraping {url}")
-            scraped = self.firecrawl.scrape_company_pages(url)
-            if scraped and getattr(scraped, "markdown", None):
-                content = scraped.markdown
-
-        if content:
-            print("Checking:", company.name)
-            analysis = self._analyze_company_content(company.name, content)
-            print("Done checking:", company.name)
-            company.pricing_model = analysis.pricing_model
-            company.pricing_details = analysis.pricing_details
-            company.is_open_source = analysis.is_open_source
-            company.tech_stack = analysis.tech_stack
-            company.description = analysis.description
-            company.api_available = analysis.api_available
-            company.language_support = analysis.language_support
-            company.integration_capabilities = analysis.integration_capabilities
-            company.target_roles = analysis.target_roles
-            company.seniority_focus = analysis.seniority_focus
-        else:
-            self._log(f"no content (markdown/scrape) for {tool_name}, skipping analysis")
-
-        return company
+    @staticmethod
+    def _apply_analysis(company: TInfo, analysis: TAnalysis) -> None:
+        company.pricing_model = analysis.pricing_model
+        company.pricing_details = analysis.pricing_details
+        company.is_open_source = analysis.is_open_source
+        company.tech_stack = analysis.tech_stack
+        company.description = analysis.description
+        company.api_available = analysis.api_available
+        company.language_support = analysis.language_support
+        company.integration_capabilities = analysis.integration_capabilities
+        company.target_roles = analysis.target_roles
+        company.seniority_focus = analysis.seniority_focus
 
     def _research_step(self, state: TState) -> Dict[str, Any]:
+        self._check_cancelled("research")
         extracted = getattr(state, "extracted_tools", [])
 
         if not extracted:
-            self._log("⚠️ No extracted tools found, falling back to direct search")
+            self._log_event("no_extracted_tools")
             search_results = self.firecrawl.search_companies(state.query, num_results=4)
-            if hasattr(search_results, "web"):
-                web_results = search_results.web
-            elif isinstance(search_results, dict):
-                web_results = search_results.get("web", [])
-            else:
-                web_results = search_results
-
-            tool_names = [
-                getattr(doc, "metadata", None).title
-                if getattr(doc, "metadata", None) and getattr(doc.metadata, "title", None)
-                else getattr(doc, "title", None) or "Unknown"
-                for doc in web_results
-            ]
+            tool_names = self._names_from_search(search_results)
         else:
             tool_names = extracted[:4]
 
-        self._log(f"🔬 Researching specific resources: {', '.join(tool_names)}")
+        self._log_event("researching_resources", names=", ".join(tool_names))
 
         companies: List[TInfo] = []
 
-        max_workers = min(4, len(tool_names))  # cap to avoid too many parallel calls
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_name = {
-                executor.submit(self._research_single_tool, name): name
-                for name in tool_names
-            }
-
-            for fut in as_completed(future_to_name):
-                tool_name = future_to_name[fut]
-                try:
-                    comp = fut.result()
-                    if comp is not None:
-                        companies.append(comp)
-                except Exception as e:
-                    self._log(f"error while researching {tool_name}: {e}")
+        # Shared, bounded research pool (see RESEARCH_EXECUTOR); at most 4 tools per run
+        future_to_name = {
+            self._submit_research(self._research_single_tool, name): name
+            for name in tool_names[:4]
+        }
+
+        for fut in as_completed(future_to_name):
+            if self._is_cancelled():
+                # client is gone: drop the tools nobody has started on yet
+                self._abort_futures(future_to_name)
+            tool_name = future_to_name[fut]
+            try:
+                comp = fut.result()
+                if comp is not None:
+                    companies.append(comp)
+            except Exception as e:
+                self._log_event("research_error", tool=tool_name, error=e)
+
         return {"companies": companies}
 
-    import json  # make sure this is at the top of the file
+    async def _aresearch_step(self, state: TState) -> Dict[str, Any]:
+        self._check_cancelled("research")
+        extracted = getattr(state, "extracted_tools", [])
 
-    def _analyze_step(self, state: TState) -> Dict[str, Any]:
-        self._log("Generating career action plan and recommendations")
+        if not extracted:
+            self._log_event("no_extracted_tools")
+            search_results = await self.firecrawl.asearch_companies(state.query, num_results=4)
+            tool_names = self._names_from_search(search_results)
+        else:
+            tool_names = extracted[:4]
 
-        company_data = ", ".join([c.model_dump_json() for c in state.companies])
+        self._log_event("researching_resources", names=", ".join(tool_names))
 
-        messages = [
-            SystemMessage(content=self.prompts.RECOMMENDATIONS_SYSTEM),
-            HumanMessage(content=self.prompts.recommendations_user(state.query, company_data)),
-        ]
+        # at most 4 tools per run, researched concurrently on the event loop
+        companies = await self._agather_research(tool_names[:4], self._aresearch_single_tool)
+        return {"companies": companies}
 
-        structured_llm = self.llm.with_structured_output(CareerActionPlan)
+    def _names_from_search(self, search_results: Any) -> List[str]:
+        """Fallback tool names: titles of a plain search for the query."""
+        return [
+            getattr(doc, "metadata", None).title
+            if getattr(doc, "metadata", None) and getattr(doc.metadata, "title", None)
+            else getattr(doc, "title", None) or "Unknown"
+            for doc in self._normalize_web_results(search_results)
+        ]
 
-        try:
-            plan: CareerActionPlan = structured_llm.invoke(messages)  # type: ignore[assignment]
-            self._log("Successfully generated CareerActionPlan")
+    import json  # make sure this is at the top of the file
 
-            goal = CareerGoal(raw_query=state.query)
+    def _analyze_step(self, state: TState) -> Dict[str, Any]:
+        self._check_cancelled("analyze")
+        self._log_event("generating_career_plan")
+        messages = self._recommendation_messages(state)
 
-            return {
-                # 🔹 Keep `analysis` as a string – JSON-serialized plan
-                #    (your to_document() will parse and pretty-print this)
-                "analysis": plan.model_dump_json(indent=2, ensure_ascii=False),
-                "plan": plan,
-                "goal": goal,
-            }
+        try:
+            plan: CareerActionPlan = self._hedged_invoke(messages, CareerActionPlan)  # type: ignore[assignment]
+            return self._plan_result(state, plan)
 
         except Exception as e:
-            self._log(f"❌ Error generating CareerActionPlan: {e}")
+            self._log_event("career_plan_error", error=e)
             # Fallback: plain-text analysis string, as before
             try:
                 fallback = self.llm.invoke(messages)
@@ -295,15 +394,63 @@ class CareerBaseWorkflow(RootWorkflow, Generic[TState, TInfo, TAnalysis, TPrompt
                     "goal": CareerGoal(raw_query=state.query),
                 }
             except Exception as inner_e:
-                self._log(f"❌ Fallback recommendation error: {inner_e}")
+                self._log_event("career_fallback_error", error=inner_e)
                 return {
                     "analysis": "Failed to generate a structured career plan.",
                     "plan": None,
                     "goal": CareerGoal(raw_query=state.query),
                 }
 
+    async def _aanalyze_step(self, state: TState) -> Dict[str, Any]:
+        self._check_cancelled("analyze")
+        self._log_event("generating_career_plan")
+        messages = self._recommendation_messages(state)
+
+        try:
+            plan: CareerActionPlan = await self._ahedged_invoke(messages, CareerActionPlan)  # type: ignore[assignment]
+            return self._plan_result(state, plan)
+        except Exception as e:
+            self._log_event("career_plan_error", error=e)
+            try:
+                fallback = await self.llm.ainvoke(messages)
+                return {
+                    "analysis": fallback.content,
+                    "plan": None,
+                    "goal": CareerGoal(raw_query=state.query),
+                }
+            except Exception as inner_e:
+                self._log_event("career_fallback_error", error=inner_e)
+                return {
+                    "analysis": "Failed to generate a structured career plan.",
+                    "plan": None,
+                    "goal": CareerGoal(raw_query=state.query),
+                }
+
+    def _recommendation_messages(self, state: TState) -> List[Any]:
+        company_data = ", ".join([c.model_dump_json() for c in state.companies])
+        return [
+            SystemMessage(content=self.prompts.RECOMMENDATIONS_SYSTEM),
+            HumanMessage(content=self.prompts.recommendations_user(state.query, company_data)),
+        ]
+
+    def _plan_result(self, state: TState, plan: CareerActionPlan) -> Dict[str, Any]:
+        self._log_event("career_plan_ok")
+        return {
+            # 🔹 Keep `analysis` as a string – JSON-serialized plan
+            #    (your to_document() will parse and pretty-print this)
+            "analysis": plan.model_dump_json(indent=2, ensure_ascii=False),
+            "plan": plan,
+            "goal": CareerGoal(raw_query=state.query),
+        }
+
     # Public entry
     def run(self, query: str) -> TState:
         initial_state = self.state_cls(query=query)
         final_state = self.workflow.invoke(initial_state)
-        return self.state_cls(**final_state)
\ No newline at end of file
+        return self.state_cls(**final_state)
+
+    async def arun(self, query: str) -> TState:
+        """Native async `run`: LangGraph `ainvoke`, async LLM and Firecrawl calls."""
+        initial_state = self.state_cls(query=query)
+        final_state = await self.workflow.ainvoke(initial_state)
+        return self.state_cls(**final_state)
@@ -74,11 +74,8 @@ class BaseCSWorkflow(RootWorkflow, Generic[StateT, CompanyT, AnalysisT]):
 
         article_query = self.article_query_template.format(query=state.query)
         search_results = self.firecrawl.search_companies(article_query, num_results=3)
-        print("_extract_tools_step, check0")
         web_results = self._get_web_results(search_results)
-        print("_extract_tools_step, check1")
         all_content = self._build_all_content_from_results(web_results)
-        print("_extract_tools_step, check2")
         messages = [
             SystemMessage(content=self.prompts.TOOL_EXTRACTION_SYSTEM),
             HumanMessage(content=self.prompts.tool_extraction_user(state.query, all_content)),
@@ -103,7 +100,7 @@ class BaseCSWorkflow(RootWorkflow, Generic[StateT, CompanyT, AnalysisT]):
     # Helper: analyze one company's content into structured fields
     # ------------------------------------------------------------------ #
     def _analyze_company_content(self, company_name: str, content: str) -> AnalysisT:
-        structured_llm = self.llm.with_structured_output(self.analysis_model)
+        structured_llm = self._structured(self.analysis_model)
 
         messages = [
             SystemMessage(content=self.prompts.TOOL_ANALYSIS_SYSTEM),
@@ -135,12 +132,10 @@ class BaseCSWorkflow(RootWorkflow, Generic[StateT, CompanyT, AnalysisT]):
         tool_query = f"{tool_name} official site"
 
         tool_search_results = self.firecrawl.search_companies(tool_query, num_results=1)
-        print("Pre-pre-pre checking", tool_name)
         web_results = self._get_web_results(tool_search_results)
         if not web_results:
             self._log(f"no web results for {tool_name}")
             return None
-        print("Pre-pre checking", tool_name)
         doc = web_results[0]
 
         url = getattr(doc, "url", "") or ""
@@ -161,7 +156,6 @@ class BaseCSWorkflow(RootWorkflow, Generic[StateT, CompanyT, AnalysisT]):
             tech_stack=[],
             competitors=[],
         )
-        print("Pre checking", company.name)
         # Prefer search markdown if available
         content = getattr(doc, "markdown", None)
         if not content:
@@ -171,7 +165,6 @@ class BaseCSWorkflow(RootWorkflow, Generic[StateT, CompanyT, AnalysisT]):
                 content = scraped.markdown
 
         if content:
-            print("Checking:", company.name)
             analysis = self._analyze_company_content(company.name, content)
 
             company.pricing_model = analysis.pricing_model
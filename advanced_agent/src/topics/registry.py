@@ -1,45 +1,19 @@
 # src/topics/registry.py
 from __future__ import annotations
 
+import hashlib
+import importlib
+import threading
+import time
+from collections import Counter
+from collections.abc import Mapping
 from dataclasses import dataclass
-from typing import Callable, Dict, Any
-
-# # Import your topic-specific workflows
-
-# NOW REPLACED BY TOOLS LIBRARY!!!
-# from .cs.developer_tools.workflow import DeveloperToolsWorkflow
-# from .cs.saas.workflow import SaaSWorkflow
-# from .cs.api.workflow import APIWorkflow
-# from .cs.ai_ml.workflow import AIWorkflow
-# from .cs.security.workflow import SecurityWorkflow
-# from .cs.cloud.workflow import CloudWorkflow
-# from .cs.database.workflow import DatabaseWorkflow
-
-
-from .tools.developer_tools.workflow import DeveloperToolsWorkflow
-from .tools.saas.workflow import SaaSWorkflow
-from .tools.api.workflow import APIWorkflow
-from .tools.ai_ml.workflow import AIWorkflow
-from .tools.security.workflow import SecurityWorkflow
-from .tools.cloud.workflow import CloudWorkflow
-from .tools.database.workflow import DatabaseWorkflow
-
-
-from .career.resume_tools.workflow import ResumeToolsWorkflow
-from .career.job_search.workflow import JobSearchWorkflow
-from .career.learning_platforms.workflow import LearningPlatformsWorkflow
-from .career.coding_interview.workflow import CodingInterviewPlatformsWorkflow
-from .career.system_design.workflow import SystemDesignPlatformsWorkflow
-from .career.behavioral_interview.workflow import BehavioralInterviewToolsWorkflow
-from .software_engineering.agile import AgileWorkflow
-from .software_engineering.architecture_design.workflow import ArchitectureDesignWorkflow
-from .software_engineering.cicd import CICDWorkflow
-from .software_engineering.code_quality.workflow import CodeQualityWorkflow
-# from .software_engineering.code_review.workflow import CodeReviewWorkflow
-# from .software_engineering.productivity.workflow import ProductivityWorkflow
-# from .software_engineering.project_management.workflow import ProjectManagementWorkflow
-from .software_engineering.testing.workflow import TestingWorkflow
+from typing import Callable, Dict, Any, Iterable, Iterator, Optional, Union
 
+# Topic workflows are referenced by dotted path ("module:Class", relative to
+# this package) and imported when the topic is first used, so starting the
+# server doesn't import every topic module.
+# (The old `cs` tree has been replaced by `tools`.)
 
 
 @dataclass
@@ -50,64 +24,73 @@ class TopicConfig:
     key: internal key used in requests and routing.
     label: human-friendly label (for UI, logs, etc.).
     description: short text to explain what this topic covers.
-    workflow_factory: function/class that returns a workflow instance.
+    workflow_factory: function/class that returns a workflow instance, or its
+        dotted path "module:attr" (relative to this package), imported on first use.
     domain: optional logical domain (e.g. 'cs', 'finance', 'bio', etc.)
     """
     key: str
     label: str
     description: str
-    workflow_factory: Callable[[], Any]
+    workflow_factory: Union[str, Callable[[], Any]]
     domain: str = "cs"
 
+    def factory(self) -> Callable[[], Any]:
+        """The workflow factory, importing its module if given as a dotted path."""
+        if not isinstance(self.workflow_factory, str):
+            return self.workflow_factory
+        module_name, _, attr = self.workflow_factory.partition(":")
+        module = importlib.import_module(module_name, package=__package__)
+        return getattr(module, attr)
+
 
 TOPIC_CONFIGS: Dict[str, TopicConfig] = {
     "developer_tools": TopicConfig(
         key="developer_tools",
         label="Developer Tools",
         description="IDEs, editors, debuggers, build tools, CI/CD, and developer productivity tooling.",
-        workflow_factory=DeveloperToolsWorkflow,
+        workflow_factory=".tools.developer_tools.workflow:DeveloperToolsWorkflow",
         domain="tools", # domain="cs",
     ),
     "saas": TopicConfig(
         key="saas",
         label="SaaS Products",
         description="Hosted subscription software (B2B/B2C SaaS apps, CRM, helpdesk, collaboration tools, etc.).",
-        workflow_factory=SaaSWorkflow,
+        workflow_factory=".tools.saas.workflow:SaaSWorkflow",
         domain="tools", # domain="cs",
     ),
     "api": TopicConfig(
         key="api",
         label="API Platforms",
         description="Platforms whose main product is an API/SDK: REST/GraphQL APIs, webhooks, API gateways, etc.",
-        workflow_factory=APIWorkflow,
+        workflow_factory=".tools.api.workflow:APIWorkflow",
         domain="tools", # domain="cs",
     ),
     "ai_ml": TopicConfig(
         key="ai_ml",
         label="AI & ML Platforms",
         description="LLM providers, ML platforms, model hosting, vector DBs, embeddings, fine-tuning, AI infra.",
-        workflow_factory=AIWorkflow,
+        workflow_factory=".tools.ai_ml.workflow:AIWorkflow",
         domain="tools", # domain="cs",
     ),
     "security": TopicConfig(
         key="security",
         label="Security & Identity",
         description="Auth, identity, IAM, SSO, OAuth/OIDC, MFA, zero trust, WAF, bot/fraud detection, security tools.",
-        workflow_factory=SecurityWorkflow,
+        workflow_factory=".tools.security.workflow:SecurityWorkflow",
         domain="tools", # domain="cs",
     ),
     "cloud": TopicConfig(
         key="cloud",
         label="Cloud & Infrastructure",
         description="Cloud providers and infra: compute, storage, networking, serverless, managed Kubernetes, etc.",
-        workflow_factory=CloudWorkflow,
+        workflow_factory=".tools.cloud.workflow:CloudWorkflow",
         domain="tools", # domain="cs",
     ),
     "database": TopicConfig(
         key="database",
         label="Databases & Data Platforms",
         description="SQL/NoSQL DBs, data warehouses, OLTP/OLAP engines, and managed database services.",
-        workflow_factory=DatabaseWorkflow,
+        workflow_factory=".tools.database.workflow:DatabaseWorkflow",
         domain="tools", # domain="cs",
     ),
 
@@ -116,42 +99,42 @@ TOPIC_CONFIGS: Dict[str, TopicConfig] = {
         key="resume_tools",
         label="Resume Optimization & ATS Tools",
         description="Resume builders, ATS checkers, keyword optimizers and related tools.",
-        workflow_factory=ResumeToolsWorkflow,
+        workflow_factory=".career.resume_tools.workflow:ResumeToolsWorkflow",
         domain="career",
     ),
     "job_search": TopicConfig(
         key="job_search",
         label="Job Search Platforms & Market Analysis",
         description="Job boards, remote job sites, and salary/market insight platforms.",
-        workflow_factory=JobSearchWorkflow,
+        workflow_factory=".career.job_search.workflow:JobSearchWorkflow",
         domain="career",
     ),
     "learning_platform": TopicConfig(
         key="learning_platform",
         label="Learning Platforms & Skill Roadmaps",
         description="Online courses, bootcamps, and structured learning roadmaps.",
-        workflow_factory=LearningPlatformsWorkflow,
+        workflow_factory=".career.learning_platforms.workflow:LearningPlatformsWorkflow",
         domain="career",
     ),
     "coding_interview": TopicConfig(
         key="coding_interview",
         label="Coding Interview Platforms",
         description="Platforms for coding interview practice and mock interviews.",
-        workflow_factory=CodingInterviewPlatformsWorkflow,
+        workflow_factory=".career.coding_interview.workflow:CodingInterviewPlatformsWorkflow",
         domain="career",
     ),
     "system_design": TopicConfig(
         key="system_design",
         label="System Design Interview Platforms",
         description="System design interview preparation platforms and resources.",
-        workflow_factory=SystemDesignPlatformsWorkflow,
+        workflow_factory=".career.system_design.workflow:SystemDesignPlatformsWorkflow",
         domain="career",
     ),
     "behavioral_interview": TopicConfig(
         key="behavioral_interview",
         label="Behavioral Interview & Coaching Tools",
         description="Behavioral interview practice tools and career coaching platforms.",
-        workflow_factory=BehavioralInterviewToolsWorkflow,
+        workflow_factory=".career.behavioral_interview.workflow:BehavioralInterviewToolsWorkflow",
         domain="career",
     ),
     # ==== Software engineering domain ====
@@ -159,67 +142,170 @@ TOPIC_CONFIGS: Dict[str, TopicConfig] = {
         key="architecture_design",
         label="Architecture Design Suggestions",
         description="Suggestions for architecture design.",
-        workflow_factory=ArchitectureDesignWorkflow,
+        workflow_factory=".software_engineering.architecture_design.workflow:ArchitectureDesignWorkflow",
         domain="software_engineering",
     ),
     "code_quality": TopicConfig(
         key="code_quality",
         label="Code Quality Suggestions",
         description="Suggestions for code quality.",
-        workflow_factory=CodeQualityWorkflow,
+        workflow_factory=".software_engineering.code_quality.workflow:CodeQualityWorkflow",
         domain="software_engineering",
     ),
     # "code_review": TopicConfig(
     #     key="code_review",
     #     label="Code Review Suggestions",
     #     description="Suggestions for code review.",
-    #     workflow_factory=CodeReviewWorkflow,
+    #     workflow_factory=".software_engineering.code_review.workflow:CodeReviewWorkflow",
     #     domain="software_engineering_old",
     # ),
     # "productivity": TopicConfig(
     #     key="productivity",
     #     label="Productivity Suggestions",
     #     description="Suggestions for software engineering productivity.",
-    #     workflow_factory=ProductivityWorkflow,
+    #     workflow_factory=".software_engineering.productivity.workflow:ProductivityWorkflow",
     #     domain="software_engineering_old",
     # ),
     # "project_management": TopicConfig(
     #     key="project_management",
     #     label="Project Management",
     #     description="Project management tools & suggestions for project management.",
-    #     workflow_factory=ProjectManagementWorkflow,
+    #     workflow_factory=".software_engineering.project_management.workflow:ProjectManagementWorkflow",
     #     domain="software_engineering_old",
     # ),
     "testing": TopicConfig(
         key="testing",
         label="Testing",
         description="Testing tools & suggestions for testing.",
-        workflow_factory=TestingWorkflow,
+        workflow_factory=".software_engineering.testing.workflow:TestingWorkflow",
         domain="software_engineering",
     ),
     "agile": TopicConfig(
         key="agile",
         label="Agile Tools",
         description="Agile tools & suggestions.",
-        workflow_factory=AgileWorkflow,
+        workflow_factory=".software_engineering.agile:AgileWorkflow",
         domain="software_engineering",
     ),
     "cicd": TopicConfig(
         key="cicd",
         label="CICD Tools",
         description="CICD tools & suggestions.",
-        workflow_factory=CICDWorkflow,
+        workflow_factory=".software_engineering.cicd:CICDWorkflow",
         domain="software_engineering",
     )
 }
 
 
-def build_workflows() -> Dict[str, Any]:
+class LazyWorkflowRegistry(Mapping):
     """
-    Instantiate one workflow per topic key.
-    If you want lazy creation later, you can change this to return a factory.
+    Topic key -> workflow instance, built on first use.
+
+    Each workflow is constructed once (other callers wait for that build), and
+    its construction time is recorded. A topic whose construction fails (e.g.
+    a missing env var) raises only when that topic is used; the others are
+    unaffected. `in`, `len()` and iteration look at the configs only; values()
+    and items() build everything.
     """
-    return {key: cfg.workflow_factory() for key, cfg in TOPIC_CONFIGS.items()}
+
+    def __init__(self, configs: Dict[str, TopicConfig]) -> None:
+        self._configs = configs
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._build_ms: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._uses: Counter = Counter()
+
+    def __getitem__(self, key: str) -> Any:
+        instance = self._instances.get(key)
+        if instance is None:
+            if key not in self._configs:
+                raise KeyError(key)
+            instance = self._build(key)
+        with self._lock:
+            self._uses[key] += 1
+        return instance
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._configs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._configs)
+
+    def __len__(self) -> int:
+        return len(self._configs)
+
+    def is_built(self, key: str) -> bool:
+        return key in self._instances
+
+    def built(self) -> Dict[str, Any]:
+        """Workflows constructed so far (doesn't build or count a use)."""
+        return dict(self._instances)
+
+    def _build(self, key: str) -> Any:
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            instance = self._instances.get(key)
+            if instance is not None:
+                return instance
+            t0 = time.perf_counter()
+            try:
+                instance = self._configs[key].factory()()
+            except Exception as e:
+                self._errors[key] = repr(e)
+                print(f"[registry] building workflow '{key}' failed: {e!r}")
+                raise
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            self._build_ms[key] = round(elapsed_ms, 1)
+            self._errors.pop(key, None)
+            self._instances[key] = instance
+            print(f"[registry] built workflow '{key}' in {elapsed_ms:.0f} ms")
+            return instance
+
+    def warm_up(self, keys: Iterable[str], background: bool = True) -> Optional[threading.Thread]:
+        """Build the workflows for `keys` ahead of their first request."""
+        keys = [k for k in keys if k in self._configs]
+
+        def run() -> None:
+            for key in keys:
+                try:
+                    self._build(key)
+                except Exception:
+                    pass  # already logged; the topic fails again on first use
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="workflow-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            uses = dict(self._uses)
+        return {
+            "built": len(self._instances),
+            "total": len(self._configs),
+            "topics": {
+                key: {
+                    "built": key in self._instances,
+                    "build_ms": self._build_ms.get(key),
+                    "uses": uses.get(key, 0),
+                    "error": self._errors.get(key),
+                }
+                for key in self._configs
+            },
+        }
+
+
+def build_workflows() -> LazyWorkflowRegistry:
+    """
+    One workflow per topic key, each constructed on first use
+    (see `LazyWorkflowRegistry`).
+    """
+    return LazyWorkflowRegistry(TOPIC_CONFIGS)
 
 def get_topic_labels() -> Dict[str, str]:
     """
@@ -233,3 +319,14 @@ def get_topic_descriptions() -> Dict[str, str]:
     Used by the LLM router; no server hard-coding needed.
     """
     return {key: cfg.description for key, cfg in TOPIC_CONFIGS.items()}
+
+def topic_config_fingerprint() -> str:
+    """
+    Hash of every topic's key/label/description.
+    Changes whenever the set of categories shown to the classifier changes.
+    """
+    h = hashlib.sha256()
+    for key in sorted(TOPIC_CONFIGS):
+        cfg = TOPIC_CONFIGS[key]
+        h.update(f"{key}\x1f{cfg.label}\x1f{cfg.description}\x1e".encode("utf-8"))
+    return h.hexdigest()
@@ -1,13 +1,71 @@
 # src/topics/root_workflow.py
 from __future__ import annotations
 
-from typing import Optional, Callable, Any, List
+import asyncio
+import importlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from typing import Optional, Callable, Any, Iterable, List, Tuple
 
+from langchain_core.runnables import RunnableLambda
 from langchain_openai import ChatOpenAI
-from langchain_deepseek import ChatDeepSeek
-from langchain_anthropic import ChatAnthropic
 
+from ..cancellation import CANCELLATION_STATS, CancellationToken
 from ..firecrawl import FirecrawlService
+from ..llm_hedge import HEDGE_POLICY
+from ..messages import LogEvent
+from ..metrics import FALLBACKS, LLM_CALLBACKS, NODE_SECONDS, WORKFLOW_EVENTS
+from ..tracing import span
+
+# Research fan-out of every run shares one bounded pool, so a burst of requests
+# queues per-tool research instead of multiplying threads
+RESEARCH_WORKERS = int(os.getenv("RESEARCH_WORKERS", "16"))
+RESEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=RESEARCH_WORKERS, thread_name_prefix="research")
+
+# Non-default chat providers, imported the first time a model of theirs is
+# selected (each SDK adds ~0.5-1s to startup): name substring -> (module, class)
+LLM_PROVIDERS = {
+    "deepseek": ("langchain_deepseek", "ChatDeepSeek"),
+    "claude": ("langchain_anthropic", "ChatAnthropic"),
+}
+_provider_classes: dict = {}
+
+# Chat models are reused per (model, temperature): a run that picks the same
+# settings as an earlier one gets the same instance, its pooled HTTP client
+# and its already built structured-output runnables
+LLM_INSTANCE_CACHE_SIZE = int(os.getenv("LLM_INSTANCE_CACHE_SIZE", "32"))
+_llm_instances: "OrderedDict[Tuple[str, float], Any]" = OrderedDict()
+# (id(llm), schema) -> (llm, llm.with_structured_output(schema))
+_structured_runnables: "OrderedDict[Tuple[int, type], Tuple[Any, Any]]" = OrderedDict()
+_llm_cache_lock = threading.Lock()
+
+# Class attributes naming the pydantic schemas a workflow requests via
+# structured output (see `structured_schemas`)
+STRUCTURED_SCHEMA_ATTRS = ("analysis_model", "analysis_cls", "recommendation_model")
+
+
+def _provider_class(module_name: str, class_name: str) -> type:
+    cls = _provider_classes.get(module_name)
+    if cls is None:
+        cls = getattr(importlib.import_module(module_name), class_name)
+        _provider_classes[module_name] = cls
+    return cls
+
+
+# Catalog events logged when a step failed and the run went on with a default
+# result; counted as fallbacks in /metrics
+FALLBACK_EVENTS = frozenset({
+    "extraction_error",
+    "extraction_failed",
+    "research_error",
+    "analysis_error",
+    "analysis_failed",
+    "career_plan_error",
+    "career_fallback_error",
+})
 
 
 class RootWorkflow:
@@ -18,6 +76,16 @@ class RootWorkflow:
     - Hold the primary LLM instance (`self.llm`)
     - Manage log callbacks (`set_log_callback`, `_log`)
     - Switch models dynamically (`set_llm`)
+    - Hedge latency-critical LLM calls to a secondary model (`_hedged_invoke`)
+    - Graph nodes with a sync and a native async implementation (`_node`), so
+      `run` uses `graph.invoke` and `arun` uses `graph.ainvoke`
+
+    Workflow instances are shared by concurrent requests, so the per-run state
+    (`llm`, the hedge model, the log callback and the cancel token) lives in
+    context variables: the setters only affect the current context, i.e. the
+    request that made the call. Run each request in its own context (e.g.
+    `contextvars.copy_context().run(...)`); steps fan out through
+    `_submit_research`, which carries the context into the worker.
     """
 
     # Subclasses are expected to define a topic_label if they want nicer logs.
@@ -28,10 +96,49 @@ class RootWorkflow:
         default_model: str = "gpt-4o-mini",
         default_temperature: float = 0.1,
     ) -> None:
-        self.llm = ChatOpenAI(model=default_model, temperature=default_temperature)
-        self._log_callback: Optional[Callable[[str], None]] = None
+        name = type(self).__name__
+        self._llm_var: ContextVar[Any] = ContextVar(
+            f"{name}.llm",
+            default=self.build_llm(default_model, default_temperature),
+        )
+        self._hedge_llm_var: ContextVar[Optional[Any]] = ContextVar(
+            f"{name}.hedge_llm", default=self._build_hedge_llm(default_temperature)
+        )
+        self._log_callback_var: ContextVar[Optional[Callable[[str], None]]] = ContextVar(
+            f"{name}.log_callback", default=None
+        )
+        self._cancel_token_var: ContextVar[Optional[CancellationToken]] = ContextVar(
+            f"{name}.cancel_token", default=None
+        )
         self.firecrawl = FirecrawlService()
 
+    # ---------------------------
+    # Per-run state (context-local)
+    # ---------------------------
+    @property
+    def llm(self) -> Any:
+        return self._llm_var.get()
+
+    @llm.setter
+    def llm(self, value: Any) -> None:
+        self._llm_var.set(value)
+
+    @property
+    def _hedge_llm(self) -> Optional[Any]:
+        return self._hedge_llm_var.get()
+
+    @_hedge_llm.setter
+    def _hedge_llm(self, value: Optional[Any]) -> None:
+        self._hedge_llm_var.set(value)
+
+    @property
+    def _log_callback(self) -> Optional[Callable[[str], None]]:
+        return self._log_callback_var.get()
+
+    @_log_callback.setter
+    def _log_callback(self, cb: Optional[Callable[[str], None]]) -> None:
+        self._log_callback_var.set(cb)
+
     # ---------------------------
     # LLM switching / configuration
     # ---------------------------
@@ -43,12 +150,157 @@ class RootWorkflow:
         """
         print(f"Setting LLM... model: {model_name} temperature: {temperature}")
 
-        if "deepseek" in model_name:
-            self.llm = ChatDeepSeek(model=model_name, temperature=temperature)
-        elif "claude" in model_name:
-            self.llm = ChatAnthropic(model=model_name, temperature=temperature)
-        else:
-            self.llm = ChatOpenAI(model=model_name, temperature=temperature)
+        self.llm = self.build_llm(model_name, temperature)
+        self._hedge_llm = self._build_hedge_llm(temperature)
+
+    @staticmethod
+    def build_llm(model_name: str, temperature: float) -> Any:
+        """
+        Chat model for `model_name` (provider picked by name). Instances are
+        shared per (model, temperature), see LLM_INSTANCE_CACHE_SIZE.
+        """
+        key = (model_name, float(temperature))
+        with _llm_cache_lock:
+            llm = _llm_instances.get(key)
+            if llm is not None:
+                _llm_instances.move_to_end(key)
+                return llm
+        llm = ChatOpenAI
+        for marker, (module_name, class_name) in LLM_PROVIDERS.items():
+            if marker in model_name:
+                llm = _provider_class(module_name, class_name)
+                break
+        llm = llm(model=model_name, temperature=temperature, callbacks=LLM_CALLBACKS)
+        with _llm_cache_lock:
+            llm = _llm_instances.setdefault(key, llm)
+            while len(_llm_instances) > LLM_INSTANCE_CACHE_SIZE:
+                _llm_instances.popitem(last=False)
+        return llm
+
+    def _structured(self, schema: type, llm: Optional[Any] = None) -> Any:
+        """`llm.with_structured_output(schema)` (default: `self.llm`), built once per model."""
+        llm = self.llm if llm is None else llm
+        key = (id(llm), schema)
+        with _llm_cache_lock:
+            entry = _structured_runnables.get(key)
+            if entry is not None and entry[0] is llm:
+                _structured_runnables.move_to_end(key)
+                return entry[1]
+        runnable = llm.with_structured_output(schema)
+        with _llm_cache_lock:
+            _structured_runnables[key] = (llm, runnable)
+            while len(_structured_runnables) > 8 * LLM_INSTANCE_CACHE_SIZE:
+                _structured_runnables.popitem(last=False)
+        return runnable
+
+    def structured_schemas(self) -> List[type]:
+        """Pydantic schemas this workflow requests through structured output."""
+        schemas = (getattr(self, attr, None) for attr in STRUCTURED_SCHEMA_ATTRS)
+        return [schema for schema in schemas if isinstance(schema, type)]
+
+    # ---------------------------
+    # Warm-up (see src/api/warmup.py)
+    # ---------------------------
+    def warm_up(self) -> int:
+        """Build the structured-output runnables of the default (and hedge) model."""
+        built = 0
+        for llm in (self.llm, self._hedge_llm):
+            if llm is None:
+                continue
+            for schema in self.structured_schemas():
+                self._structured(schema, llm)
+                built += 1
+        return built
+
+    async def awarm_connections(self) -> None:
+        """Open the async Firecrawl client's connection pool."""
+        await self.firecrawl.awarm_up()
+
+    # ---------------------------
+    # Hedged calls for latency-critical steps
+    # ---------------------------
+    def _build_hedge_llm(self, temperature: float) -> Optional[Any]:
+        if HEDGE_POLICY is None:
+            return None
+        try:
+            return self.build_llm(HEDGE_POLICY.config.secondary_model, temperature)
+        except Exception as e:
+            print(f"[HEDGE] could not build secondary model: {e}")
+            return None
+
+    def _hedged_invoke(self, messages: Any, structured_model: Optional[type] = None) -> Any:
+        """
+        Invoke `self.llm` (optionally with structured output) for an interactive
+        step. If a hedge policy is configured and the primary is slow, the same
+        request is also sent to the secondary model and the first answer wins.
+        """
+        primary = self.llm
+        secondary = self._hedge_llm
+        if structured_model is not None:
+            primary = self._structured(structured_model, primary)
+            if secondary is not None:
+                secondary = self._structured(structured_model, secondary)
+
+        self._check_cancelled("recommendation")
+        if HEDGE_POLICY is None or secondary is None:
+            return primary.invoke(messages)
+        return HEDGE_POLICY.invoke(primary, messages, secondary, label="recommend")
+
+    async def _ahedged_invoke(self, messages: Any, structured_model: Optional[type] = None) -> Any:
+        """Async `_hedged_invoke` (used by the `arun` path)."""
+        primary = self.llm
+        secondary = self._hedge_llm
+        if structured_model is not None:
+            primary = self._structured(structured_model, primary)
+            if secondary is not None:
+                secondary = self._structured(structured_model, secondary)
+
+        self._check_cancelled("recommendation")
+        if HEDGE_POLICY is None or secondary is None:
+            return await primary.ainvoke(messages)
+        return await HEDGE_POLICY.ainvoke(primary, messages, secondary, label="recommend")
+
+    # ---------------------------
+    # Graph nodes (sync + async)
+    # ---------------------------
+    def _node(self, name: str, func: Callable[..., Any], afunc: Callable[..., Any]) -> RunnableLambda:
+        """
+        A graph node that runs `func` under `invoke` and `afunc` under `ainvoke`,
+        timed into the node duration histogram and traced as a `node.<name>` span.
+        """
+        workflow = type(self).__name__
+
+        def timed(state: Any) -> Any:
+            with NODE_SECONDS.time(node=name, workflow=workflow), span(f"node.{name}", workflow=workflow):
+                return func(state)
+
+        async def atimed(state: Any) -> Any:
+            with NODE_SECONDS.time(node=name, workflow=workflow), span(f"node.{name}", workflow=workflow):
+                return await afunc(state)
+
+        return RunnableLambda(timed, afunc=atimed, name=name)
+
+    async def _agather_research(self, names: List[str], afunc: Callable[[str], Any]) -> List[Any]:
+        """
+        Research `names` concurrently with `afunc` (async counterpart of the
+        research pool fan-out). Failed tools are logged and skipped; a
+        cancellation stops the whole run.
+        """
+        async def traced_research(name: str) -> Any:
+            with span("research_tool", tool=name):
+                return await afunc(name)
+
+        results = await asyncio.gather(*(traced_research(name) for name in names), return_exceptions=True)
+        found: List[Any] = []
+        for name, res in zip(names, results):
+            # WorkflowCancelled, asyncio.CancelledError, KeyboardInterrupt...
+            if isinstance(res, BaseException) and not isinstance(res, Exception):
+                raise res
+            if isinstance(res, Exception):
+                self._log_event("research_error", tool=name, error=res)
+            elif res is not None:
+                found.append(res)
+        return found
 
     # ---------------------------
     # Logging
@@ -56,6 +308,7 @@ class RootWorkflow:
     def set_log_callback(self, cb: Optional[Callable[[str], None]]) -> None:
         """
         Set a callback that will receive log lines (e.g. to stream to UI).
+        Only affects the current context (see class docstring).
         """
         self._log_callback = cb
 
@@ -70,6 +323,68 @@ class RootWorkflow:
             # If you prefer the full text, use `text` instead of `msg`
             self._log_callback(msg)
 
+    # ---------------------------
+    # Cancellation
+    # ---------------------------
+    def set_cancel_token(self, token: Optional[CancellationToken]) -> None:
+        """
+        Attach a cancellation token to the current run (e.g. cancelled when the
+        SSE client disconnects). Only affects the current context.
+        """
+        self._cancel_token_var.set(token)
+
+    def _is_cancelled(self) -> bool:
+        token = self._cancel_token_var.get()
+        return token is not None and token.cancelled
+
+    def _check_cancelled(self, stage: str) -> None:
+        """Raise `WorkflowCancelled` if this run was cancelled; call at step boundaries."""
+        token = self._cancel_token_var.get()
+        if token is not None:
+            token.check(stage)
+
+    def _submit_research(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Run `fn` on the shared research pool with a copy of this run's context."""
+        return RESEARCH_EXECUTOR.submit(copy_context().run, self._traced_research, fn, *args)
+
+    @staticmethod
+    def _traced_research(fn: Callable[..., Any], *args: Any) -> Any:
+        # One span per research thread; the first argument is the tool name
+        with span("research_tool", tool=args[0] if args else None):
+            return fn(*args)
+
+    def _abort_futures(self, futures: Iterable[Future]) -> None:
+        """Cancel research futures that haven't started yet and stop the run."""
+        cancelled = sum(1 for fut in futures if fut.cancel())
+        CANCELLATION_STATS.record_futures(cancelled)
+        self._check_cancelled("research")
+
+    def _log_event(self, template_id: str, **params: Any) -> None:
+        """
+        Log a catalog message (see `src/messages.py`). Callbacks receive a
+        `LogEvent`, which is the English line but can be rendered in other
+        languages without an LLM round trip.
+        """
+        WORKFLOW_EVENTS.inc(event=template_id)
+        if template_id in FALLBACK_EVENTS:
+            FALLBACKS.inc(kind=template_id)
+        self._log(LogEvent(template_id, **params))
+
+
+    # ------------------------------------------------------------------ #
+    # Speculative prefetch of the first article search
+    # ------------------------------------------------------------------ #
+    def _article_query(self, query: str) -> str:
+        """Search query used by the first graph node; subclasses override."""
+        return query
+
+    def prefetch_articles(self, query: str) -> None:
+        """
+        Start the first node's article search ahead of `run`. The result lands
+        in the Firecrawl cache (or is joined while in flight) so the real step
+        doesn't pay for it twice.
+        """
+        self.firecrawl.search_companies(self._article_query(query), num_results=3)
 
     # ------------------------------------------------------------------ #
     # Helper: normalize Firecrawl search results
@@ -115,4 +430,28 @@ class RootWorkflow:
             if scraped and getattr(scraped, "markdown", None):
                 all_content += scraped.markdown[:2000] + "\n\n"
 
-        return all_content
\ No newline at end of file
+        return all_content
+
+    async def _abuild_all_content_from_results(self, web_results: List[Any]) -> str:
+        """Async `_build_all_content_from_results`; missing pages are scraped concurrently."""
+
+        async def content_of(result: Any) -> str:
+            markdown = getattr(result, "markdown", None)
+            if markdown:
+                return markdown[:2000] + "\n\n"
+
+            url = None
+            if hasattr(result, "metadata") and getattr(result, "metadata", None):
+                url = getattr(result.metadata, "url", None)
+            if not url and isinstance(result, dict):
+                url = result.get("url")
+            if not url:
+                return ""
+
+            scraped = await self.firecrawl.ascrape_company_pages(url)
+            if scraped and getattr(scraped, "markdown", None):
+                return scraped.markdown[:2000] + "\n\n"
+            return ""
+
+        parts = await asyncio.gather(*(content_of(r) for r in web_results))
+        return "".join(parts)
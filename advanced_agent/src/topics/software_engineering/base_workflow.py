@@ -1,9 +1,8 @@
+import asyncio
+import json
 from typing import Dict, Any, Callable, Optional, List, Type
 
-from langchain_anthropic import ChatAnthropic
-from langchain_deepseek import ChatDeepSeek
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from ...firecrawl import FirecrawlService
@@ -19,6 +18,13 @@ LogCallback = Callable[[str], None]
 
 
 class BaseSoftwareEngWorkflow(RootWorkflow):
+    """
+    Resource-driven workflow for software-engineering questions.
+
+    Every node has a sync and an async implementation: `run` drives the graph
+    with `invoke` (threads), `arun` with `ainvoke` (one event loop).
+    """
+
     state_model: Type[BaseSoftwareEngState] = BaseSoftwareEngState
     resource_model: Type[BaseSoftwareEngResourceSummary] = BaseSoftwareEngResourceSummary
     recommendation_model: Type[BaseSoftwareEngRecommendation] = BaseSoftwareEngRecommendation
@@ -40,9 +46,9 @@ class BaseSoftwareEngWorkflow(RootWorkflow):
 
     def _build_workflow(self):
         graph = StateGraph(self.state_model)
-        graph.add_node("extract_resources", self._extract_resources_step)
-        graph.add_node("analyze", self._analyze_step)
-        graph.add_node("recommend", self._recommend_step)
+        graph.add_node("extract_resources", self._node("extract_resources", self._extract_resources_step, self._aextract_resources_step))
+        graph.add_node("analyze", self._node("analyze", self._analyze_step, self._aanalyze_step))
+        graph.add_node("recommend", self._node("recommend", self._recommend_step, self._arecommend_step))
         graph.set_entry_point("extract_resources")
         graph.add_edge("extract_resources", "analyze")
         graph.add_edge("analyze", "recommend")
@@ -50,17 +56,18 @@ class BaseSoftwareEngWorkflow(RootWorkflow):
         return graph.compile()
 
 
+    def _article_query(self, query: str) -> str:
+        return f"{query} best practices guide"
+
     def _extract_resources_step(self, state: BaseSoftwareEngState) -> Dict[str, Any]:
-        self._log(f"Finding articles/resources about: {state.query}")
+        self._check_cancelled("extract")
+        self._log_event("finding_articles", query=state.query)
 
-        article_query = f"{state.query} best practices guide"
+        article_query = self._article_query(state.query)
         search_results = self.firecrawl.search_companies(article_query, num_results=3)
-        print("_extract_tools_step, check0")
         web_results = self._get_web_results(search_results)
-        print("_extract_tools_step, check1")
         all_content = ""
         resources: list[BaseSoftwareEngResourceSummary] = []
-        print("_extract_tools_step, check2")
         for doc in web_results:
             markdown = getattr(doc, "markdown", None)
             meta = getattr(doc, "metadata", None)
@@ -80,43 +87,96 @@ class BaseSoftwareEngWorkflow(RootWorkflow):
                     continue
 
             if url or title:
-                resources.append(
-                    self.resource_model(
-                        title=title or "Untitled resource",
-                        url=url or "",
-                        key_points=[],
-                        concepts=[],
-                        recommended_tools=[],
-                    )
-                )
+                resources.append(self._resource_stub(title, url))
 
         if not all_content:
-            self._log("No content found; continuing with empty extraction.")
+            self._log_event("no_content_found")
             return {"resources": resources, "extracted_keywords": []}
 
-        messages = [
-            SystemMessage(content=self.prompts.TOOL_EXTRACTION_SYSTEM),
-            HumanMessage(content=self.prompts.tool_extraction_user(state.query, all_content)),
-        ]
+        try:
+            response = self.llm.invoke(self._extraction_messages(state.query, all_content))
+            return self._keywords_result(resources, response)
+        except Exception as e:
+            self._log_event("extraction_failed", error=e)
+            return {"resources": resources, "extracted_keywords": []}
+
+    async def _aextract_resources_step(self, state: BaseSoftwareEngState) -> Dict[str, Any]:
+        self._check_cancelled("extract")
+        self._log_event("finding_articles", query=state.query)
+
+        article_query = self._article_query(state.query)
+        search_results = await self.firecrawl.asearch_companies(article_query, num_results=3)
+        web_results = self._get_web_results(search_results)
+
+        async def snippet_of(doc: Any) -> Optional[str]:
+            # None: skip the doc entirely (no markdown and no url)
+            markdown = getattr(doc, "markdown", None)
+            if markdown:
+                return markdown[:1500] + "\n\n"
+            meta = getattr(doc, "metadata", None)
+            url = getattr(meta, "url", "") if meta else ""
+            if not url:
+                return None
+            scraped = await self.firecrawl.ascrape_company_pages(url)
+            if scraped and getattr(scraped, "markdown", None):
+                return scraped.markdown[:1500] + "\n\n"
+            return ""
+
+        snippets = await asyncio.gather(*(snippet_of(doc) for doc in web_results))
+
+        all_content = ""
+        resources: List[BaseSoftwareEngResourceSummary] = []
+        for doc, snippet in zip(web_results, snippets):
+            if snippet is None:
+                continue
+            all_content += snippet
+            meta = getattr(doc, "metadata", None)
+            title = getattr(meta, "title", "") if meta else ""
+            url = getattr(meta, "url", "") if meta else ""
+            if url or title:
+                resources.append(self._resource_stub(title, url))
+
+        if not all_content:
+            self._log_event("no_content_found")
+            return {"resources": resources, "extracted_keywords": []}
 
         try:
-            response = self.llm.invoke(messages)
-            lines = [
-                ln.strip()
-                for ln in response.content.split("\n")
-                if ln.strip()
-            ]
-            self._log(f"Extracted keywords/concepts: {', '.join(lines[:10])}")
-            return {
-                "resources": resources,
-                "extracted_keywords": lines,
-            }
+            response = await self.llm.ainvoke(self._extraction_messages(state.query, all_content))
+            return self._keywords_result(resources, response)
         except Exception as e:
-            self._log(f"Extraction failed: {e}")
+            self._log_event("extraction_failed", error=e)
             return {"resources": resources, "extracted_keywords": []}
 
+    def _resource_stub(self, title: str, url: str) -> BaseSoftwareEngResourceSummary:
+        return self.resource_model(
+            title=title or "Untitled resource",
+            url=url or "",
+            key_points=[],
+            concepts=[],
+            recommended_tools=[],
+        )
+
+    def _extraction_messages(self, query: str, all_content: str) -> List[Any]:
+        return [
+            SystemMessage(content=self.prompts.TOOL_EXTRACTION_SYSTEM),
+            HumanMessage(content=self.prompts.tool_extraction_user(query, all_content)),
+        ]
+
+    def _keywords_result(self, resources: List[BaseSoftwareEngResourceSummary], response: Any) -> Dict[str, Any]:
+        lines = [
+            ln.strip()
+            for ln in response.content.split("\n")
+            if ln.strip()
+        ]
+        self._log_event("extracted_keywords", names=", ".join(lines[:10]))
+        return {
+            "resources": resources,
+            "extracted_keywords": lines,
+        }
+
     def _analyze_step(self, state: BaseSoftwareEngState) -> Dict[str, Any]:
-        self._log("Analyzing aggregated resources")
+        self._check_cancelled("analyze")
+        self._log_event("analyzing_resources")
 
         combined = ""
         for res in state.resources[:3]:
@@ -127,37 +187,73 @@ class BaseSoftwareEngWorkflow(RootWorkflow):
                 combined += scraped.markdown[:2000] + "\n\n"
 
         if not combined:
-            self._log("No detailed content to analyze; skipping analysis.")
+            self._log_event("no_detailed_content")
             return {}
-        structured_llm = self.llm.with_structured_output(self.recommendation_model)
-        messages = [
-            SystemMessage(content=self.prompts.TOOL_ANALYSIS_SYSTEM),
-            HumanMessage(content=self.prompts.tool_analysis_user(self.topic_label, combined)),
-        ]
+        structured_llm = self._structured(self.recommendation_model)
+        try:
+            analysis = structured_llm.invoke(self._analysis_messages(combined))
+            return {"analysis": analysis}
+        except Exception as e:
+            self._log_event("analysis_failed", error=e)
+            return {"analysis": self._fallback_recommendation("Analysis failed.")}
+
+    async def _aanalyze_step(self, state: BaseSoftwareEngState) -> Dict[str, Any]:
+        self._check_cancelled("analyze")
+        self._log_event("analyzing_resources")
+
+        async def markdown_of(url: str) -> str:
+            scraped = await self.firecrawl.ascrape_company_pages(url)
+            if scraped and getattr(scraped, "markdown", None):
+                return scraped.markdown[:2000] + "\n\n"
+            return ""
+
+        urls = [res.url for res in state.resources[:3] if res.url]
+        combined = "".join(await asyncio.gather(*(markdown_of(url) for url in urls)))
+
+        if not combined:
+            self._log_event("no_detailed_content")
+            return {}
+        structured_llm = self._structured(self.recommendation_model)
         try:
-            analysis = structured_llm.invoke(messages)
+            analysis = await structured_llm.ainvoke(self._analysis_messages(combined))
             return {"analysis": analysis}
         except Exception as e:
-            self._log(f"Analysis failed: {e}")
-            fallback = self.recommendation_model(
-                summary="Analysis failed.",
-                best_practices=[],
-                pitfalls=[],
-                suggested_action_plan=[],
-            )
-            return {"analysis": fallback}
+            self._log_event("analysis_failed", error=e)
+            return {"analysis": self._fallback_recommendation("Analysis failed.")}
+
+    def _analysis_messages(self, combined: str) -> List[Any]:
+        return [
+            SystemMessage(content=self.prompts.TOOL_ANALYSIS_SYSTEM),
+            HumanMessage(content=self.prompts.tool_analysis_user(self.topic_label, combined)),
+        ]
+
+    def _fallback_recommendation(self, summary: str) -> BaseSoftwareEngRecommendation:
+        return self.recommendation_model(
+            summary=summary,
+            best_practices=[],
+            pitfalls=[],
+            suggested_action_plan=[],
+        )
 
     def _recommend_step(self, state: BaseSoftwareEngState) -> Dict[str, Any]:
-        self._log("Generating final recommendations")
+        self._check_cancelled("recommend")
+        self._log_event("generating_final_recommendations")
+        response = self._hedged_invoke(self._recommendation_messages(state))
+        return self._recommendation_result(state, response)
 
-        import json
+    async def _arecommend_step(self, state: BaseSoftwareEngState) -> Dict[str, Any]:
+        self._check_cancelled("recommend")
+        self._log_event("generating_final_recommendations")
+        response = await self._ahedged_invoke(self._recommendation_messages(state))
+        return self._recommendation_result(state, response)
 
+    def _recommendation_messages(self, state: BaseSoftwareEngState) -> List[Any]:
         resources_json = json.dumps(
             [r.model_dump() for r in state.resources],
             ensure_ascii=False,
         )
 
-        messages = [
+        return [
             SystemMessage(content=self.prompts.RECOMMENDATIONS_SYSTEM),
             HumanMessage(
                 content=self.prompts.recommendations_user(
@@ -167,20 +263,20 @@ class BaseSoftwareEngWorkflow(RootWorkflow):
             ),
         ]
 
-        response = self.llm.invoke(messages)
+    def _recommendation_result(self, state: BaseSoftwareEngState, response: Any) -> Dict[str, Any]:
         if state.analysis:
             state.analysis.summary = response.content
             return {"analysis": state.analysis}
 
-        fallback = self.recommendation_model(
-            summary=response.content,
-            best_practices=[],
-            pitfalls=[],
-            suggested_action_plan=[],
-        )
-        return {"analysis": fallback}
+        return {"analysis": self._fallback_recommendation(response.content)}
 
     def run(self, query: str) -> BaseSoftwareEngState:
         initial_state = self.state_model(query=query)
         final_state = self.workflow.invoke(initial_state)
         return self.state_model(**final_state)
+
+    async def arun(self, query: str) -> BaseSoftwareEngState:
+        """Native async `run`: LangGraph `ainvoke`, async LLM and Firecrawl calls."""
+        initial_state = self.state_model(query=query)
+        final_state = await self.workflow.ainvoke(initial_state)
+        return self.state_model(**final_state)
@@ -1,7 +1,7 @@
 # src/topics/base_workflow.py
 from __future__ import annotations
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import as_completed
 from typing import Type, TypeVar, Generic, Dict, Any, List, Callable, Optional
 
 from langgraph.graph import StateGraph, END
@@ -15,6 +15,7 @@ StateT = TypeVar("StateT", bound=BaseResearchState)
 CompanyT = TypeVar("CompanyT", bound=BaseCompanyInfo)
 AnalysisT = TypeVar("AnalysisT", bound=BaseCompanyAnalysis)
 PromptsT = TypeVar("PromptsT", bound=BaseCSResearchPrompts)
+from ...metrics import FALLBACKS
 from ..root_workflow import RootWorkflow
 
 class BaseCSWorkflow(RootWorkflow, Generic[StateT, CompanyT, AnalysisT]):
@@ -27,6 +28,9 @@ class BaseCSWorkflow(RootWorkflow, Generic[StateT, CompanyT, AnalysisT]):
     - Research specific companies/tools
     - Analyze company content into structured fields
     - Produce final recommendations via LLM
+
+    Every node has a sync and an async implementation: `run` drives the graph
+    with `invoke` (threads), `arun` with `ainvoke` (one event loop).
     """
 
     # Subclasses must override these:
@@ -57,9 +61,9 @@ class BaseCSWorkflow(RootWorkflow, Generic[StateT, CompanyT, AnalysisT]):
     # ------------------------------------------------------------------ #
     def _build_workflow(self):
         graph = StateGraph(self.state_model)
-        graph.add_node("extract_tools", self._extract_tools_step)
-        graph.add_node("research", self._research_step)
-        graph.add_node("analyze", self._analyze_step)
+        graph.add_node("extract_tools", self._node("extract_tools", self._extract_tools_step, self._aextract_tools_step))
+        graph.add_node("research", self._node("research", self._research_step, self._aresearch_step))
+        graph.add_node("analyze", self._node("analyze", self._analyze_step, self._aanalyze_step))
         graph.set_entry_point("extract_tools")
         graph.add_edge("extract_tools", "research")
         graph.add_edge("research", "analyze")
@@ -69,80 +73,168 @@ class BaseCSWorkflow(RootWorkflow, Generic[StateT, CompanyT, AnalysisT]):
     # ------------------------------------------------------------------ #
     # Node: extract_tools
     # ------------------------------------------------------------------ #
+    def _article_query(self, query: str) -> str:
+        return self.article_query_template.format(query=query)
+
     def _extract_tools_step(self, state: StateT) -> Dict[str, Any]:
-        self._log(f"Finding articles/resources about: {state.query}")
+        self._check_cancelled("extract")
+        self._log_event("finding_articles", query=state.query)
 
-        article_query = self.article_query_template.format(query=state.query)
+        article_query = self._article_query(state.query)
         search_results = self.firecrawl.search_companies(article_query, num_results=3)
-        print("_extract_tools_step, check0")
         web_results = self._get_web_results(search_results)
-        print("_extract_tools_step, check1")
         all_content = self._build_all_content_from_results(web_results)
-        print("_extract_tools_step, check2")
-        messages = [
-            SystemMessage(content=self.prompts.TOOL_EXTRACTION_SYSTEM),
-            HumanMessage(content=self.prompts.tool_extraction_user(state.query, all_content)),
-        ]
+        messages = self._extraction_messages(state.query, all_content)
 
         try:
             response = self.llm.invoke(messages)
-            tool_names = [
-                name.strip()
-                for name in response.content.strip().split("\n")
-                if name.strip()
-            ]
-
-            if tool_names:
-                self._log(f"Extracted tools/platforms: {', '.join(tool_names[:5])}")
-            return {"extracted_tools": tool_names}
+            return {"extracted_tools": self._parse_tool_names(response)}
+        except Exception as e:
+            self._log_event("extraction_error", error=e)
+            return {"extracted_tools": []}
+
+    async def _aextract_tools_step(self, state: StateT) -> Dict[str, Any]:
+        self._check_cancelled("extract")
+        self._log_event("finding_articles", query=state.query)
+
+        article_query = self._article_query(state.query)
+        search_results = await self.firecrawl.asearch_companies(article_query, num_results=3)
+        web_results = self._get_web_results(search_results)
+        all_content = await self._abuild_all_content_from_results(web_results)
+        messages = self._extraction_messages(state.query, all_content)
+
+        try:
+            response = await self.llm.ainvoke(messages)
+            return {"extracted_tools": self._parse_tool_names(response)}
         except Exception as e:
-            self._log(f"Extraction error: {e}")
+            self._log_event("extraction_error", error=e)
             return {"extracted_tools": []}
 
+    def _extraction_messages(self, query: str, all_content: str) -> List[Any]:
+        return [
+            SystemMessage(content=self.prompts.TOOL_EXTRACTION_SYSTEM),
+            HumanMessage(content=self.prompts.tool_extraction_user(query, all_content)),
+        ]
+
+    def _parse_tool_names(self, response: Any) -> List[str]:
+        tool_names = [
+            name.strip()
+            for name in response.content.strip().split("\n")
+            if name.strip()
+        ]
+        if tool_names:
+            self._log_event("extracted_tools", names=", ".join(tool_names[:5]))
+        return tool_names
+
     # ------------------------------------------------------------------ #
     # Helper: analyze one company's content into structured fields
     # ------------------------------------------------------------------ #
     def _analyze_company_content(self, company_name: str, content: str) -> AnalysisT:
-        structured_llm = self.llm.with_structured_output(self.analysis_model)
+        self._check_cancelled("tool_analysis")
+        structured_llm = self._structured(self.analysis_model)
 
-        messages = [
-            SystemMessage(content=self.prompts.TOOL_ANALYSIS_SYSTEM),
-            HumanMessage(content=self.prompts.tool_analysis_user(company_name, content)),
-        ]
+        try:
+            analysis: AnalysisT = structured_llm.invoke(self._tool_analysis_messages(company_name, content))
+            return analysis
+        except Exception as e:
+            print(f"{self.topic_label} Error analyzing company content:", e)
+            return self._fallback_analysis()
+
+    async def _aanalyze_company_content(self, company_name: str, content: str) -> AnalysisT:
+        self._check_cancelled("tool_analysis")
+        structured_llm = self._structured(self.analysis_model)
 
         try:
-            analysis: AnalysisT = structured_llm.invoke(messages)
+            analysis: AnalysisT = await structured_llm.ainvoke(self._tool_analysis_messages(company_name, content))
             return analysis
         except Exception as e:
             print(f"{self.topic_label} Error analyzing company content:", e)
-            # Fall back to a minimal object
-            return self.analysis_model(
-                pricing_model="Unknown",
-                pricing_details="Unknown",
-                is_open_source=None,
-                tech_stack=[],
-                description="Analysis failed",
-                api_available=None,
-                language_support=[],
-                integration_capabilities=[],
-            )
+            return self._fallback_analysis()
+
+    def _tool_analysis_messages(self, company_name: str, content: str) -> List[Any]:
+        return [
+            SystemMessage(content=self.prompts.TOOL_ANALYSIS_SYSTEM),
+            HumanMessage(content=self.prompts.tool_analysis_user(company_name, content)),
+        ]
+
+    def _fallback_analysis(self) -> AnalysisT:
+        # Minimal object used when the structured analysis call fails
+        FALLBACKS.inc(kind="tool_analysis")
+        return self.analysis_model(
+            pricing_model="Unknown",
+            pricing_details="Unknown",
+            is_open_source=None,
+            tech_stack=[],
+            description="Analysis failed",
+            api_available=None,
+            language_support=[],
+            integration_capabilities=[],
+        )
 
     # ------------------------------------------------------------------ #
     # Node: research
     # ------------------------------------------------------------------ #
     def _research_single_tool(self, tool_name: str) -> Optional[CompanyT]:
-        self._log(f"researching: {tool_name}")
+        self._check_cancelled("research_tool")
+        self._log_event("researching_tool", tool=tool_name)
         tool_query = f"{tool_name} official site"
 
         tool_search_results = self.firecrawl.search_companies(tool_query, num_results=1)
-        print("Pre-pre-pre checking", tool_name)
         web_results = self._get_web_results(tool_search_results)
         if not web_results:
-            self._log(f"no web results for {tool_name}")
+            self._log_event("no_web_results", tool=tool_name)
             return None
-        print("Pre-pre checking", tool_name)
         doc = web_results[0]
+        company = self._company_from_doc(tool_name, doc)
+        if company is None:
+            return None
+        # Prefer search markdown if available
+        content = getattr(doc, "markdown", None)
+        if not content:
+            self._log_event("scraping_tool", tool=tool_name, url=company.website)
+            scraped = self.firecrawl.scrape_company_pages(company.website)
+            if scraped and getattr(scraped, "markdown", None):
+                content = scraped.markdown
+
+        if content:
+            analysis = self._analyze_company_content(company.name, content)
+            self._apply_analysis(company, analysis)
+        else:
+            self._log_event("no_content", tool=tool_name)
+        print("Finished:", company.name)
+        return company
+
+    async def _aresearch_single_tool(self, tool_name: str) -> Optional[CompanyT]:
+        self._check_cancelled("research_tool")
+        self._log_event("researching_tool", tool=tool_name)
+        tool_query = f"{tool_name} official site"
 
+        tool_search_results = await self.firecrawl.asearch_companies(tool_query, num_results=1)
+        web_results = self._get_web_results(tool_search_results)
+        if not web_results:
+            self._log_event("no_web_results", tool=tool_name)
+            return None
+        doc = web_results[0]
+        company = self._company_from_doc(tool_name, doc)
+        if company is None:
+            return None
+
+        content = getattr(doc, "markdown", None)
+        if not content:
+            self._log_event("scraping_tool", tool=tool_name, url=company.website)
+            scraped = await self.firecrawl.ascrape_company_pages(company.website)
+            if scraped and getattr(scraped, "markdown", None):
+                content = scraped.markdown
+
+        if content:
+            analysis = await self._aanalyze_company_content(company.name, content)
+            self._apply_analysis(company, analysis)
+        else:
+            self._log_event("no_content", tool=tool_name)
+        return company
+
+    def _company_from_doc(self, tool_name: str, doc: Any) -> Optional[CompanyT]:
+        """Company stub from the tool's top search result (None without a URL)."""
         url = getattr(doc, "url", "") or ""
         desc = ""
         meta = getattr(doc, "metadata", None)
@@ -152,100 +244,112 @@ class BaseCSWorkflow(RootWorkflow, Generic[StateT, CompanyT, AnalysisT]):
                 url = getattr(meta, "url", "") or url
 
         if not url:
-            self._log(f"no URL for {tool_name}, skipping")
+            self._log_event("no_url", tool=tool_name)
             return None
-        company: CompanyT = self.company_model(
+        return self.company_model(
             name=tool_name,
             description=desc,
             website=url,
             tech_stack=[],
             competitors=[],
         )
-        print("Pre checking", company.name)
-        # Prefer search markdown if available
-        content = getattr(doc, "markdown", None)
-        if not content:
-            self._log(f"no markdown in search result for {tool_name}, scraping {url}")
-            scraped = self.firecrawl.scrape_company_pages(url)
-            if scraped and getattr(scraped, "markdown", None):
-                content = scraped.markdown
 
-        if content:
-            print("Checking:", company.name)
-            analysis = self._analyze_company_content(company.name, content)
-            print("Done checking:", company.name)
-            company.pricing_model = analysis.pricing_model
-            company.pricing_details = analysis.pricing_details
-            company.is_open_source = analysis.is_open_source
-            company.tech_stack = analysis.tech_stack
-            company.description = analysis.description
-            company.api_available = analysis.api_available
-            company.language_support = analysis.language_support
-            company.integration_capabilities = analysis.integration_capabilities
-        else:
-            self._log(f"no content (markdown/scrape) for {tool_name}, skipping analysis")
-        print("Finished:", company.name)
-        return company
+    @staticmethod
+    def _apply_analysis(company: CompanyT, analysis: AnalysisT) -> None:
+        company.pricing_model = analysis.pricing_model
+        company.pricing_details = analysis.pricing_details
+        company.is_open_source = analysis.is_open_source
+        company.tech_stack = analysis.tech_stack
+        company.description = analysis.description
+        company.api_available = analysis.api_available
+        company.language_support = analysis.language_support
+        company.integration_capabilities = analysis.integration_capabilities
 
     def _research_step(self, state: StateT) -> Dict[str, Any]:
-        log_messages = list(getattr(state, "log_messages", []) or [])
+        self._check_cancelled("research")
         extracted_tools = getattr(state, "extracted_tools", [])
 
         if not extracted_tools:
-            self._log("⚠️ No extracted names found, falling back to direct search")
+            self._log_event("no_extracted_names")
             search_results = self.firecrawl.search_companies(state.query, num_results=4)
-            web_results = self._get_web_results(search_results)
-
-            tool_names: List[str] = []
-            for doc in web_results:
-                meta = getattr(doc, "metadata", None)
-                if meta and getattr(meta, "title", None):
-                    tool_names.append(meta.title)
-            if not tool_names:
-                tool_names = ["Unknown"]
+            tool_names = self._names_from_search(search_results)
         else:
             tool_names = extracted_tools[:4]
 
-        self._log(f"{self.topic_label} 🔬 Researching specific tools/products: {', '.join(tool_names)}")
+        self._log_event("researching_tools", topic=self.topic_label, names=", ".join(tool_names))
 
         companies: List[CompanyT] = []
 
-        max_workers = min(4, len(tool_names))  # cap to avoid too many parallel calls
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_name = {
-                executor.submit(self._research_single_tool, name): name
-                for name in tool_names
-            }
-
-            for fut in as_completed(future_to_name):
-                tool_name = future_to_name[fut]
-                try:
-                    comp = fut.result()
-                    if comp is not None:
-                        companies.append(comp)
-                except Exception as e:
-                    self._log(f"error while researching {tool_name}: {e}")
+        # Shared, bounded research pool (see RESEARCH_EXECUTOR); at most 4 tools per run
+        future_to_name = {
+            self._submit_research(self._research_single_tool, name): name
+            for name in tool_names[:4]
+        }
+
+        for fut in as_completed(future_to_name):
+            if self._is_cancelled():
+                # client is gone: drop the tools nobody has started on yet
+                self._abort_futures(future_to_name)
+            tool_name = future_to_name[fut]
+            try:
+                comp = fut.result()
+                if comp is not None:
+                    companies.append(comp)
+            except Exception as e:
+                self._log_event("research_error", tool=tool_name, error=e)
+
+        return {"companies": companies}
+
+    async def _aresearch_step(self, state: StateT) -> Dict[str, Any]:
+        self._check_cancelled("research")
+        extracted_tools = getattr(state, "extracted_tools", [])
+
+        if not extracted_tools:
+            self._log_event("no_extracted_names")
+            search_results = await self.firecrawl.asearch_companies(state.query, num_results=4)
+            tool_names = self._names_from_search(search_results)
+        else:
+            tool_names = extracted_tools[:4]
+
+        self._log_event("researching_tools", topic=self.topic_label, names=", ".join(tool_names))
 
+        # at most 4 tools per run, researched concurrently on the event loop
+        companies = await self._agather_research(tool_names[:4], self._aresearch_single_tool)
         return {"companies": companies}
 
+    def _names_from_search(self, search_results: Any) -> List[str]:
+        """Fallback tool names: titles of a plain search for the query."""
+        tool_names: List[str] = []
+        for doc in self._get_web_results(search_results):
+            meta = getattr(doc, "metadata", None)
+            if meta and getattr(meta, "title", None):
+                tool_names.append(meta.title)
+        return tool_names or ["Unknown"]
+
     # ------------------------------------------------------------------ #
     # Node: analyze (final recommendations)
     # ------------------------------------------------------------------ #
     def _analyze_step(self, state: StateT) -> Dict[str, Any]:
-        self._log("Generating recommendations")
+        self._check_cancelled("analyze")
+        self._log_event("generating_recommendations")
+        response = self._hedged_invoke(self._recommendation_messages(state))
+        return {"analysis": response.content}
 
+    async def _aanalyze_step(self, state: StateT) -> Dict[str, Any]:
+        self._check_cancelled("analyze")
+        self._log_event("generating_recommendations")
+        response = await self._ahedged_invoke(self._recommendation_messages(state))
+        return {"analysis": response.content}
+
+    def _recommendation_messages(self, state: StateT) -> List[Any]:
         company_data = ", ".join(
             [company.model_dump_json() for company in state.companies]
         )
-
-        messages = [
+        return [
             SystemMessage(content=self.prompts.RECOMMENDATIONS_SYSTEM),
             HumanMessage(content=self.prompts.recommendations_user(state.query, company_data)),
         ]
 
-        response = self.llm.invoke(messages)
-        return {"analysis": response.content}
-
     # ------------------------------------------------------------------ #
     # Public API
     # ------------------------------------------------------------------ #
@@ -253,3 +357,9 @@ class BaseCSWorkflow(RootWorkflow, Generic[StateT, CompanyT, AnalysisT]):
         initial_state = self.state_model(query=query)
         final_state = self.workflow.invoke(initial_state)
         return self.state_model(**final_state)
+
+    async def arun(self, query: str) -> StateT:
+        """Native async `run`: LangGraph `ainvoke`, async LLM and Firecrawl calls."""
+        initial_state = self.state_model(query=query)
+        final_state = await self.workflow.ainvoke(initial_state)
+        return self.state_model(**final_state)
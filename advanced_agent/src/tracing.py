@@ -0,0 +1,349 @@
+# src/tracing.py
+"""
+Span-based request tracing, exported as OTLP-shaped JSON lines.
+
+Each /chat_stream (and /chat) request opens a root span; graph nodes,
+per-tool research, Firecrawl, LLM and translation calls open child spans
+under whatever span is current in their context. The current span lives in
+a ContextVar, so it follows `copy_context()` into executor threads and
+`asyncio` tasks the same way the per-run workflow state does.
+
+A finished trace is written to TRACE_EXPORT_PATH as one line holding an
+OTLP/JSON `ExportTraceServiceRequest` (resourceSpans -> scopeSpans -> spans),
+which OTLP-aware tools can load directly.
+
+Which traces are kept:
+  - TRACE_SAMPLE_RATE (0..1): fraction of requests traced (default 0, off)
+  - TRACE_SLOW_MS: if set, every request is recorded and the ones whose root
+    span took at least this long are exported even when not sampled
+
+Unsampled requests get a no-op span, so tracing costs nothing when off.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "traces/traces.jsonl")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "0"))
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "advanced-agent")
+# Spans kept per trace; a runaway trace stops recording instead of growing
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "5000"))
+
+# OTLP span kinds / status codes
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP/JSON encodes 64-bit ints as strings
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None]
+
+
+class Trace:
+    """Spans of one request; exported once the root and every child have ended."""
+
+    def __init__(self, sampled: bool) -> None:
+        self.trace_id = _new_id(16)
+        self.sampled = sampled
+        self.spans: List["Span"] = []
+        self.open_spans = 0
+        self.root: Optional["Span"] = None
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def _opened(self, span: "Span") -> bool:
+        with self._lock:
+            if len(self.spans) >= TRACE_MAX_SPANS:
+                self.dropped += 1
+                return False
+            self.spans.append(span)
+            self.open_spans += 1
+            return True
+
+    def _closed(self) -> None:
+        with self._lock:
+            self.open_spans -= 1
+            done = self.open_spans == 0 and self.root is not None and self.root.end_ns is not None
+        if done:
+            self._finish()
+
+    def _finish(self) -> None:
+        root = self.root
+        duration_ms = (root.end_ns - root.start_ns) / 1e6
+        if self.sampled or (TRACE_SLOW_MS > 0 and duration_ms >= TRACE_SLOW_MS):
+            if self.dropped:
+                root.attributes["trace.dropped_spans"] = self.dropped
+            EXPORTER.export(self)
+
+
+class Span:
+    __slots__ = (
+        "trace", "span_id", "parent_span_id", "name", "kind",
+        "start_ns", "end_ns", "attributes", "status_code", "status_message", "recording",
+    )
+
+    def __init__(
+        self,
+        trace: Trace,
+        name: str,
+        parent: Optional["Span"] = None,
+        kind: int = KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.trace = trace
+        self.span_id = _new_id(8)
+        self.parent_span_id = parent.span_id if parent is not None else ""
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status_code = 0
+        self.status_message = ""
+        self.recording = trace._opened(self)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"[:500]
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.status_code == 0:
+            self.status_code = STATUS_OK
+        if self.recording:
+            self.trace._closed()
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status_code},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class _NoopSpan:
+    """Stand-in for spans of requests that are not traced."""
+
+    recording = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Any] = ContextVar("tracing.current_span", default=NOOP_SPAN)
+
+
+class JsonlExporter:
+    """Appends one OTLP/JSON ExportTraceServiceRequest per trace to a file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self.exported = 0
+
+    def export(self, trace: Trace) -> None:
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({
+                    "service.name": TRACE_SERVICE_NAME,
+                    "process.pid": os.getpid(),
+                })},
+                "scopeSpans": [{
+                    "scope": {"name": "advanced_agent.tracing"},
+                    "spans": [span.to_otlp() for span in trace.spans],
+                }],
+            }]
+        }
+        line = json.dumps(payload, ensure_ascii=False)
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+                self.exported += 1
+            except OSError as e:
+                print(f"[tracing] could not write {self.path}: {e}")
+
+
+EXPORTER = JsonlExporter(TRACE_EXPORT_PATH)
+
+
+# ---------------------------
+# API
+# ---------------------------
+def current_span() -> Any:
+    return _current_span.get()
+
+
+def start_trace(name: str, **attributes: Any) -> Any:
+    """Root span of a request (sampled per TRACE_SAMPLE_RATE), or the no-op span."""
+    sampled = TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE
+    if not sampled and TRACE_SLOW_MS <= 0:
+        return NOOP_SPAN
+    trace = Trace(sampled)
+    root = Span(trace, name, kind=KIND_SERVER, attributes=attributes)
+    trace.root = root
+    return root
+
+
+def start_span(name: str, kind: int = KIND_INTERNAL, parent: Any = None, **attributes: Any) -> Any:
+    """Child of `parent` (default: the current span); no-op outside a traced request."""
+    parent = parent if parent is not None else _current_span.get()
+    if not parent.recording:
+        return NOOP_SPAN
+    return Span(parent.trace, name, parent, kind, attributes)
+
+
+@contextmanager
+def use_span(span: Any, end: bool = True) -> Iterator[Any]:
+    """Make `span` current for the block; errors are recorded on it."""
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        if end:
+            span.end()
+
+
+def span(name: str, kind: int = KIND_INTERNAL, **attributes: Any):
+    """`with span("firecrawl.search", query=q) as s:` - a child span of the current one."""
+    return use_span(start_span(name, kind, **attributes))
+
+
+def traced(name: str, kind: int = KIND_INTERNAL) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator running a (sync or async) function inside a child span."""
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def awrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name, kind):
+                    return await fn(*args, **kwargs)
+            return awrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class LLMTracingCallback(BaseCallbackHandler):
+    """LangChain callback opening an `llm.call` span per chat model call."""
+
+    # run in the caller's context (also under `ainvoke`), where the current span is
+    run_inline = True
+
+    def __init__(self) -> None:
+        self._spans: Dict[UUID, Any] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, serialized, kwargs, messages=sum(len(batch) for batch in messages))
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, serialized, kwargs, prompt_chars=sum(len(p) for p in prompts))
+
+    def _start(
+        self, run_id: UUID, serialized: Optional[Dict[str, Any]], kwargs: Dict[str, Any], **attributes: Any
+    ) -> None:
+        if not current_span().recording:
+            return
+        params = kwargs.get("invocation_params") or {}
+        model_kwargs = (serialized or {}).get("kwargs") or {}
+        s = start_span(
+            "llm.call",
+            KIND_CLIENT,
+            model=str(
+                params.get("model_name") or params.get("model")
+                or model_kwargs.get("model_name") or model_kwargs.get("model") or "unknown"
+            ),
+            temperature=params.get("temperature"),
+            **attributes,
+        )
+        with self._lock:
+            self._spans[run_id] = s
+
+    def _pop(self, run_id: UUID) -> Any:
+        with self._lock:
+            return self._spans.pop(run_id, None)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        s = self._pop(run_id)
+        if s is None:
+            return
+        usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+        s.set_attributes(
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+        )
+        s.end()
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        s = self._pop(run_id)
+        if s is not None:
+            s.record_error(error)
+            s.end()
@@ -15,6 +15,10 @@ interface SuggestionsApiResponse {
     suggestions: string[];
 }
 
+// EventSource reconnects by itself (sending Last-Event-ID, so the server resumes
+// the same run); give up after this many attempts in a row
+const MAX_SSE_RECONNECTS = 5;
+
 
 export class ChatUI {
     private form: HTMLFormElement;
@@ -338,6 +342,19 @@ export class ChatUI {
         return bubbles;
     }
 
+    private addReplyBubbles(reply: string, isFirstPart: boolean, isLastPart: boolean): void {
+        const bubbles = this.splitReplyIntoBubbles(reply);
+        for (let i = 0; i < bubbles.length; i++) {
+            const isFirst = isFirstPart && i === 0;
+            const isLast = isLastPart && i === bubbles.length - 1;
+            const style = isFirst || isLast ? "bot-first" : "bot";
+            // @ts-ignore
+            const url = this.extractWebsiteUrl(bubbles[i]);
+            // @ts-ignore
+            this.addMessage(bubbles[i], style, url);
+        }
+    }
+
     private async handleSubmit(): Promise<void> {
         const text = this.input.value.trim();
         if (!text) return;
@@ -362,7 +379,16 @@ export class ChatUI {
                     : "🤔 Start thinking, please wait...";
             this.addMessage(thinkingMsg, "greeting");
 
+            // Reconnecting only resumes the run once the server has sent an event
+            // id; before that it would start a new run
+            let reconnects = 0;
+            let resumable = false;
+
             es.onmessage = (event: MessageEvent) => {
+                if (event.lastEventId) {
+                    resumable = true;
+                    reconnects = 0;
+                }
                 try {
                     const data = JSON.parse(event.data);
 
@@ -375,19 +401,37 @@ export class ChatUI {
                         return;
                     }
 
+                    if (data.type === "queued") {
+                        // Server is at capacity: show our place in line
+                        this.addMessage(data.message as string, "thinking");
+                        return;
+                    }
+
                     if (data.type === "log") {
                         this.addMessage(data.message as string, "thinking");
                         return;
                     }
 
+                    if (data.type === "reply_section") {
+                        // Translated replies arrive section by section, in order
+                        const index = data.index as number;
+                        const total = data.total as number;
+                        this.addReplyBubbles(data.text as string, index === 0, index === total - 1);
+                        return;
+                    }
+
+                    if (data.type === "error") {
+                        // the run failed on the server; reconnecting won't help
+                        es.close();
+                        this.stopThinking();
+                        this.addMessage(data.message as string, "bot");
+                        this.submitButton.disabled = false;
+                        return;
+                    }
+
                     if (data.type === "final") {
-                        const bubbles = this.splitReplyIntoBubbles(data.reply as string);
-                        for (let i = 0; i < bubbles.length; i++) {
-                            const style = i === 0 ? "bot-first" : i === bubbles.length - 1 ? "bot-first" : "bot";
-                            // @ts-ignore
-                            const url = this.extractWebsiteUrl(bubbles[i]);
-                            // @ts-ignore
-                            this.addMessage(bubbles[i], style, url);
+                        if (!data.sections_streamed) {
+                            this.addReplyBubbles(data.reply as string, true, true);
                         }
                         if (data.download_url) {
                             const object = this.language === "Eng" ? "document" : "文档";
@@ -413,6 +457,18 @@ export class ChatUI {
             };
 
             es.onerror = (err) => {
+                if (es.readyState === EventSource.CONNECTING && resumable && reconnects < MAX_SSE_RECONNECTS) {
+                    // the browser is already retrying; the run keeps going on the server
+                    reconnects++;
+                    if (reconnects === 1) {
+                        const retryMsg =
+                            this.language === "Chn"
+                                ? "📶 连接中断，正在重新连接…"
+                                : "📶 Connection dropped, reconnecting...";
+                        this.addMessage(retryMsg, "thinking");
+                    }
+                    return;
+                }
                 console.error("SSE error:", err);
                 this.addMessage("Error: connection lost.", "bot");
                 es.close();
@@ -28,6 +28,7 @@ export declare class ChatUI {
     private updateTitle;
     private updateBackground;
     private splitReplyIntoBubbles;
+    private addReplyBubbles;
     private handleSubmit;
 }
 //# sourceMappingURL=chat-ui.d.ts.map
\ No newline at end of file
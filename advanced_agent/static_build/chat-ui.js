@@ -2,6 +2,9 @@
 import { DROPDOWN_OPTIONS_BY_ID } from "./configs.js";
 import { markdownToHtml } from "./markdown.js";
 import { mapLanguageValue, translateLabel, getGreetingText, getFollowupText, applyInterfaceLanguage, refreshDropdownLabels } from "./language.js";
+// EventSource reconnects by itself (sending Last-Event-ID, so the server resumes
+// the same run); give up after this many attempts in a row
+const MAX_SSE_RECONNECTS = 5;
 export class ChatUI {
     constructor() {
         this.suggestionGrid = null;
@@ -256,6 +259,18 @@ export class ChatUI {
         flush();
         return bubbles;
     }
+    addReplyBubbles(reply, isFirstPart, isLastPart) {
+        const bubbles = this.splitReplyIntoBubbles(reply);
+        for (let i = 0; i < bubbles.length; i++) {
+            const isFirst = isFirstPart && i === 0;
+            const isLast = isLastPart && i === bubbles.length - 1;
+            const style = isFirst || isLast ? "bot-first" : "bot";
+            // @ts-ignore
+            const url = this.extractWebsiteUrl(bubbles[i]);
+            // @ts-ignore
+            this.addMessage(bubbles[i], style, url);
+        }
+    }
     async handleSubmit() {
         const text = this.input.value.trim();
         if (!text)
@@ -274,7 +289,15 @@ export class ChatUI {
                 ? "🤔 正在思考，请稍候…"
                 : "🤔 Start thinking, please wait...";
             this.addMessage(thinkingMsg, "greeting");
+            // Reconnecting only resumes the run once the server has sent an event
+            // id; before that it would start a new run
+            let reconnects = 0;
+            let resumable = false;
             es.onmessage = (event) => {
+                if (event.lastEventId) {
+                    resumable = true;
+                    reconnects = 0;
+                }
                 try {
                     const data = JSON.parse(event.data);
                     if (data.type === "topic") {
@@ -285,18 +308,33 @@ export class ChatUI {
                         this.startThinking();
                         return;
                     }
+                    if (data.type === "queued") {
+                        // Server is at capacity: show our place in line
+                        this.addMessage(data.message, "thinking");
+                        return;
+                    }
                     if (data.type === "log") {
                         this.addMessage(data.message, "thinking");
                         return;
                     }
+                    if (data.type === "reply_section") {
+                        // Translated replies arrive section by section, in order
+                        const index = data.index;
+                        const total = data.total;
+                        this.addReplyBubbles(data.text, index === 0, index === total - 1);
+                        return;
+                    }
+                    if (data.type === "error") {
+                        // the run failed on the server; reconnecting won't help
+                        es.close();
+                        this.stopThinking();
+                        this.addMessage(data.message, "bot");
+                        this.submitButton.disabled = false;
+                        return;
+                    }
                     if (data.type === "final") {
-                        const bubbles = this.splitReplyIntoBubbles(data.reply);
-                        for (let i = 0; i < bubbles.length; i++) {
-                            const style = i === 0 ? "bot-first" : i === bubbles.length - 1 ? "bot-first" : "bot";
-                            // @ts-ignore
-                            const url = this.extractWebsiteUrl(bubbles[i]);
-                            // @ts-ignore
-                            this.addMessage(bubbles[i], style, url);
+                        if (!data.sections_streamed) {
+                            this.addReplyBubbles(data.reply, true, true);
                         }
                         if (data.download_url) {
                             const object = this.language === "Eng" ? "document" : "文档";
@@ -318,6 +356,17 @@ export class ChatUI {
                 }
             };
             es.onerror = (err) => {
+                if (es.readyState === EventSource.CONNECTING && resumable && reconnects < MAX_SSE_RECONNECTS) {
+                    // the browser is already retrying; the run keeps going on the server
+                    reconnects++;
+                    if (reconnects === 1) {
+                        const retryMsg = this.language === "Chn"
+                            ? "📶 连接中断，正在重新连接…"
+                            : "📶 Connection dropped, reconnecting...";
+                        this.addMessage(retryMsg, "thinking");
+                    }
+                    return;
+                }
                 console.error("SSE error:", err);
                 this.addMessage("Error: connection lost.", "bot");
                 es.close();
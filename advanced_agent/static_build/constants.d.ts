@@ -1,10 +0,0 @@
-export type SelectOption = {
-    value: string;
-    label: string;
-    disabled?: boolean;
-    selected?: boolean;
-};
-export declare const MODEL_OPTIONS: SelectOption[];
-export declare const HUMANIZATION_OPTIONS: SelectOption[];
-export declare const DROPDOWN_OPTIONS_BY_ID: Record<string, SelectOption[]>;
-//# sourceMappingURL=constants.d.ts.map
\ No newline at end of file
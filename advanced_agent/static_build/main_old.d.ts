@@ -1,2 +0,0 @@
-export {};
-//# sourceMappingURL=main_old.d.ts.map
\ No newline at end of file